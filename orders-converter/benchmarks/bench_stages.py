@@ -0,0 +1,204 @@
+"""
+Stage-level benchmarks on synthetic purchase orders.
+
+Generates POs of increasing page counts and reports, per stage, wall time,
+peak Python memory (tracemalloc, measured in a separate pass so it does not
+distort timings) and rows/sec. Every stage must produce all the generated
+rows. The streaming stages (iter_table_rows, convert_streaming) should show
+peak memory staying flat as pages grow. Results are compared against a
+stored baseline so regressions are visible:
+
+    python benchmarks/bench_stages.py                      # 1..1000 pages, compare
+    python benchmarks/bench_stages.py --pages 1 10 --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pdfplumber
+
+from orders_converter.core import parser
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.io.excel_writer import write_order_excel
+from orders_converter.pipeline import convert_pdf_to_excel
+from orders_converter.utils.synthetic import generate_po_pdf
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_PAGES = [1, 10, 100, 1000]
+# Differences smaller than this are noise, whatever the relative change.
+MIN_SECONDS_DELTA = 0.02
+MIN_MB_DELTA = 1.0
+
+
+def _order_lines(rows: List[List[str]]) -> List[str]:
+    """Rebuilds item text blocks in PDF order for parse_order_line, money formatted as printed."""
+    return [" ".join(row[:7]) + f" ${Decimal(row[7]):,.2f} ${Decimal(row[8]):,.2f}" for row in rows]
+
+
+def build_stages(pdf_path: str, out_dir: str) -> List[Tuple[str, Callable[[], Optional[int]]]]:
+    """
+    Returns (name, fn) pairs; each fn runs one stage and returns the rows it
+    produced, or None for the header stages, which produce none.
+    """
+    with PurchaseOrderDocument(pdf_path) as document:
+        meta = parser.extract_header_meta(document)
+        rows = parser.extract_table_rows(document)
+    lines = _order_lines(rows[1:])
+
+    def header_meta() -> None:
+        with PurchaseOrderDocument(pdf_path) as document:
+            parser.extract_header_meta(document)
+
+    def header_meta_regions() -> None:
+        parser.extract_header_meta(pdf_path, regions=parser.DEFAULT_META_REGIONS)
+
+    def table_rows() -> int:
+        with PurchaseOrderDocument(pdf_path) as document:
+            return len(parser.extract_table_rows(document)) - 1
+
+    def table_rows_streaming() -> int:
+        return sum(1 for _ in parser.iter_table_rows(pdf_path))
+
+    def convert_streaming() -> int:
+        return convert_pdf_to_excel(pdf_path, os.path.join(out_dir, "bench-convert.csv"))[1]
+
+    def table_rows_backend(backend: str) -> Callable[[], int]:
+        def run() -> int:
+            with PurchaseOrderDocument(pdf_path, backend=backend) as document:
+                return len(parser.extract_table_rows(document)) - 1
+        return run
+
+    def table_rows_words() -> int:
+        with PurchaseOrderDocument(pdf_path) as document:
+            return len(parser.extract_table_rows(document, engine="words")) - 1
+
+    def order_lines() -> int:
+        return sum(1 for line in lines if parser.parse_order_line(line))
+
+    def excel() -> int:
+        return write_order_excel(rows[1:], meta, os.path.join(out_dir, "bench.xlsx"), columns=rows[0])
+
+    return [
+        ("extract_header_meta", header_meta),
+        ("extract_header_meta_regions", header_meta_regions),
+        ("extract_table_rows", table_rows),
+        ("iter_table_rows", table_rows_streaming),
+        ("convert_streaming", convert_streaming),
+        ("extract_table_rows_words", table_rows_words),
+        ("extract_table_rows_pdfium", table_rows_backend("pdfium")),
+        ("extract_table_rows_pdfminer", table_rows_backend("pdfminer")),
+        ("parse_order_line", order_lines),
+        ("write_to_excel", excel),
+    ]
+
+
+def measure(fn: Callable[[], Optional[int]], memory: bool) -> Dict[str, Any]:
+    start = time.perf_counter()
+    rows = fn()
+    seconds = time.perf_counter() - start
+    result = {"seconds": round(seconds, 4), "rows": rows,
+              "rows_per_sec": round(rows / seconds, 1) if rows and seconds else None}
+    if memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mb"] = round(peak / 1e6, 2)
+    return result
+
+
+def run(pages_list: List[int], items_per_page: int, memory: bool) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for pages in pages_list:
+            pdf_path = os.path.join(tmpdir, f"po-{pages}.pdf")
+            expected = len(generate_po_pdf(pdf_path, pages=pages, items_per_page=items_per_page)["rows"])
+            for stage, fn in build_stages(pdf_path, tmpdir):
+                key = f"pages={pages}/{stage}"
+                results[key] = measure(fn, memory)
+                r = results[key]
+                if r["rows"] is not None:
+                    assert r["rows"] == expected, f"{key} produced {r['rows']} rows, expected {expected}"
+                print(f"{key:40s} {r['seconds']:9.3f}s  {r.get('peak_mb', float('nan')):9.2f} MB  "
+                      f"{r['rows_per_sec'] or 0:12.1f} rows/s", flush=True)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Returns one message per stage that is slower or larger than the baseline allows."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if (current["seconds"] > base["seconds"] * (1 + tolerance)
+                and current["seconds"] - base["seconds"] > MIN_SECONDS_DELTA):
+            regressions.append(f"{key}: {current['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+        if ("peak_mb" in current and "peak_mb" in base
+                and current["peak_mb"] > base["peak_mb"] * (1 + tolerance)
+                and current["peak_mb"] - base["peak_mb"] > MIN_MB_DELTA):
+            regressions.append(f"{key}: {current['peak_mb']:.2f} MB vs baseline {base['peak_mb']:.2f} MB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmark conversion stages on synthetic POs")
+    arg_parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES, help="Page counts to run")
+    arg_parser.add_argument("--items-per-page", type=int, default=20)
+    arg_parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    arg_parser.add_argument("--save-baseline", action="store_true",
+                            help="Merge these results into the baseline instead of comparing")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative slowdown/growth before a stage counts as regressed")
+    arg_parser.add_argument("--json", help="Also write the results to this file")
+    args = arg_parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    results = run(args.pages, args.items_per_page, memory=not args.no_memory)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    if args.save_baseline:
+        baseline.setdefault("stages", {}).update(results)
+        baseline["environment"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pdfplumber": pdfplumber.__version__,
+            "items_per_page": args.items_per_page,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("No baseline to compare against; run with --save-baseline to record one.")
+        return 0
+    regressions = compare(results, baseline.get("stages", {}), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print("No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
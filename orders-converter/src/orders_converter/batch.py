@@ -0,0 +1,275 @@
+"""
+Batch conversion of many purchase-order PDFs across worker processes.
+"""
+
+import glob
+import logging
+import os
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from orders_converter.io.backends import DEFAULT_BACKEND
+from orders_converter.io.extraction_cache import ExtractionCache, hash_file
+from orders_converter.io.journal import DONE, FAILED, QUARANTINED, BatchJournal
+from orders_converter.pipeline import convert_pdf_to_excel
+from orders_converter.utils.profiling import Profiler, StageMetrics
+
+# One cache connection per worker process, opened on first use.
+_caches: Dict[str, ExtractionCache] = {}
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of converting a single PDF."""
+    pdf_path: str
+    output_path: str
+    ok: bool
+    rows: int = 0
+    error: str = ""
+    seconds: float = 0.0
+    # Profiler.stage_totals() for the conversion, when profiling was requested.
+    stages: Optional[Dict[str, Dict[str, float]]] = None
+    # Set aside by triage without being converted; `error` holds the reason.
+    quarantined: bool = False
+    # sha256 of the PDF, when a journal asked for it.
+    input_hash: str = ""
+    # Finished in an earlier run of a resumed batch; not converted again.
+    skipped: bool = False
+
+
+def collect_inputs(inputs: Iterable[str], file_list: Optional[str] = None) -> List[str]:
+    """
+    Expands directories, glob patterns and an optional file list into PDF paths.
+    Directories are searched recursively for *.pdf files. Duplicates are dropped
+    while keeping the first-seen order.
+    """
+    candidates: List[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*.pdf")
+            candidates.extend(sorted(glob.glob(pattern, recursive=True)))
+        elif glob.has_magic(item):
+            candidates.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            candidates.append(item)
+
+    if file_list:
+        with open(file_list, encoding="utf-8") as fh:
+            candidates.extend(line.strip() for line in fh if line.strip() and not line.startswith("#"))
+
+    seen = set()
+    pdf_paths = []
+    for path in candidates:
+        key = os.path.abspath(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        pdf_paths.append(path)
+    return pdf_paths
+
+
+def output_path_for(pdf_path: str, output_dir: Optional[str] = None, fmt: str = "xlsx") -> str:
+    """Returns the output path (.xlsx by default) for a PDF, next to it or inside output_dir."""
+    base = os.path.splitext(os.path.basename(pdf_path))[0] + "." + fmt
+    if output_dir:
+        return os.path.join(output_dir, base)
+    return os.path.join(os.path.dirname(pdf_path), base)
+
+
+def output_targets(pdf_paths: List[str], output_dir: Optional[str] = None,
+                   fmt: str = "xlsx") -> List[Tuple[str, str]]:
+    """
+    Pairs each PDF with its output path (see output_path_for). PDFs from
+    different directories that share a name would write the same file inside
+    output_dir, so those keep their subdirectories relative to the directory
+    they have in common. Raises ValueError if two PDFs still map to one output.
+    """
+    outputs = [output_path_for(path, output_dir, fmt) for path in pdf_paths]
+    if output_dir:
+        by_output: Dict[str, List[int]] = {}
+        for i, output in enumerate(outputs):
+            by_output.setdefault(os.path.normcase(output), []).append(i)
+        for indexes in by_output.values():
+            if len(indexes) < 2:
+                continue
+            dirs = [os.path.dirname(os.path.abspath(pdf_paths[i])) for i in indexes]
+            common = os.path.commonpath(dirs)
+            for i, directory in zip(indexes, dirs):
+                outputs[i] = output_path_for(pdf_paths[i], os.path.join(output_dir, os.path.relpath(directory, common)),
+                                             fmt)
+    seen: Dict[str, str] = {}
+    for path, output in zip(pdf_paths, outputs):
+        key = os.path.normcase(os.path.normpath(output))
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {path} would both be converted to {output}.")
+        seen[key] = path
+    return list(zip(pdf_paths, outputs))
+
+
+def _cache_for(cache_dir: Optional[str]) -> Optional[ExtractionCache]:
+    if not cache_dir:
+        return None
+    if cache_dir not in _caches:
+        _caches[cache_dir] = ExtractionCache(cache_dir)
+    return _caches[cache_dir]
+
+
+def convert_pdf(pdf_path: str, output_path: str, cache_dir: Optional[str] = None,
+                profile: bool = False, engine: str = "text",
+                backend: str = DEFAULT_BACKEND, memory_budget_mb: Optional[float] = None,
+                hash_input: bool = False,
+                progress: Optional[Callable[[int, int], None]] = None) -> ConversionResult:
+    """
+    Runs the full PDF -> Excel pipeline for one file, using the extraction
+    cache in cache_dir if one is given. With profile=True the result carries
+    per-stage timings. memory_budget_mb is the RSS the worker tries to stay
+    under and progress is called as pages are read (see
+    pipeline.convert_pdf_to_excel). With hash_input=True a successful result
+    carries the PDF's sha256.
+    Errors are captured in the result instead of raised so a bad PDF never
+    takes down a worker process or the rest of the batch.
+    """
+    start = time.perf_counter()
+    profiler = Profiler() if profile else None
+    try:
+        with profiler or nullcontext():
+            _, row_count = convert_pdf_to_excel(pdf_path, output_path, cache=_cache_for(cache_dir),
+                                                engine=engine, backend=backend,
+                                                progress=progress, memory_budget_mb=memory_budget_mb)
+        return ConversionResult(pdf_path, output_path, True, rows=row_count,
+                                seconds=time.perf_counter() - start,
+                                stages=profiler.stage_totals() if profiler else None,
+                                input_hash=hash_file(pdf_path) if hash_input else "")
+    except Exception as e:
+        logging.error(f"Failed to convert {pdf_path}: {e}")
+        return ConversionResult(pdf_path, output_path, False, error=str(e) or type(e).__name__,
+                                seconds=time.perf_counter() - start,
+                                stages=profiler.stage_totals() if profiler else None)
+
+
+def run_batch(pdf_paths: List[str], output_dir: Optional[str] = None,
+              jobs: Optional[int] = None, cache_dir: Optional[str] = None,
+              profile: bool = False, engine: str = "text",
+              backend: str = DEFAULT_BACKEND, fmt: str = "xlsx",
+              memory_budget_mb: Optional[float] = None, triage: bool = False,
+              journal_path: Optional[str] = None, resume: bool = False) -> List[ConversionResult]:
+    """
+    Converts every PDF to `fmt` (see io.sinks.FORMATS), spreading files
+    across `jobs` worker processes (defaults to the CPU count). Results are
+    returned in input order.
+    With profile=True each result carries its per-stage timings.
+    memory_budget_mb applies to each worker's conversion. With triage=True,
+    every PDF first goes through triage.triage_all and the ones it
+    quarantines are returned as quarantined results without being converted.
+    With journal_path, each file's progress is appended to a BatchJournal
+    there as it happens. resume=True then returns the files the journal shows
+    as done or quarantined (and unchanged since) as skipped results, so only
+    failed, interrupted and new files are processed.
+    """
+    if resume and not journal_path:
+        raise ValueError("Resuming a batch needs its journal.")
+    jobs = jobs or os.cpu_count() or 1
+    targets = output_targets(pdf_paths, output_dir, fmt)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        for directory in {os.path.dirname(out) for _, out in targets}:
+            os.makedirs(directory, exist_ok=True)
+    results: List[Optional[ConversionResult]] = [None] * len(targets)
+    journal = BatchJournal(journal_path) if journal_path else None
+    try:
+        if journal is not None and resume:
+            finished = journal.finished(targets)
+            for i, (pdf, out) in enumerate(targets):
+                entry = finished.get(pdf)
+                if entry is not None:
+                    results[i] = ConversionResult(pdf, out, entry.status == DONE, rows=entry.rows, error=entry.error,
+                                                  quarantined=entry.status == QUARANTINED,
+                                                  input_hash=entry.input_hash, skipped=True)
+            logging.info(f"Resuming: {len(finished)} of {len(targets)} PDFs finished in earlier runs.")
+        run_id = journal.start_run(len(targets), resumed=resume) if journal is not None else 0
+
+        def finish(i: int, result: ConversionResult) -> None:
+            results[i] = result
+            if journal is not None:
+                status = QUARANTINED if result.quarantined else DONE if result.ok else FAILED
+                journal.record(run_id, result.pdf_path, status, result.output_path, result.input_hash,
+                               rows=result.rows, error=result.error, seconds=result.seconds)
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if triage and pending:
+            from orders_converter.triage import triage_all
+
+            for i, triaged in zip(pending, triage_all([targets[i][0] for i in pending], jobs)):
+                if not triaged.convertible:
+                    finish(i, ConversionResult(triaged.pdf_path, targets[i][1], False, error=triaged.reason,
+                                               seconds=triaged.seconds, quarantined=True))
+            quarantined = len(pending) - sum(1 for i in pending if results[i] is None)
+            logging.info(f"Triage quarantined {quarantined} of {len(pending)} PDFs.")
+            pending = [i for i in pending if results[i] is None]
+        logging.info(f"Converting {len(pending)} PDFs with {jobs} worker(s).")
+        if journal is not None:
+            journal.running(run_id, [targets[i] for i in pending])
+        hash_input = journal is not None
+
+        if jobs == 1 or len(pending) <= 1:
+            for i in pending:
+                pdf, out = targets[i]
+                finish(i, convert_pdf(pdf, out, cache_dir, profile, engine, backend, memory_budget_mb, hash_input))
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+                futures = {executor.submit(convert_pdf, *targets[i], cache_dir, profile, engine, backend,
+                                           memory_budget_mb, hash_input): i for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        finish(i, future.result())
+                    except Exception as e:
+                        # Only reached if the worker process itself died.
+                        pdf, out = targets[i]
+                        finish(i, ConversionResult(pdf, out, False, error=f"worker crashed: {e}"))
+                    status = "ok" if results[i].ok else "FAILED"
+                    logging.info(f"[{status}] {targets[i][0]}")
+        if journal is not None:
+            journal.finish_run(run_id)
+    finally:
+        if journal is not None:
+            journal.close()
+    return results
+
+
+def format_summary(results: List[ConversionResult]) -> str:
+    """Formats a per-file success/failure report for the end of a batch run."""
+    lines = []
+    for result in results:
+        if result.skipped:
+            state = "done" if result.ok else f"quarantined: {result.error}"
+            lines.append(f"  SKIPPED {result.pdf_path} ({state} in an earlier run)")
+        elif result.ok:
+            lines.append(f"  OK      {result.pdf_path} -> {result.output_path} "
+                         f"({result.rows} rows, {result.seconds:.2f}s)")
+        elif result.quarantined:
+            lines.append(f"  QUARANTINED  {result.pdf_path}: {result.error}")
+        else:
+            lines.append(f"  FAILED  {result.pdf_path}: {result.error}")
+    succeeded = sum(1 for r in results if r.ok)
+    quarantined = sum(1 for r in results if r.quarantined)
+    counts = f"{succeeded} succeeded, {len(results) - succeeded - quarantined} failed"
+    if quarantined:
+        counts += f", {quarantined} quarantined"
+    skipped = sum(1 for r in results if r.skipped)
+    if skipped:
+        counts += f" ({skipped} from earlier runs)"
+    lines.append(f"{counts}, {len(results)} total.")
+    return "\n".join(lines)
+
+
+def batch_metrics(results: List[ConversionResult]) -> StageMetrics:
+    """Sums the per-file results of a batch into cumulative stage counters."""
+    metrics = StageMetrics()
+    for result in results:
+        if result.skipped:
+            continue
+        metrics.add(result.stages, ok=result.ok, rows=result.rows, seconds=result.seconds)
+    return metrics
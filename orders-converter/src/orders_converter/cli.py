@@ -1,29 +1,328 @@
 import argparse
+import glob
 import os
-import pandas as pd
-from orders_converter.core import parser
-from orders_converter.io.excel_writer import write_order_excel
-
-def main():
-    parser_arg = argparse.ArgumentParser(description="Orders Sheet Converter CLI")
-    parser_arg.add_argument("pdf", help="Path to the purchase order PDF")
-    parser_arg.add_argument("-o", "--output", help="Output Excel file path (.xlsx)")
-    args = parser_arg.parse_args()
-
-    meta = parser.extract_header_meta(args.pdf)
-    rows = parser.extract_table_rows(args.pdf)
+import sys
+from contextlib import nullcontext
+# Only light modules are imported up front: scripts call the CLI many times,
+# and pdfplumber, pandas and openpyxl load when a code path first needs them.
+from orders_converter.core.parser import ENGINES
+from orders_converter.io.backends import BACKENDS, DEFAULT_BACKEND
+from orders_converter.io.sinks import FORMATS
+
+def _is_batch(args) -> bool:
+    if args.file_list or args.journal or len(args.pdf) > 1:
+        return True
+    return os.path.isdir(args.pdf[0]) or glob.has_magic(args.pdf[0])
+
+def _cache_dir(args):
+    from orders_converter.io.extraction_cache import default_cache_dir
+
+    if args.no_cache:
+        return None
+    return args.cache_dir or default_cache_dir()
+
+def run_batch(args) -> int:
+    from orders_converter import batch
+
+    pdf_paths = batch.collect_inputs(args.pdf, args.file_list)
+    if not pdf_paths:
+        print("No PDF files found.")
+        return 1
+    try:
+        results = batch.run_batch(pdf_paths, output_dir=args.output_dir, jobs=args.jobs,
+                                  cache_dir=_cache_dir(args), profile=bool(args.metrics), engine=args.engine,
+                                  backend=args.backend, fmt=args.format, memory_budget_mb=args.memory_budget,
+                                  triage=args.triage, journal_path=args.journal, resume=args.resume)
+    except ValueError as e:
+        print(f"{e} Exiting.")
+        return 1
+    print("Batch Summary:")
+    print(batch.format_summary(results))
+    if args.metrics:
+        batch.batch_metrics(results).write(args.metrics)
+        print(f"Stage metrics written to: {args.metrics}")
+    return 0 if all(r.ok for r in results) else 1
+
+def watch_main(argv) -> int:
+    from orders_converter.utils.logging_config import setup_logging
+    from orders_converter.watch import InboxWatcher
+
+    parser_arg = argparse.ArgumentParser(prog="orders-converter watch",
+                                         description="Convert PDFs as they are dropped into an inbox folder")
+    parser_arg.add_argument("inbox", help="Folder to watch for new PDFs")
+    parser_arg.add_argument("outbox", help="Folder for Excel files and the done/failed/duplicates folders")
+    parser_arg.add_argument("-j", "--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser_arg.add_argument("--queue-size", type=int, default=64, help="Maximum PDFs waiting for a worker")
+    parser_arg.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between inbox scans")
+    parser_arg.add_argument("--settle-seconds", type=float, default=2.0,
+                            help="Seconds a file must stay unchanged before it is converted")
+    parser_arg.add_argument("--once", action="store_true", help="Convert what is in the inbox, then exit")
+    parser_arg.add_argument("--no-cache", action="store_true", help="Do not use the extraction cache")
+    parser_arg.add_argument("--cache-dir", help="Extraction cache directory")
+    parser_arg.add_argument("--metrics", help="Keep cumulative stage metrics in this Prometheus text file")
+    parser_arg.add_argument("--triage", action="store_true",
+                            help="Move PDFs that fail the cheap pre-flight checks to outbox/quarantine "
+                                 "without converting them")
+    args = parser_arg.parse_args(argv)
+
+    setup_logging('INFO')
+    watcher = InboxWatcher(args.inbox, args.outbox, jobs=args.jobs, queue_size=args.queue_size,
+                           poll_interval=args.poll_interval, settle_seconds=args.settle_seconds,
+                           cache_dir=_cache_dir(args), metrics_path=args.metrics, triage=args.triage)
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    return 0
+
+def work_main(argv) -> int:
+    from orders_converter.utils.logging_config import setup_logging
+    from orders_converter.workqueue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, run_workers
+
+    parser_arg = argparse.ArgumentParser(prog="orders-converter work",
+                                         description="Convert PDFs from a shared directory's inbox alongside "
+                                                     "workers on other hosts")
+    parser_arg.add_argument("root", help="Shared directory holding inbox/ (claimed/, output/, done/ and failed/ "
+                                         "are created next to it)")
+    parser_arg.add_argument("-j", "--jobs", type=int, help="Worker processes on this host (default: CPU count)")
+    parser_arg.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                            help="Seconds without a heartbeat after which a claim is taken over")
+    parser_arg.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                            help="Expired leases after which a PDF is moved to failed/")
+    parser_arg.add_argument("--format", choices=list(FORMATS), default="xlsx", help="Output format")
+    parser_arg.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between inbox scans")
+    parser_arg.add_argument("--settle-seconds", type=float, default=2.0,
+                            help="Seconds a file must stay unchanged before it is claimed")
+    parser_arg.add_argument("--once", action="store_true", help="Stop when nothing is left to claim")
+    parser_arg.add_argument("--no-cache", action="store_true", help="Do not use the extraction cache")
+    parser_arg.add_argument("--cache-dir", help="Extraction cache directory")
+    args = parser_arg.parse_args(argv)
+
+    setup_logging('INFO')
+    try:
+        run_workers(args.root, jobs=args.jobs, once=args.once, lease_seconds=args.lease_seconds,
+                    max_attempts=args.max_attempts, poll_interval=args.poll_interval,
+                    settle_seconds=args.settle_seconds, cache_dir=_cache_dir(args), fmt=args.format)
+    except KeyboardInterrupt:
+        print("Stopped working.")
+    return 0
+
+def serve_main(argv) -> int:
+    import asyncio
+    from orders_converter.service import DEFAULT_MAX_BYTES, DEFAULT_MAX_PAGES, ConversionService
+    from orders_converter.utils.logging_config import setup_logging
+
+    parser_arg = argparse.ArgumentParser(prog="orders-converter serve",
+                                         description="Serve PDF conversions over HTTP on warm worker processes")
+    parser_arg.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser_arg.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser_arg.add_argument("-j", "--workers", type=int, help="Worker processes (default: CPU count)")
+    parser_arg.add_argument("--max-in-flight", type=int,
+                            help="Concurrent conversions before returning 503 (default: 2 x workers)")
+    parser_arg.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Maximum upload size")
+    parser_arg.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="Maximum PDF page count")
+    args = parser_arg.parse_args(argv)
+
+    setup_logging('INFO')
+    service = ConversionService(args.host, args.port, workers=args.workers, max_in_flight=args.max_in_flight,
+                                max_bytes=args.max_bytes, max_pages=args.max_pages)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        print("Stopped serving.")
+    return 0
+
+def meta_main(argv) -> int:
+    import json
+    from orders_converter import batch
+    from orders_converter.core import parser
+    from orders_converter.core.document import PurchaseOrderDocument
+
+    parser_arg = argparse.ArgumentParser(prog="orders-converter meta",
+                                         description="Print the header meta of PDFs as JSON lines, without "
+                                                     "extracting their tables")
+    parser_arg.add_argument("pdf", nargs="+", help="Purchase order PDF(s), directories or glob patterns")
+    parser_arg.add_argument("--learn-regions", metavar="SAMPLE_PDF",
+                            help="Learn where the header fields live from a sample PO of the same layout")
+    parser_arg.add_argument("--full-text", action="store_true",
+                            help="Lay out full pages instead of only the header region")
+    parser_arg.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                            help="PDF library pages are read with (default: pdfplumber)")
+    args = parser_arg.parse_args(argv)
+
+    regions = None
+    if not args.full_text:
+        regions = parser.learn_meta_regions(args.learn_regions) if args.learn_regions else parser.DEFAULT_META_REGIONS
+    failed = 0
+    for pdf_path in batch.collect_inputs(args.pdf):
+        try:
+            with PurchaseOrderDocument(pdf_path, backend=args.backend) as document:
+                meta = parser.extract_header_meta(document, regions=regions)
+        except Exception as e:
+            failed += 1
+            print(json.dumps({"file": pdf_path, "error": f"{type(e).__name__}: {e}"}))
+            continue
+        print(json.dumps({"file": pdf_path, **meta}))
+    return 1 if failed else 0
+
+def triage_main(argv) -> int:
+    import json
+    from orders_converter import batch, triage
+
+    parser_arg = argparse.ArgumentParser(prog="orders-converter triage",
+                                         description="Sort PDFs into convertible and quarantine with cheap "
+                                                     "checks only, without converting them")
+    parser_arg.add_argument("pdf", nargs="*", help="Purchase order PDF(s), directories or glob patterns")
+    parser_arg.add_argument("--file-list", help="Text file with one PDF path per line")
+    parser_arg.add_argument("-j", "--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser_arg.add_argument("--json", action="store_true", help="Print one JSON line per PDF instead of a report")
+    parser_arg.add_argument("--convertible-list", metavar="FILE",
+                            help="Write the convertible PDFs to FILE, for --file-list")
+    args = parser_arg.parse_args(argv)
+
+    pdf_paths = batch.collect_inputs(args.pdf, args.file_list)
+    if not pdf_paths:
+        print("No PDF files found.")
+        return 1
+    results = triage.triage_all(pdf_paths, args.jobs)
+    if args.json:
+        for r in results:
+            print(json.dumps({"file": r.pdf_path, "convertible": r.convertible, "reason": r.reason,
+                              "pages": r.page_count, "layout": r.layout}))
+    else:
+        print("Triage Report:")
+        print(triage.format_triage(results))
+    if args.convertible_list:
+        with open(args.convertible_list, "w", encoding="utf-8") as fh:
+            fh.writelines(f"{r.pdf_path}\n" for r in results if r.convertible)
+    return 0 if all(r.convertible for r in results) else 1
+
+def journal_main(argv) -> int:
+    from orders_converter.io.journal import STATS_PERIODS, BatchJournal, format_stats
+
+    parser_arg = argparse.ArgumentParser(prog="orders-converter journal",
+                                         description="Print throughput stats from a batch journal")
+    parser_arg.add_argument("journal", help="Journal written with --journal")
+    parser_arg.add_argument("--by", choices=list(STATS_PERIODS), default="run",
+                            help="Group by batch run, hour or day (default: run)")
+    args = parser_arg.parse_args(argv)
+
+    if not os.path.exists(args.journal):
+        print(f"No journal at {args.journal}.")
+        return 1
+    with BatchJournal(args.journal) as journal:
+        print(format_stats(journal.stats(args.by), args.by))
+    return 0
+
+COMMANDS = {
+    "meta": meta_main,
+    "journal": journal_main,
+    "triage": triage_main,
+    "watch": watch_main,
+    "work": work_main,
+    "serve": serve_main,
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser_arg = argparse.ArgumentParser(
+        description="Orders Sheet Converter CLI",
+        epilog="Other commands: " + ", ".join(f"orders-converter {name} --help" for name in COMMANDS),
+    )
+    parser_arg.add_argument("pdf", nargs="*",
+                            help="Purchase order PDF(s); directories and glob patterns run in batch mode")
+    parser_arg.add_argument("-o", "--output",
+                            help="Output file path; its extension (.xlsx, .csv, .jsonl, .parquet, .arrow) "
+                                 "selects the format")
+    parser_arg.add_argument("--format", choices=list(FORMATS), default="xlsx",
+                            help="Output format when no --output is given, e.g. in batch mode. All but xlsx "
+                                 "write typed rows with the PO meta on each row (default: xlsx)")
+    parser_arg.add_argument("--file-list", help="Text file with one PDF path per line (batch mode)")
+    parser_arg.add_argument("--output-dir", help="Directory for the files written in batch mode, in --format")
+    parser_arg.add_argument("-j", "--jobs", type=int,
+                            help="Worker processes for batch mode (default: CPU count)")
+    parser_arg.add_argument("--page-jobs", type=int, default=1,
+                            help="Lay out the pages of a single large PDF in N worker processes")
+    parser_arg.add_argument("--no-cache", action="store_true",
+                            help="Always parse the PDF; do not read or write the extraction cache")
+    parser_arg.add_argument("--cache-dir",
+                            help="Extraction cache directory (default: $ORDERS_CONVERTER_CACHE_DIR "
+                                 "or ~/.cache/orders-converter)")
+    parser_arg.add_argument("--engine", choices=ENGINES, default="text",
+                            help="Table extraction engine: 'text' scans laid-out page text, 'words' places "
+                                 "positioned words into the header's columns and keeps wrapped descriptions "
+                                 "(default: text)")
+    parser_arg.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                            help="PDF library pages are read with; 'pdfium' and 'pdfminer' are faster "
+                                 "(default: pdfplumber)")
+    parser_arg.add_argument("--memory-budget", type=float, metavar="MB",
+                            help="Resident memory each conversion tries to stay under; past it, pages are "
+                                 "parsed one at a time without caching text (ignores --page-jobs)")
+    parser_arg.add_argument("--triage", action="store_true",
+                            help="Check PDFs with cheap pre-flight checks first and skip (quarantine) those "
+                                 "that cannot produce rows")
+    parser_arg.add_argument("--journal", metavar="FILE",
+                            help="Record each file's progress in this SQLite journal (batch mode)")
+    parser_arg.add_argument("--resume", action="store_true",
+                            help="Skip files the --journal shows as done or quarantined; retry failed and "
+                                 "interrupted ones")
+    parser_arg.add_argument("--profile", help="Write per-stage timings of a single conversion to this JSON file")
+    parser_arg.add_argument("--profile-memory", action="store_true",
+                            help="Also trace peak memory per stage in the --profile report (slower)")
+    parser_arg.add_argument("--metrics", help="Write cumulative stage metrics of a batch as a Prometheus text file")
+    args = parser_arg.parse_args(argv)
+
+    if not args.pdf and not args.file_list:
+        parser_arg.error("at least one PDF, directory, glob or --file-list is required")
+    if args.resume and not args.journal:
+        parser_arg.error("--resume needs the --journal of the run to resume")
+    if args.engine == "words" and args.backend != DEFAULT_BACKEND:
+        parser_arg.error(f"--engine words needs character positions, which only the {DEFAULT_BACKEND} backend has")
+    if _is_batch(args):
+        if args.output:
+            parser_arg.error("--output applies to a single PDF; use --output-dir in batch mode")
+        if args.profile:
+            parser_arg.error("--profile applies to a single PDF; use --metrics in batch mode")
+        return run_batch(args)
+
+    from orders_converter.io.extraction_cache import ExtractionCache
+    from orders_converter.pipeline import convert_pdf_to_excel
+    from orders_converter.utils.profiling import Profiler
+
+    pdf_path = args.pdf[0]
+    if args.triage:
+        from orders_converter.triage import triage_pdf
+
+        triaged = triage_pdf(pdf_path)
+        if not triaged.convertible:
+            print(f"Quarantined {pdf_path}: {triaged.reason}. Exiting.")
+            return 1
+    out_path = args.output or os.path.splitext(pdf_path)[0] + "." + args.format
+    cache_dir = _cache_dir(args)
+    cache = ExtractionCache(cache_dir) if cache_dir else None
+    profiler = Profiler(memory=args.profile_memory) if args.profile else None
+    try:
+        with profiler or nullcontext():
+            meta, row_count = convert_pdf_to_excel(pdf_path, out_path, page_jobs=args.page_jobs, cache=cache,
+                                                   engine=args.engine, backend=args.backend,
+                                                   memory_budget_mb=args.memory_budget)
+    except ValueError as e:
+        print(f"{e} Exiting.")
+        return 1
+    finally:
+        if cache is not None:
+            cache.close()
+        if profiler is not None:
+            profiler.write_json(args.profile)
+            print(f"Profile written to: {args.profile}")
     print("Header Meta:")
     for k, v in meta.items():
         print(f"  {k}: {v}")
-    print(f"Extracted {len(rows)} table rows.")
-
-    if not rows:
-        print("No table rows found. Exiting.")
-        return
-    df = pd.DataFrame(rows[1:], columns=rows[0]) if len(rows) > 1 else pd.DataFrame()
-    out_path = args.output or os.path.splitext(args.pdf)[0] + ".xlsx"
-    write_order_excel(df, meta, out_path)
-    print(f"Excel file written to: {out_path}")
+    print(f"Extracted {row_count} table rows.")
+    print(f"Output written to: {out_path}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Single-pass document model shared by header and table extraction.
+"""
+
+import gc
+import logging
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from orders_converter.io.backends import (DEFAULT_BACKEND, TEXT_X_TOLERANCE, TEXT_Y_TOLERANCE,  # noqa: F401
+                                          PdfBuffer, PdfSource, describe_source, is_path, open_backend)
+from orders_converter.utils.memory import current_rss_mb
+from orders_converter.utils.profiling import span
+
+# Pages whose parsed objects a document keeps at once: the header page,
+# which meta and header detection both read, and the page being parsed.
+DEFAULT_PAGE_WINDOW = 2
+
+
+# Text-showing operators in a content stream: an array of literal strings and
+# kerning offsets before TJ, or a single literal before Tj, ' or ".
+SHOW_TEXT_PATTERN = re.compile(rb"\[((?:[^\]\\]|\\.)*)\]\s*TJ|\(((?:[^)\\]|\\.)*)\)\s*(?:Tj|'|\")", re.S)
+LITERAL_PATTERN = re.compile(rb"\(((?:[^)\\]|\\.)*)\)", re.S)
+ESCAPE_PATTERN = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+def _unescape(literal: bytes) -> bytes:
+    def replace(match):
+        code = match.group(1)
+        if code[:1].isdigit():
+            return bytes([int(code, 8) & 0xFF])
+        return ESCAPES.get(code, code)
+    return ESCAPE_PATTERN.sub(replace, literal)
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int, backend: str = DEFAULT_BACKEND) -> List[str]:
+    """Worker entry point: lays out pages [start, stop) of a PDF."""
+    opened = open_backend(pdf_path, backend)
+    try:
+        texts = []
+        for i in range(start, stop):
+            texts.append(opened.page_text(i))
+            opened.release(i)
+        return texts
+    finally:
+        opened.close()
+
+
+def _page_ranges(page_count: int, chunks: int) -> List[Tuple[int, int]]:
+    """Splits [0, page_count) into at most `chunks` contiguous ranges."""
+    chunks = max(1, min(chunks, page_count))
+    size, extra = divmod(page_count, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+class PurchaseOrderDocument:
+    """
+    An open purchase-order PDF whose page text is laid out at most once.
+
+    `source` is a path, or the PDF's bytes, a buffer, an mmap or a binary
+    file object (see io.backends.PdfBuffer), read without a temporary file
+    or a copy. The PDF is opened when the object is created, and each page's
+    text is cached the first time it is requested, so header meta, header
+    detection and row extraction can all run from one instance without
+    re-parsing.
+
+    cache_text=False is for single forward passes: only the text of the
+    page_window pages still in use is kept, so the header page is still laid
+    out once. The backend's parsed objects (layout, characters) are only
+    ever kept for the page_window most recently read pages. `backend` names
+    the PDF library pages are read with (see io.backends.BACKENDS).
+    `on_page`, if given, is called as on_page(pages_read, page_count) the
+    first time each page's text or characters are read; an exception it
+    raises aborts the read. With memory_budget_mb, the process's RSS is
+    checked after every page; over budget, the document degrades instead of
+    growing: it keeps one page, stops caching text and collects garbage.
+    """
+
+    def __init__(self, source: Union[PdfSource, PdfBuffer], cache_text: bool = True, backend: str = DEFAULT_BACKEND,
+                 on_page: Optional[Callable[[int, int], None]] = None,
+                 page_window: int = DEFAULT_PAGE_WINDOW, memory_budget_mb: Optional[float] = None):
+        # A name for logs; only path sources can be reopened by worker processes.
+        self.pdf_path = describe_source(source)
+        self._path = self.pdf_path if is_path(source) else None
+        self._owned_buffer = None
+        if self._path is None and not isinstance(source, PdfBuffer):
+            source = self._owned_buffer = PdfBuffer(source)
+        self.cache_text = cache_text
+        self.backend = backend
+        self.on_page = on_page
+        self.page_window = max(1, page_window)
+        self.memory_budget_mb = memory_budget_mb
+        self.over_budget = False
+        self._flushed_at_mb = 0.0
+        self._pages_read: Set[int] = set()
+        self._live_pages: "OrderedDict[int, None]" = OrderedDict()
+        with span("open", backend=backend) as s:
+            try:
+                self._backend = open_backend(self._path or source, backend)
+            except Exception:
+                if self._owned_buffer is not None:
+                    self._owned_buffer.close()
+                raise
+            s.set(pages=self._backend.page_count)
+        self._page_texts: Dict[int, str] = {}
+
+    def __enter__(self) -> "PurchaseOrderDocument":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def page_count(self) -> int:
+        return self._backend.page_count
+
+    def _page_read(self, index: int) -> None:
+        if self.on_page is not None and index not in self._pages_read:
+            self._pages_read.add(index)
+            self.on_page(len(self._pages_read), self.page_count)
+
+    def _touch(self, index: int) -> None:
+        """Marks a page's objects as in use, releasing pages that fall out of the window."""
+        self._live_pages[index] = None
+        self._live_pages.move_to_end(index)
+        if self.memory_budget_mb is not None:
+            self._check_budget()
+        while len(self._live_pages) > self.page_window:
+            released = self._live_pages.popitem(last=False)[0]
+            self._backend.release(released)
+            if not self.cache_text:
+                self._page_texts.pop(released, None)
+
+    def _check_budget(self) -> None:
+        rss = current_rss_mb()
+        # Freed memory is rarely handed back to the OS, so once over budget
+        # only flush again if RSS has grown by a tenth of the budget since.
+        if rss is None or rss <= max(self.memory_budget_mb, self._flushed_at_mb):
+            return
+        if not self.over_budget:
+            logging.warning(f"RSS {rss:.0f} MB is over the {self.memory_budget_mb:.0f} MB budget for "
+                            f"{self.pdf_path}; keeping one page at a time and no page text.")
+            self.over_budget = True
+        with span("memory_flush", rss_mb=round(rss, 1)):
+            self.page_window = 1
+            self.cache_text = False
+            self._page_texts.clear()
+            gc.collect()
+        self._flushed_at_mb = (current_rss_mb() or rss) + self.memory_budget_mb * 0.1
+
+    def page_text(self, index: int) -> str:
+        """Returns the laid-out text of the page at a zero-based index."""
+        text = self._page_texts.get(index)
+        if text is None:
+            with span("page_text", page=index + 1) as s:
+                text = self._backend.page_text(index)
+                s.set(chars=len(text))
+            self._touch(index)
+            # Streaming callers read each page once, so they opt out of
+            # keeping every page's text alive for the life of the document.
+            if self.cache_text or index in self._live_pages:
+                self._page_texts[index] = text
+            logging.debug(f"Extracted text for page {index + 1} ({len(text)} chars).")
+            self._page_read(index)
+        return text
+
+    def load_all_text(self, jobs: int = 1) -> None:
+        """
+        Lays out every page that is not cached yet.
+
+        With jobs > 1 the pages are split into contiguous ranges that worker
+        processes lay out in parallel; results are merged back in page order,
+        so every caller sees exactly the text the serial path would produce.
+        """
+        missing = self.page_count - len(self._page_texts)
+        # Workers reopen the PDF by path; in-memory PDFs are laid out here.
+        if jobs <= 1 or missing < 2 or self._path is None:
+            for index in range(self.page_count):
+                self.page_text(index)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # A few ranges per worker keeps the pool busy when pages differ in cost.
+        ranges = _page_ranges(self.page_count, jobs * 2)
+        logging.info(f"Extracting {self.page_count} pages in {len(ranges)} ranges with {jobs} workers.")
+        with span("load_all_text", pages=self.page_count, jobs=jobs), \
+                ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as executor:
+            futures = [executor.submit(_extract_page_range, self._path, start, stop, self.backend) for start, stop in ranges]
+            for (start, _), future in zip(ranges, futures):
+                for offset, text in enumerate(future.result()):
+                    self._page_texts.setdefault(start + offset, text)
+                    self._page_read(start + offset)
+
+    def page_height(self, index: int) -> float:
+        return self._backend.page_size(index)[1]
+
+    def region_text(self, index: int, bbox: Tuple[float, float, float, float]) -> str:
+        """
+        Lays out only the part of a page inside bbox, given as (x0, top, x1,
+        bottom) fractions of the page size. Region text is not cached.
+        """
+        with span("region_text", page=index + 1) as s:
+            width, height = self._backend.page_size(index)
+            x0, top, x1, bottom = bbox
+            text = self._backend.region_text(index, (x0 * width, top * height, x1 * width, bottom * height))
+            s.set(chars=len(text))
+        self._touch(index)
+        return text
+
+    def page_chars(self, index: int) -> List[Dict[str, Any]]:
+        """
+        Returns the characters of the page at a zero-based index with their
+        positions (x0, x1, top, bottom), without laying them out as text.
+        """
+        with span("page_chars", page=index + 1) as s:
+            chars = self._backend.page_chars(index)
+            s.set(chars=len(chars))
+        self._touch(index)
+        self._page_read(index)
+        return chars
+
+    def page_content_strings(self, index: int) -> str:
+        """
+        Returns the literal strings shown by the page's content stream, in
+        drawing order and separated by spaces, without interpreting fonts or
+        laying anything out. Far cheaper than page_text, but blind to
+        hex-encoded text (e.g. CID fonts) and empty for backends without
+        content stream access, so it only hints at what a page holds.
+        """
+        from pdfminer.pdftypes import resolve1
+
+        with span("page_strings", page=index + 1) as s:
+            contents = resolve1(self._backend.content_streams(index)) or []
+            data = b"\n".join(resolve1(stream).get_data() for stream in contents)
+            shown = []
+            for match in SHOW_TEXT_PATTERN.finditer(data):
+                if match.group(1) is not None:
+                    shown.append(b"".join(_unescape(m.group(1)) for m in LITERAL_PATTERN.finditer(match.group(1))))
+                else:
+                    shown.append(_unescape(match.group(2)))
+            text = " ".join(part.decode("latin-1") for part in shown)
+            s.set(chars=len(text))
+        return text
+
+    def iter_page_texts(self, reverse: bool = False) -> Iterator[Tuple[int, str]]:
+        """Yields (page_number, text) pairs with 1-based page numbers."""
+        indices = range(self.page_count)
+        if reverse:
+            indices = reversed(indices)
+        for index in indices:
+            yield index + 1, self.page_text(index)
+
+    def close(self) -> None:
+        self._backend.close()
+        if self._owned_buffer is not None:
+            self._owned_buffer.close()
+
+
+DocumentSource = Union[PdfSource, PdfBuffer, PurchaseOrderDocument]
+
+
+@contextmanager
+def open_document(source: DocumentSource, cache_text: bool = True,
+                  backend: str = DEFAULT_BACKEND) -> Iterator[PurchaseOrderDocument]:
+    """
+    Yields a PurchaseOrderDocument for a path, any other PdfSource or an
+    already open document.
+
+    Documents passed in by the caller are left open (and keep their own
+    caching policy and backend); documents opened here are closed when the
+    block exits.
+    """
+    if isinstance(source, PurchaseOrderDocument):
+        yield source
+        return
+    with PurchaseOrderDocument(source, cache_text=cache_text, backend=backend) as document:
+        yield document
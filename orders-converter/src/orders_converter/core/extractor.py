@@ -1,3 +1,257 @@
 """
-Extractor utilities for advanced PDF parsing (placeholder).
-""" 
\ No newline at end of file
+Coordinate-based table extraction (the "words" engine).
+
+Instead of laying each page out as text and recovering columns with a
+pattern, this engine reads the page's characters with their positions once and
+works on them in bulk with NumPy: characters are grouped into words and
+lines by their coordinates, and words are binned into the columns given by
+the extent of the header labels. A line is an item when its Qty, code, Rate and Amount cells
+are filled; description lines that wrap are merged into the item above them
+by vertical position.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from pdfplumber.utils.text import LIGATURES
+
+from orders_converter.core.document import (DocumentSource, PurchaseOrderDocument, TEXT_X_TOLERANCE,
+                                            TEXT_Y_TOLERANCE, open_document)
+from orders_converter.core.parser import CANONICAL_HEADERS, TABLE_COLUMNS
+from orders_converter.core.scanner import (DEV_CODE_PATTERN, DIGITS_PATTERN, HTS_PATTERN, MONEY_PATTERN,
+                                           SKU_PATTERN, UPC_PATTERN)
+from orders_converter.utils.profiling import span
+
+# Cells every item line fills; Brand and Description may be blank. Each must
+# be well-formed as in parser.ITEM_PATTERN: Qty digits, 12-digit UPC, 10-digit
+# HTS Code, Rate and Amount money.
+REQUIRED_COLUMNS = ("Qty", "Item_SKU", "Dev_Code", "UPC", "HTS_Code", "Rate", "Amount")
+CELL_PATTERNS = {
+    "Qty": DIGITS_PATTERN, "Item_SKU": SKU_PATTERN, "Dev_Code": DEV_CODE_PATTERN, "UPC": UPC_PATTERN,
+    "HTS_Code": HTS_PATTERN, "Rate": MONEY_PATTERN, "Amount": MONEY_PATTERN,
+}
+# Cells a wrapped continuation line may never fill.
+ITEM_ONLY_COLUMNS = ("Qty", "Rate", "Amount")
+# A wrapped line starts within this many line heights below the line above it.
+WRAP_LINE_GAP = 2.0
+
+_COLUMN_INDEX = {name: i for i, name in enumerate(TABLE_COLUMNS)}
+
+
+class ColumnLayout(NamedTuple):
+    """Horizontal extent of each header label, in TABLE_COLUMNS order, and
+    the bottom edge of the header line."""
+    x0: np.ndarray
+    x1: np.ndarray
+    bottom: float
+
+
+class _Line(NamedTuple):
+    top: float
+    bottom: float
+    cells: Dict[int, str]
+
+
+class _PageWords:
+    """
+    A page's words as coordinate arrays, grouped into lines.
+
+    Words are assembled from the page's characters with NumPy rather than
+    pdfplumber's per-character word extraction, using the same rules: a new
+    word starts at whitespace, at a new line, or where the horizontal gap to
+    the previous character exceeds the x tolerance.
+    """
+
+    def __init__(self, chars: List[Dict[str, Any]]):
+        n = len(chars)
+        text = [LIGATURES.get(c["text"], c["text"]) for c in chars]
+        x0 = np.fromiter((c["x0"] for c in chars), float, n)
+        x1 = np.fromiter((c["x1"] for c in chars), float, n)
+        top = np.fromiter((c["top"] for c in chars), float, n)
+        bottom = np.fromiter((c["bottom"] for c in chars), float, n)
+        blank = np.fromiter((t.isspace() for t in text), bool, n)
+
+        # Characters whose tops are within the tolerance of the previous
+        # character's (in top order) share a line.
+        by_top = np.argsort(top, kind="stable")
+        char_line = np.empty(n, dtype=np.int64)
+        char_line[by_top] = np.concatenate(([0], np.cumsum(np.diff(top[by_top]) > TEXT_Y_TOLERANCE)))
+
+        order = np.lexsort((x0, char_line))
+        line_o, blank_o = char_line[order], blank[order]
+        boundary = np.concatenate(([True], (line_o[1:] != line_o[:-1])
+                                   | (x0[order][1:] > x1[order][:-1] + TEXT_X_TOLERANCE)
+                                   | blank_o[1:] | blank_o[:-1]))
+        runs = np.append(np.flatnonzero(boundary), n)
+        starts = np.flatnonzero(boundary & ~blank_o)
+        ends = runs[np.searchsorted(runs, starts, side="right")]
+
+        ordered = order.tolist()
+        self.texts = ["".join([text[i] for i in ordered[a:b]]) for a, b in zip(starts.tolist(), ends.tolist())]
+        if starts.size:
+            word_runs = np.searchsorted(runs, starts)
+            self.x0 = np.minimum.reduceat(x0[order], runs[:-1])[word_runs]
+            self.x1 = np.maximum.reduceat(x1[order], runs[:-1])[word_runs]
+            self.top = np.minimum.reduceat(top[order], runs[:-1])[word_runs]
+            self.bottom = np.maximum.reduceat(bottom[order], runs[:-1])[word_runs]
+        else:
+            self.x0 = self.x1 = self.top = self.bottom = np.empty(0)
+        self.line = line_o[starts]
+
+    def line_words(self, line: int) -> List[int]:
+        """Indices of the words on a line, left to right."""
+        return np.flatnonzero(self.line == line).tolist()
+
+
+def find_layout(page: _PageWords) -> Optional[ColumnLayout]:
+    """
+    Locates the header line ("Qty", "Item SKU", ... "Amount") on a page and
+    returns the extent of its labels, or None if the page has no header.
+    """
+    candidates = {page.line[i] for i, text in enumerate(page.texts) if text == "Qty"}
+    for line in sorted(candidates):
+        indices = page.line_words(line)
+        texts = [page.texts[i] for i in indices]
+        x0, x1 = [], []
+        pos = 0
+        for label in CANONICAL_HEADERS:
+            parts = label.split()
+            while pos + len(parts) <= len(texts) and texts[pos:pos + len(parts)] != parts:
+                pos += 1
+            if pos + len(parts) > len(texts):
+                break
+            x0.append(page.x0[indices[pos]])
+            x1.append(page.x1[indices[pos + len(parts) - 1]])
+            pos += len(parts)
+        else:
+            return ColumnLayout(np.array(x0), np.array(x1), float(page.bottom[indices].max()))
+    return None
+
+
+def _assign_columns(page: _PageWords, layout: ColumnLayout) -> np.ndarray:
+    """
+    Bins every word into a column: the header label it overlaps most, or for
+    words overlapping none (long descriptions) the nearest label to its left.
+    """
+    overlap = np.minimum(page.x1[:, None], layout.x1[None, :]) - np.maximum(page.x0[:, None], layout.x0[None, :])
+    left = np.clip(np.searchsorted(layout.x0, page.x0, side="right") - 1, 0, None)
+    return np.where(overlap.max(axis=1) > 0, overlap.argmax(axis=1), left)
+
+
+def _lines(page: _PageWords, column: np.ndarray, below: float) -> List[_Line]:
+    """Builds the cell text of every line starting below the given y, top to bottom."""
+    keep = np.flatnonzero(page.top > below)
+    if not keep.size:
+        return []
+    order = keep[np.lexsort((page.x0[keep], column[keep], page.line[keep]))]
+    lines_sorted = page.line[order]
+    columns_sorted = column[order]
+    # Boundaries of runs of words sharing a (line, column) cell.
+    cell_starts = np.flatnonzero(np.concatenate((
+        [True], (lines_sorted[1:] != lines_sorted[:-1]) | (columns_sorted[1:] != columns_sorted[:-1]))))
+    cell_ends = np.append(cell_starts[1:], order.size)
+    line_starts = np.flatnonzero(np.concatenate(([True], lines_sorted[1:] != lines_sorted[:-1])))
+    tops = np.minimum.reduceat(page.top[order], line_starts)
+    bottoms = np.maximum.reduceat(page.bottom[order], line_starts)
+
+    cell_lines = np.searchsorted(line_starts, cell_starts, side="right") - 1
+
+    lines = [_Line(float(t), float(b), {}) for t, b in zip(tops, bottoms)]
+    for start, end, line_no in zip(cell_starts.tolist(), cell_ends.tolist(), cell_lines.tolist()):
+        text = " ".join(page.texts[i] for i in order[start:end].tolist())
+        lines[line_no].cells[int(columns_sorted[start])] = text
+    return lines
+
+
+def _is_item(cells: Dict[int, str]) -> bool:
+    for name in REQUIRED_COLUMNS:
+        cell = cells.get(_COLUMN_INDEX[name])
+        if not cell or CELL_PATTERNS[name].fullmatch(cell) is None:
+            return False
+    return True
+
+
+def _is_continuation(cells: Dict[int, str]) -> bool:
+    return not any(_COLUMN_INDEX[name] in cells for name in ITEM_ONLY_COLUMNS)
+
+
+def _to_row(cells: Dict[int, str]) -> List[str]:
+    row = [cells.get(i, "") for i in range(len(TABLE_COLUMNS))]
+    for name in ("Rate", "Amount"):
+        i = _COLUMN_INDEX[name]
+        row[i] = row[i].replace("$", "").replace(",", "")
+    return row
+
+
+def _iter_word_rows(document: PurchaseOrderDocument) -> Iterator[List[str]]:
+    """
+    Yields rows page by page. The column layout of the last header seen is
+    reused on pages that do not repeat the header.
+    """
+    layout: Optional[ColumnLayout] = None
+    # The last item is held back until the line after it shows it is
+    # complete, which may be the first line of the next page.
+    pending: Optional[Dict[int, str]] = None
+    count = 0
+    for index in range(document.page_count):
+        page = _PageWords(document.page_chars(index))
+        with span("place_words", page=index + 1) as s:
+            page_layout = find_layout(page)
+            if page_layout is None and layout is None:
+                continue
+            layout = page_layout or layout
+            # Without a header on the page, its top lines are page furniture,
+            # not the continuation of an item from the previous page.
+            previous_bottom = page_layout.bottom if page_layout is not None else None
+            below = page_layout.bottom if page_layout is not None else float("-inf")
+
+            page_rows = []
+            for line in _lines(page, _assign_columns(page, layout), below):
+                adjacent = (previous_bottom is not None
+                            and line.top - previous_bottom <= WRAP_LINE_GAP * (line.bottom - line.top))
+                if _is_item(line.cells):
+                    if pending is not None:
+                        page_rows.append(_to_row(pending))
+                    pending = dict(line.cells)
+                elif pending is not None and adjacent and _is_continuation(line.cells):
+                    for column, text in line.cells.items():
+                        pending[column] = f"{pending[column]} {text}" if pending.get(column) else text
+                else:
+                    if pending is not None:
+                        page_rows.append(_to_row(pending))
+                        pending = None
+                    previous_bottom = None
+                    continue
+                previous_bottom = line.bottom
+            s.set(rows=len(page_rows))
+        count += len(page_rows)
+        yield from page_rows
+    if pending is not None:
+        count += 1
+        yield _to_row(pending)
+    logging.info(f"Placed {count} items from word positions.")
+
+
+def _has_header(document: PurchaseOrderDocument) -> bool:
+    return any(find_layout(_PageWords(document.page_chars(i))) is not None for i in range(document.page_count))
+
+
+def iter_table_rows(pdf: DocumentSource) -> Iterator[List[str]]:
+    """Yields table rows (without the header row), one page at a time."""
+    with open_document(pdf, cache_text=False) as document:
+        yield from _iter_word_rows(document)
+
+
+def extract_table_rows(pdf: DocumentSource) -> List[List[str]]:
+    """
+    Returns the header row followed by every table row, or [] if no page has
+    a table header.
+    """
+    with open_document(pdf) as document:
+        rows = list(_iter_word_rows(document))
+        if not rows and not _has_header(document):
+            logging.warning("Could not find a header row in the PDF. Aborting table extraction.")
+            return []
+    return [list(TABLE_COLUMNS)] + rows
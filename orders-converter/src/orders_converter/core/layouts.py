@@ -0,0 +1,194 @@
+"""
+PO layout profiles and the registry that dispatches a PDF to one.
+
+A LayoutProfile describes one vendor's PO layout to the text engine: the
+header labels as printed and the table column each one fills, the item
+grammar (a precompiled scanner plus the conversion of its matches to rows in
+parser.TABLE_COLUMNS order), the lines to skip, and how to read the header
+meta and the order total.
+
+LAYOUTS.detect(text) fingerprints a page, the labels on its header line plus
+the anchor strings it contains, and looks the fingerprint up in a cache, so
+only the first PO of each fingerprint is matched against the profiles.
+Computing a fingerprint is one label-table lookup per word and one pass of a
+combined anchor pattern, however many layouts are registered.
+"""
+
+import logging
+import re
+from typing import Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+from orders_converter.core.scanner import ItemMatch
+
+# A line is a header line when it holds at least this many known labels.
+MIN_HEADER_LABELS = 4
+
+
+class MetaRegions(NamedTuple):
+    """
+    Where the header meta lives, for region-targeted extraction. `header` is
+    the page-1 band holding the header fields as (x0, top, x1, bottom)
+    fractions of the page size.
+    """
+    header: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 0.3)
+
+
+class LayoutProfile(NamedTuple):
+    name: str
+    # Header labels as printed, left to right.
+    header_labels: Tuple[str, ...]
+    # The TABLE_COLUMNS column each label fills, or None for columns that
+    # are not carried over.
+    columns: Tuple[Optional[str], ...]
+    # Strings on the first page that set this layout apart from others.
+    anchors: Tuple[str, ...]
+    # Finds the items in the joined content lines of a page.
+    scan: Callable[[str], Iterator[ItemMatch]]
+    # Turns a scanned item's groups into a row in TABLE_COLUMNS order.
+    to_row: Callable[[Tuple[str, ...]], List[str]]
+    # Matches where an item can start; text before it is never kept
+    # across a page break.
+    item_prefix: Pattern
+    # Reads the header fields (parser.HEADER_FIELDS) from page text.
+    header_fields: Callable[[str], Dict[str, str]]
+    # Finds the order total; group 1 is the amount.
+    total_pattern: Pattern
+    # Lines containing any of these are page furniture, not items.
+    skip_markers: Tuple[str, ...] = ()
+    # Lines matching this in full are page furniture too, such as page numbers.
+    skip_lines: Optional[Pattern] = None
+
+
+class Fingerprint(NamedTuple):
+    labels: Tuple[str, ...]
+    anchors: FrozenSet[str]
+
+
+class LayoutMatch(NamedTuple):
+    profile: LayoutProfile
+    # The header line as laid out, or "" if the text had none.
+    header_line: str
+    fingerprint: Fingerprint
+
+
+def regex_grammar(pattern: Pattern) -> Callable[[str], Iterator[ItemMatch]]:
+    """An item scanner from a regex whose groups are the item's fields."""
+    def scan(text: str) -> Iterator[ItemMatch]:
+        for match in pattern.finditer(text):
+            yield ItemMatch(match.groups(), match.start(), match.end())
+    return scan
+
+
+def pattern_fields(patterns: Dict[str, Pattern]) -> Callable[[str], Dict[str, str]]:
+    """A header_fields reader from one regex per field (group 1 is the value; "N/A" if absent)."""
+    def header_fields(text: str) -> Dict[str, str]:
+        fields = {}
+        for name, pattern in patterns.items():
+            match = pattern.search(text)
+            fields[name] = match.group(1).strip() if match else "N/A"
+        return fields
+    return header_fields
+
+
+class LayoutRegistry:
+    """Registered LayoutProfiles with a per-fingerprint dispatch cache."""
+
+    def __init__(self):
+        self.profiles: List[LayoutProfile] = []
+        self._labels: Dict[Tuple[str, ...], str] = {}
+        self._columns: Dict[str, Optional[str]] = {}
+        self._max_label_words = 0
+        self._anchor_pattern: Optional[Pattern] = None
+        self._cache: Dict[Fingerprint, Optional[LayoutProfile]] = {}
+
+    def register(self, profile: LayoutProfile) -> None:
+        """Adds a layout; raises ValueError on a duplicate name or a label without a column."""
+        if any(p.name == profile.name for p in self.profiles):
+            raise ValueError(f"A layout named {profile.name!r} is already registered.")
+        if len(profile.header_labels) != len(profile.columns):
+            raise ValueError(f"Layout {profile.name!r} needs one column per header label.")
+        self.profiles.append(profile)
+        self._rebuild()
+
+    def unregister(self, name: str) -> None:
+        self.profiles = [p for p in self.profiles if p.name != name]
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._labels = {}
+        self._columns = {}
+        for profile in self.profiles:
+            for label, column in zip(profile.header_labels, profile.columns):
+                self._labels.setdefault(tuple(label.split()), label)
+                self._columns.setdefault(label, column)
+        self._max_label_words = max((len(words) for words in self._labels), default=0)
+        # Longest first, so an anchor is never shadowed by its own prefix.
+        anchors = sorted({a for p in self.profiles for a in p.anchors}, key=len, reverse=True)
+        self._anchor_pattern = re.compile("|".join(map(re.escape, anchors))) if anchors else None
+        self._cache = {}
+
+    def header_labels(self, line: str) -> List[str]:
+        """The known labels on a line, left to right (longest label wins)."""
+        words = line.split()
+        found = []
+        i = 0
+        while i < len(words):
+            for size in range(min(self._max_label_words, len(words) - i), 0, -1):
+                label = self._labels.get(tuple(words[i:i + size]))
+                if label is not None:
+                    found.append(label)
+                    i += size
+                    break
+            else:
+                i += 1
+        return found
+
+    def column_for(self, label: str) -> Optional[str]:
+        return self._columns.get(label)
+
+    def fingerprint(self, text: str) -> Tuple[Fingerprint, str]:
+        """Returns the fingerprint of a page's text and its header line ("" if none)."""
+        labels: Tuple[str, ...] = ()
+        header_line = ""
+        for line in text.split("\n"):
+            found = self.header_labels(line)
+            if len(found) >= MIN_HEADER_LABELS:
+                labels, header_line = tuple(found), line.strip()
+                break
+        anchors = frozenset(self._anchor_pattern.findall(text)) if self._anchor_pattern else frozenset()
+        return Fingerprint(labels, anchors), header_line
+
+    def detect(self, text: str) -> Optional[LayoutMatch]:
+        """Returns the layout of a page's text, or None if no registered layout fits."""
+        fingerprint, header_line = self.fingerprint(text)
+        if fingerprint not in self._cache:
+            self._cache[fingerprint] = self._match(fingerprint)
+        profile = self._cache[fingerprint]
+        return LayoutMatch(profile, header_line, fingerprint) if profile is not None else None
+
+    def _match(self, fingerprint: Fingerprint) -> Optional[LayoutProfile]:
+        """
+        Picks the profile sharing the most header labels with the
+        fingerprint, preferring an exact label match and then the most anchors
+        found. Without a header line, anchors alone decide.
+        """
+        best, best_score = None, None
+        labels = set(fingerprint.labels)
+        for profile in self.profiles:
+            shared = len(labels.intersection(profile.header_labels))
+            anchors = len(fingerprint.anchors.intersection(profile.anchors))
+            if fingerprint.labels and shared < MIN_HEADER_LABELS:
+                continue
+            if not fingerprint.labels and not anchors:
+                continue
+            score = (fingerprint.labels == profile.header_labels, shared, anchors)
+            if best_score is None or score > best_score:
+                best, best_score = profile, score
+        if best is not None:
+            logging.info(f"Layout {best.name!r} matches header labels {list(fingerprint.labels)} "
+                         f"and anchors {sorted(fingerprint.anchors)}.")
+        return best
+
+
+# The registry the parser dispatches with; parser registers the standard layout.
+LAYOUTS = LayoutRegistry()
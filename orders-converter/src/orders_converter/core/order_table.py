@@ -0,0 +1,152 @@
+"""
+Typed line items.
+
+Rows come out of the PDF as nine strings each. LineItem holds one item with
+its quantity and money already parsed (money as integer cents, so no float
+rounding), and OrderTable holds many items column by column: the integer
+columns in compact arrays that NumPy and pandas can use without copying.
+"""
+
+import re
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MONEY_TEXT_PATTERN = re.compile(r"(\d+)(?:\.(\d{1,2}))?")
+
+TEXT_FIELDS = ("item_sku", "dev_code", "upc", "hts_code", "brand", "description")
+
+# Column names of OrderTable.to_dataframe(); money columns are in cents.
+DATAFRAME_COLUMNS = ["Qty", "Item_SKU", "Dev_Code", "UPC", "HTS_Code", "Brand", "Description",
+                     "Rate_Cents", "Amount_Cents"]
+
+
+def parse_cents(text: str) -> int:
+    """Parses "1,234.5", "$8.50" or "12" into integer cents; raises ValueError otherwise."""
+    match = MONEY_TEXT_PATTERN.fullmatch(text.replace("$", "").replace(",", ""))
+    if not match:
+        raise ValueError(f"Not an amount: {text!r}")
+    return int(match.group(1)) * 100 + int((match.group(2) or "0").ljust(2, "0"))
+
+
+def format_cents(cents: int) -> str:
+    """Formats cents the way extracted rows carry money: "1234.50"."""
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+class LineItem:
+    """One order line with integer quantity and money in cents."""
+
+    __slots__ = ("qty", "item_sku", "dev_code", "upc", "hts_code", "brand", "description",
+                 "rate_cents", "amount_cents")
+
+    def __init__(self, qty: int, item_sku: str, dev_code: str, upc: str, hts_code: str, brand: str,
+                 description: str, rate_cents: int, amount_cents: int):
+        self.qty = qty
+        self.item_sku = item_sku
+        self.dev_code = dev_code
+        self.upc = upc
+        self.hts_code = hts_code
+        self.brand = brand
+        self.description = description
+        self.rate_cents = rate_cents
+        self.amount_cents = amount_cents
+
+    @classmethod
+    def from_row(cls, row: Sequence[str]) -> "LineItem":
+        """Parses an extracted row (TABLE_COLUMNS order); raises ValueError on bad numbers."""
+        qty, item_sku, dev_code, upc, hts_code, brand, description, rate, amount = row
+        if not qty.isdigit():
+            raise ValueError(f"Not a quantity: {qty!r}")
+        return cls(int(qty), item_sku, dev_code, upc, hts_code, brand, description,
+                   parse_cents(rate), parse_cents(amount))
+
+    def to_row(self) -> List[str]:
+        """The item as an extracted row of strings, in TABLE_COLUMNS order."""
+        return [str(self.qty), self.item_sku, self.dev_code, self.upc, self.hts_code, self.brand,
+                self.description, format_cents(self.rate_cents), format_cents(self.amount_cents)]
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, LineItem):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"LineItem({fields})"
+
+
+class OrderTable:
+    """
+    Line items stored by column. Quantities and cents are kept in int64
+    arrays (8 bytes per value instead of a Python string each); the text
+    columns are lists of strings.
+    """
+
+    def __init__(self, items: Iterable[LineItem] = ()):
+        self.qty = array("q")
+        self.rate_cents = array("q")
+        self.amount_cents = array("q")
+        self.text: Dict[str, List[str]] = {name: [] for name in TEXT_FIELDS}
+        self.extend(items)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> "OrderTable":
+        """Builds a table from extracted string rows (without the header row)."""
+        return cls(LineItem.from_row(row) for row in rows)
+
+    def append(self, item: LineItem) -> None:
+        self.qty.append(item.qty)
+        self.rate_cents.append(item.rate_cents)
+        self.amount_cents.append(item.amount_cents)
+        for name, column in self.text.items():
+            column.append(getattr(item, name))
+
+    def extend(self, items: Iterable[LineItem]) -> None:
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self.qty)
+
+    def __getitem__(self, index: int) -> LineItem:
+        text = self.text
+        return LineItem(self.qty[index], text["item_sku"][index], text["dev_code"][index], text["upc"][index],
+                        text["hts_code"][index], text["brand"][index], text["description"][index],
+                        self.rate_cents[index], self.amount_cents[index])
+
+    def __iter__(self) -> Iterator[LineItem]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def rows(self) -> Iterator[List[str]]:
+        """Yields the items as extracted string rows, in TABLE_COLUMNS order."""
+        for item in self:
+            yield item.to_row()
+
+    @property
+    def total_cents(self) -> int:
+        return sum(self.amount_cents)
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        Returns the items as a DataFrame with DATAFRAME_COLUMNS: int64 Qty,
+        Rate_Cents and Amount_Cents are views of this table's arrays (no
+        copy; the table cannot grow while the frame is alive) and the text
+        columns are pandas strings.
+        """
+        import numpy as np
+        import pandas as pd
+
+        def ints(values: array) -> np.ndarray:
+            return np.frombuffer(values, dtype=np.int64) if len(values) else np.empty(0, dtype=np.int64)
+
+        data = {"Qty": ints(self.qty)}
+        for column, name in zip(DATAFRAME_COLUMNS[1:7], TEXT_FIELDS):
+            data[column] = pd.array(self.text[name], dtype="string")
+        data["Rate_Cents"] = ints(self.rate_cents)
+        data["Amount_Cents"] = ints(self.amount_cents)
+        return pd.DataFrame(data, copy=False)
+
@@ -1,235 +1,430 @@
 import re
 import logging
-from typing import List, Dict, Any
-
-import pdfplumber
-
-
-def extract_header_meta(pdf_path: str) -> Dict[str, Any]:
-    """Extracts metadata from the first page of the PDF."""
-    with pdfplumber.open(pdf_path) as pdf:
-        if not pdf.pages:
-            return {}
-        first_page = pdf.pages[0]
-        text = first_page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-
-        po_number_match = re.search(r'PO ?(\d{6,})', text)
-        ship_by_date_match = re.search(r'SHIP COMPLETE BY DATE:\s*(\d{1,2}/\d{1,2}/\d{4})', text)
-        payment_terms_match = re.search(r'PAYMENT TERMS:\s*(.*)', text)
-
-        vendor_number = "N/A"
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            # Case where number is on the same line, e.g. "Vendor # 12345"
-            if "Vendor #" in line:
-                match = re.search(r'Vendor #\s*(\d+)', line)
+from typing import List, Dict, Any, Iterator, Optional, Pattern, Tuple
+
+from orders_converter.core.document import DocumentSource, PurchaseOrderDocument, open_document
+from orders_converter.core.layouts import LAYOUTS, LayoutMatch, LayoutProfile, MetaRegions
+from orders_converter.core.order_table import LineItem, OrderTable
+from orders_converter.core.scanner import scan_items
+from orders_converter.utils.profiling import span
+
+# Bump when parsing output changes in a way the source fingerprint used by
+# io.extraction_cache cannot see (e.g. a pdfplumber upgrade).
+PARSER_VERSION = "1"
+
+# Header labels as printed on the standard (RuffleButts) PO, and the column
+# names of extracted tables, in table order. Rows of every layout come out
+# in TABLE_COLUMNS order (see core.layouts).
+CANONICAL_HEADERS = [
+    "Qty", "Item SKU", "Dev Code", "UPC", "HTS Code",
+    "Brand", "Description", "Rate", "Amount"
+]
+TABLE_COLUMNS = [
+    "Qty", "Item_SKU", "Dev_Code", "UPC", "HTS_Code",
+    "Brand", "Description", "Rate", "Amount"
+]
+
+# Table extraction engines: "text" lays pages out as text and scans it for
+# items; "words" places positioned words into the header's columns
+# (core.extractor, standard layout only).
+ENGINES = ("text", "words")
+
+
+# Header fields that live in the band above the item table on page 1.
+HEADER_FIELDS = ("po_number", "vendor_number", "ship_by_date", "payment_terms")
+TOTAL_PATTERN = re.compile(r'Total\s+\$(\d{1,3}(?:,\d{3})*\.\d{2})')
+
+DEFAULT_META_REGIONS = MetaRegions()
+
+
+def _header_fields(text: str) -> Dict[str, str]:
+    """Finds the header fields in laid-out text; missing fields are "N/A"."""
+    po_number_match = re.search(r'PO ?(\d{6,})', text)
+    ship_by_date_match = re.search(r'SHIP COMPLETE BY DATE:\s*(\d{1,2}/\d{1,2}/\d{4})', text)
+    payment_terms_match = re.search(r'PAYMENT TERMS:\s*(.*)', text)
+
+    vendor_number = "N/A"
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        # Case where number is on the same line, e.g. "Vendor # 12345"
+        if "Vendor #" in line:
+            match = re.search(r'Vendor #\s*(\d+)', line)
+            if match:
+                vendor_number = match.group(1)
+                break
+            # Case where number is on the line below "Vendor #"
+            elif i + 1 < len(lines):
+                next_line = lines[i+1].strip()
+                # Match a line that starts with digits
+                match = re.match(r'^(\d+)', next_line)
                 if match:
                     vendor_number = match.group(1)
                     break
-                # Case where number is on the line below "Vendor #"
-                elif i + 1 < len(lines):
-                    next_line = lines[i+1].strip()
-                    # Match a line that starts with digits
-                    match = re.match(r'^(\d+)', next_line)
-                    if match:
-                        vendor_number = match.group(1)
-                        break
-
-        total_match = None
-        # Search for Total on the last few pages as it's typically at the end
-        for page in reversed(pdf.pages):
-            page_text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-            total_match = re.search(r'Total\s+\$(\d{1,3}(?:,\d{3})*\.\d{2})', page_text)
+
+    return {
+        "po_number": po_number_match.group(1) if po_number_match else "N/A",
+        "vendor_number": vendor_number,
+        "ship_by_date": ship_by_date_match.group(1) if ship_by_date_match else "N/A",
+        "payment_terms": payment_terms_match.group(1).strip() if payment_terms_match else "N/A",
+    }
+
+
+def _layout_of(text: str) -> LayoutProfile:
+    """The layout page text belongs to, or the standard layout if none fits."""
+    match = LAYOUTS.detect(text)
+    return match.profile if match is not None else STANDARD_LAYOUT
+
+
+def _region_header_fields(document: PurchaseOrderDocument,
+                          regions: MetaRegions) -> Tuple[Dict[str, str], LayoutProfile]:
+    """
+    Reads the header fields from the configured page-1 band only, falling
+    back to the full page text for any field the band does not hold. Also
+    returns the layout, identified from the band.
+    """
+    text = document.region_text(0, regions.header)
+    layout = _layout_of(text)
+    fields = layout.header_fields(text)
+    missing = [name for name in HEADER_FIELDS if fields[name] == "N/A"]
+    if missing:
+        logging.info(f"Header region is missing {', '.join(missing)}; reading the full first page.")
+        full = layout.header_fields(document.page_text(0))
+        fields.update({name: full[name] for name in missing})
+    return fields, layout
+
+
+def _find_total(document: PurchaseOrderDocument, quick: bool, pattern: Pattern = TOTAL_PATTERN) -> str:
+    """
+    Finds "Total $..." searching from the last page, as it is typically at
+    the end. With quick=True each page's content stream is checked first, so
+    only pages whose text cannot be read that way are laid out.
+    """
+    if quick:
+        for index in reversed(range(document.page_count)):
+            total_match = pattern.search(document.page_content_strings(index))
             if total_match:
-                break
+                return total_match.group(1)
+        logging.info("No total in the page content streams; laying out pages.")
+    for _, page_text in document.iter_page_texts(reverse=True):
+        total_match = pattern.search(page_text)
+        if total_match:
+            return total_match.group(1)
+    return "N/A"
+
 
-        meta = {
-            "po_number": po_number_match.group(1) if po_number_match else "N/A",
-            "vendor_number": vendor_number,
-            "ship_by_date": ship_by_date_match.group(1) if ship_by_date_match else "N/A",
-            "payment_terms": payment_terms_match.group(1).strip() if payment_terms_match else "N/A",
-            "total": total_match.group(1) if total_match else "N/A",
-            "page_count": len(pdf.pages)
-        }
+def extract_header_meta(pdf: DocumentSource, regions: Optional[MetaRegions] = None) -> Dict[str, Any]:
+    """
+    Extracts metadata from the first page of the PDF and the order total.
+
+    By default the first page is laid out in full, which suits conversions
+    that lay out every page anyway. With `regions` (meta-only runs) only the
+    header band of page 1 is laid out and the total is read from the page
+    content streams, with full-page text as the fallback for anything missing.
+    The fields are read the way the page's layout (see core.layouts) says.
+    """
+    with open_document(pdf) as document, span("header_meta") as s:
+        if not document.page_count:
+            return {}
+        if regions is None:
+            text = document.page_text(0)
+            layout = _layout_of(text)
+            fields = layout.header_fields(text)
+        else:
+            fields, layout = _region_header_fields(document, regions)
+        s.set(regions=regions is not None, layout=layout.name)
+
+        meta = dict(fields)
+        meta["total"] = _find_total(document, quick=regions is not None, pattern=layout.total_pattern)
+        meta["page_count"] = document.page_count
         return meta
 
 
-def extract_table_rows(pdf_path: str) -> List[List[str]]:
+def learn_meta_regions(pdf: DocumentSource) -> MetaRegions:
     """
-    Extracts all table rows from all pages of the PDF.
-    This version joins wrapped description lines before parsing.
+    Learns the header band from a sample PO: everything on page 1 above the
+    bottom of the item table's header line. Returns the defaults if page 1
+    has no table header.
     """
-    logging.info("--- Starting table extraction ---")
-    header_columns: List[str] = []
-    header_line_text = ""
+    from orders_converter.core import extractor
+
+    with open_document(pdf) as document:
+        if not document.page_count:
+            return DEFAULT_META_REGIONS
+        layout = extractor.find_layout(extractor._PageWords(document.page_chars(0)))
+        if layout is None:
+            return DEFAULT_META_REGIONS
+        return MetaRegions(header=(0.0, 0.0, 1.0, min(1.0, layout.bottom / document.page_height(0))))
 
-    # 1. Find the canonical header text and columns from the first page with a valid header
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+
+def detect_layout(pdf: DocumentSource) -> Optional[LayoutMatch]:
+    """
+    Finds the first page with a header line and returns its layout match, or
+    None if no page has the header of a registered layout.
+    """
+    with open_document(pdf) as document, span("find_header") as s:
+        for page_num, text in document.iter_page_texts():
             if not text:
                 continue
-            for line in text.split('\n'):
-                if "Qty" in line and "Item SKU" in line:
-                    header_line_text = line.strip()
-                    header_columns = parse_header_line(header_line_text)
-                    logging.info(f"Found canonical header on page {page_num}: '{header_line_text}'")
-                    break
-            if header_columns:
-                break
+            match = LAYOUTS.detect(text)
+            if match is not None and match.header_line:
+                logging.info(f"Found {match.profile.name} header on page {page_num}: '{match.header_line}'")
+                s.set(page=page_num, layout=match.profile.name)
+                return match
+            labels = match.fingerprint.labels if match is not None else LAYOUTS.fingerprint(text)[0].labels
+            if labels:
+                logging.warning(f"Header labels on page {page_num} fit no known layout: {list(labels)}")
+    return None
+
+
+def find_header(pdf: DocumentSource) -> Tuple[str, List[str]]:
+    """
+    Finds the header line on the first page that has one.
+    Returns (header_line_text, header_columns), or ("", []) if none is found.
+    Every layout's rows come in TABLE_COLUMNS order, so those are the
+    columns; parse_header_line tells what the line itself holds.
+    """
+    match = detect_layout(pdf)
+    if match is None:
+        return "", []
+    detected = parse_header_line(match.header_line)
+    if detected != TABLE_COLUMNS:
+        logging.info(f"Header holds {detected}; rows follow layout {match.profile.name!r} as {TABLE_COLUMNS}.")
+    return match.header_line, list(TABLE_COLUMNS)
+
+
+# Regex describing a complete item entry. This is complex because the description
+# is variable length: it starts with item codes and ends with prices. Items are
+# found with core.scanner, which reports the same matches in linear time; the
+# regex remains the reference definition.
+ITEM_PATTERN = re.compile(
+    r"(\d+)\s+"                       # 1: Qty
+    r"([A-Z0-9-]+)\s+"                # 2: Item SKU
+    r"([A-Z0-9]+)\s+"                 # 3: Dev Code
+    r"(\d{12})\s+"                    # 4: UPC (12 digits)
+    r"(\d{10})\s+"                    # 5: HTS Code (10 digits)
+    r"(.+?)\s+"                       # 6: Brand and Description (non-greedy)
+    r"(\$\d{1,3}(?:,\d{3})*\.\d{2})\s+" # 7: Rate
+    r"(\$\d{1,3}(?:,\d{3})*\.\d{2})",   # 8: Amount
+    re.VERBOSE | re.DOTALL,
+)
+
+# The fixed-width codes that open every item; an item can only start where
+# this matches, which lets the streaming parser drop text that never will.
+ITEM_PREFIX_PATTERN = re.compile(r"\d+\s+[A-Z0-9-]+\s+[A-Z0-9]+\s+\d{12}\s+\d{10}\s")
+
+# Tokens kept at the end of the carry-over buffer when no item has started,
+# enough for an item prefix split across a page break.
+CARRY_TAIL_TOKENS = 6
+
+
+def _content_lines(text: str, header_line_text: str, layout: Optional[LayoutProfile] = None) -> List[str]:
+    """
+    Returns the stripped lines of a page that are not headers or footers.
+    On a page with a table header, the letterhead above it is dropped too,
+    so none of it is stitched onto an item continuing from the last page.
+    """
+    layout = layout or STANDARD_LAYOUT
+    # A repeated header holds the layout's first two labels.
+    header_marks = layout.header_labels[:2]
+    content_lines = []
+    for line in text.split('\n'):
+        clean_line = line.strip()
+        if clean_line and (clean_line == header_line_text or all(mark in clean_line for mark in header_marks)):
+            # Anything before the header is letterhead.
+            content_lines = []
+            continue
+        # Skip blank lines or footer-like lines
+        if not clean_line or \
+           any(marker in line for marker in layout.skip_markers) or \
+           (layout.skip_lines is not None and layout.skip_lines.fullmatch(clean_line)):
+            continue
+        content_lines.append(clean_line)
+    return content_lines
 
-    if not header_columns:
-        logging.warning("Could not find a header row in the PDF. Aborting table extraction.")
-        return []
 
-    logging.info(f"Header parsed as: {header_columns}")
+def _trim_carry(carry: str, item_prefix: Pattern = ITEM_PREFIX_PATTERN) -> str:
+    """
+    Drops the part of the carry-over buffer that can never begin an item.
+    Everything from the first item prefix is kept; otherwise only the last
+    few tokens survive, in case a prefix continues on the next page.
+    """
+    prefix = item_prefix.search(carry)
+    pos = len(carry)
+    for _ in range(CARRY_TAIL_TOKENS):
+        pos = carry.rfind(" ", 0, len(carry[:pos].rstrip()))
+        if pos < 0:
+            return carry
+    if prefix:
+        pos = min(pos, prefix.start())
+    return carry[pos:]
+
+
+def _row_from_match(match: Tuple[str, ...]) -> List[str]:
+    """Converts the groups of an ITEM_PATTERN match into a table row."""
+    # The brand is the first word of the description block
+    brand_and_desc = match[5].strip().split(" ", 1)
+    brand = brand_and_desc[0]
+    description = brand_and_desc[1] if len(brand_and_desc) > 1 else ""
+
+    rate = match[6].replace('$', '').replace(',', '')
+    amount = match[7].replace('$', '').replace(',', '')
 
-    # 2. Collect all non-header/footer lines from all pages
-    all_content_lines = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-            if not text:
-                continue
+    return [
+        match[0],    # Qty
+        match[1],    # Item SKU
+        match[2],    # Dev Code
+        match[3],    # UPC
+        match[4],    # HTS Code
+        brand,
+        description,
+        rate,
+        amount,
+    ]
 
-            lines = text.split('\n')
-            for line in lines:
-                clean_line = line.strip()
-                # Skip blank lines, header lines, or footer-like lines
-                if not clean_line or \
-                   clean_line == header_line_text or \
-                   ("Qty" in clean_line and "Item SKU" in clean_line) or \
-                   "This Purchase Order" in clean_line or \
-                   "Page " in clean_line or \
-                   "Total" in line:
-                    continue
-                all_content_lines.append(clean_line)
-
-    # 3. Join all content into a single string and find all item matches
-    full_text = " ".join(all_content_lines)
-    logging.debug(f"Full text for regex matching: {full_text}")
-    
-    # Regex to find a complete item entry. This is complex because the description
-    # is variable length. We look for a pattern that starts with item codes and ends
-    # with prices, and repeat that search.
-    item_pattern = re.compile(
-        r"(\d+)\s+"                       # 1: Qty
-        r"([A-Z0-9-]+)\s+"                # 2: Item SKU
-        r"([A-Z0-9]+)\s+"                 # 3: Dev Code
-        r"(\d{12})\s+"                    # 4: UPC (12 digits)
-        r"(\d{10})\s+"                    # 5: HTS Code (10 digits)
-        r"(.+?)\s+"                       # 6: Brand and Description (non-greedy)
-        r"(\$\d{1,3}(?:,\d{3})*\.\d{2})\s+" # 7: Rate
-        r"(\$\d{1,3}(?:,\d{3})*\.\d{2})",   # 8: Amount
-        re.VERBOSE | re.DOTALL,
-    )
-    matches = item_pattern.findall(full_text)
-    logging.info(f"Found {len(matches)} matches with regex.")
-
-    # 4. Process matches into the final table rows
-    final_rows: List[List[str]] = [header_columns]
-    for i, match in enumerate(matches):
-        logging.debug(f"Processing match {i+1}: {match}")
-
-        # The brand is the first word of the description block
-        brand_and_desc = match[5].strip().split(" ", 1)
-        brand = brand_and_desc[0]
-        description = brand_and_desc[1] if len(brand_and_desc) > 1 else ""
-
-        rate = match[6].replace('$', '').replace(',', '')
-        amount = match[7].replace('$', '').replace(',', '')
-
-        row = [
-            match[0],    # Qty
-            match[1],    # Item SKU
-            match[2],    # Dev Code
-            match[3],    # UPC
-            match[4],    # HTS Code
-            brand,
-            description,
-            rate,
-            amount,
-        ]
-
-        if len(row) != len(header_columns):
-            logging.warning(
-                f"  -> SKIPPING malformed row. Expected {len(header_columns)} columns, got {len(row)}. Row data: {row}"
-            )
+
+# The RuffleButts PO layout, the one every PO had before layouts were
+# registered; also the fallback when a page fits no layout.
+STANDARD_LAYOUT = LayoutProfile(
+    name="rufflebutts",
+    header_labels=tuple(CANONICAL_HEADERS),
+    columns=tuple(TABLE_COLUMNS),
+    anchors=("SHIP COMPLETE BY DATE", "Vendor #"),
+    scan=scan_items,
+    to_row=_row_from_match,
+    item_prefix=ITEM_PREFIX_PATTERN,
+    header_fields=_header_fields,
+    total_pattern=TOTAL_PATTERN,
+    skip_markers=("This Purchase Order", "Page ", "Total"),
+    # The "N of M" page number and the PO number of each page's footer, laid
+    # out on one line or two.
+    skip_lines=re.compile(r"(?:\d+ of \d+)? ?(?:PO\d+)?"),
+)
+LAYOUTS.register(STANDARD_LAYOUT)
+
+
+def _iter_rows(document: PurchaseOrderDocument, header_line_text: str,
+               header_columns: List[str], layout: Optional[LayoutProfile] = None) -> Iterator[List[str]]:
+    """
+    Yields data rows page by page, scanning for items with the layout's
+    grammar (the standard layout's by default).
+
+    The content lines of each page are appended to a carry-over buffer holding
+    only the text after the last complete item, so items that wrap across a
+    page break are stitched exactly as if the whole document had been joined.
+    """
+    layout = layout or STANDARD_LAYOUT
+    carry = ""
+    count = 0
+    for page_num, text in document.iter_page_texts():
+        if not text:
             continue
-        
-        final_rows.append(row)
+        content_lines = _content_lines(text, header_line_text, layout)
+        if not content_lines:
+            continue
+
+        # Rows are collected per page so the span times matching alone,
+        # not whatever the consumer does with each row.
+        page_rows = []
+        with span("match_items", page=page_num) as s:
+            chunk = " ".join(content_lines)
+            buffer = f"{carry} {chunk}" if carry else chunk
+            logging.debug(f"Text for regex matching on page {page_num}: {buffer}")
+
+            last_end = 0
+            for match in layout.scan(buffer):
+                count += 1
+                logging.debug(f"Processing match {count}: {match.groups}")
+                row = layout.to_row(match.groups)
+                last_end = match.end
+
+                if len(row) != len(header_columns):
+                    logging.warning(
+                        f"  -> SKIPPING malformed row. Expected {len(header_columns)} columns, got {len(row)}. Row data: {row}"
+                    )
+                    continue
+                page_rows.append(row)
+
+            carry = _trim_carry(buffer[last_end:], layout.item_prefix)
+            s.set(rows=len(page_rows))
+        yield from page_rows
+
+    logging.info(f"Found {count} item matches.")
+
+
+def _check_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine '{engine}'; choose from {', '.join(ENGINES)}.")
+
+
+def iter_table_rows(pdf: DocumentSource, engine: str = "text") -> Iterator[List[str]]:
+    """
+    Yields table rows (without the header row) as soon as each one is complete.
+    Pages are parsed one at a time, so memory stays flat however long the PDF
+    is and consumers can start writing before parsing finishes.
+    """
+    _check_engine(engine)
+    with open_document(pdf, cache_text=False) as document:
+        if engine == "words":
+            from orders_converter.core import extractor
+            yield from extractor.iter_table_rows(document)
+            return
+        match = detect_layout(document)
+        if match is None:
+            logging.warning("Could not find a header row in the PDF. Aborting table extraction.")
+            return
+        yield from _iter_rows(document, match.header_line, list(TABLE_COLUMNS), match.profile)
+
+
+def extract_table_rows(pdf: DocumentSource, engine: str = "text") -> List[List[str]]:
+    """
+    Extracts all table rows from all pages of the PDF.
+    This version joins wrapped description lines before parsing.
+    """
+    _check_engine(engine)
+    if engine == "words":
+        from orders_converter.core import extractor
+        return extractor.extract_table_rows(pdf)
+
+    logging.info("--- Starting table extraction ---")
+
+    with open_document(pdf) as document:
+        # 1. Find the header line and layout from the first page with a valid header
+        match = detect_layout(document)
+
+        if match is None:
+            logging.warning("Could not find a header row in the PDF. Aborting table extraction.")
+            return []
+
+        header_columns = list(TABLE_COLUMNS)
+        logging.info(f"Header parsed as: {parse_header_line(match.header_line)}")
+
+        # 2. Parse the content lines of every page into rows
+        final_rows: List[List[str]] = [header_columns]
+        final_rows.extend(_iter_rows(document, match.header_line, header_columns, match.profile))
 
     logging.info(f"--- Finished table extraction. Found {len(final_rows) - 1} data rows. ---")
     return final_rows
 
 
+def iter_line_items(pdf: DocumentSource, engine: str = "text") -> Iterator[LineItem]:
+    """Like iter_table_rows, but yields typed LineItems."""
+    for row in iter_table_rows(pdf, engine=engine):
+        yield LineItem.from_row(row)
+
+
+def extract_order_table(pdf: DocumentSource, engine: str = "text") -> OrderTable:
+    """Extracts every line item into a column-oriented OrderTable (empty if there is no table)."""
+    return OrderTable(iter_line_items(pdf, engine=engine))
+
+
 def parse_header_line(header_text: str) -> List[str]:
     """
-    Parses the header line to extract column names using a canonical list.
-    This is more robust than just splitting by spaces.
+    Returns the TABLE_COLUMNS names of the registered header labels on a
+    line, in the order printed. Multi-word labels ("Item SKU") are matched
+    whole; labels of columns a layout does not carry over are left out.
     """
-    # Canonical headers - this is what we expect.
-    canonical_headers = [
-        "Qty", "Item SKU", "Dev Code", "UPC", "HTS Code", 
-        "Brand", "Description", "Rate", "Amount"
-    ]
-    
-    # Store the found headers in order
-    found_headers = []
-    
-    # We can't just split by space because "Item SKU" etc. are multi-word.
-    # Instead, we'll find the starting position of each canonical header.
-    
-    header_positions = []
-    for header in canonical_headers:
-        try:
-            # Find the starting index of each header in the text
-            pos = header_text.index(header)
-            header_positions.append((pos, header))
-        except ValueError:
-            # Handle case where a header might be missing, though it shouldn't be
-            pass
-            
-    # Sort headers by their position in the string
-    header_positions.sort()
-    
-    # The sorted list of headers is our final column list
-    found_headers = [header for pos, header in header_positions]
-
-    # Special handling for "Brand" and "Description" which might be merged
-    if "Brand" in found_headers and "Description" in found_headers:
-        # If both are found, they are distinct
-        pass
-    elif "Brand Description" in header_text:
-        # If they are merged, let's ensure they are handled correctly.
-        # This case is complex, for now, we assume they are found separately
-        # or we might need a more advanced logic.
-        # Let's simplify by adding both if the combined string is found
-        if "Brand" not in found_headers and "Description" not in found_headers:
-            found_headers.append("Brand")
-            found_headers.append("Description")
-
-    # This is a bit of a sanity check; we expect 9 columns.
-    # If we get "Brand Description" as one, we split it.
-    final_columns = []
-    for header in found_headers:
-        if header == "Brand Description":
-            final_columns.extend(["Brand", "Description"])
-        else:
-            final_columns.append(header)
-
-    logging.info(f"Header parsed as ({len(final_columns)} columns): {final_columns}")
-    
-    # A final check to ensure we have the right columns.
-    # The regex expects 9 columns, so we must return 9.
-    # Let's manually construct what we know is correct.
-    
-    final_columns = [
-        "Qty", "Item_SKU", "Dev_Code", "UPC", "HTS_Code", 
-        "Brand", "Description", "Rate", "Amount"
-    ]
-    
-    return final_columns
+    columns = [LAYOUTS.column_for(label) for label in LAYOUTS.header_labels(header_text)]
+    return [column for column in columns if column is not None]
 
 
 def parse_order_line(line: str) -> List[str]:
@@ -238,40 +433,27 @@ def parse_order_line(line: str) -> List[str]:
     """
     line = line.strip()
 
-    # Regex to find a complete item entry within a line/block
-    # This is the fallback if the global search in extract_table_rows fails to parse a block
-    pattern = re.compile(
-        r"(\d+)\s+"                       # 1: Qty
-        r"([A-Z0-9-]+)\s+"                # 2: Item SKU
-        r"([A-Z0-9]+)\s+"                 # 3: Dev Code
-        r"(\d{12})\s+"                    # 4: UPC
-        r"(\d{10})\s+"                    # 5: HTS Code
-        r"(.+?)\s+"                       # 6: Brand and Description
-        r"(\$\d{1,3}(?:,\d{3})*\.\d{2})\s+" # 7: Rate
-        r"(\$\d{1,3}(?:,\d{3})*\.\d{2})"    # 8: Amount
-    )
-    match = pattern.search(line)
+    # Same item definition as the document scan, but the description may not
+    # cross a line break.
+    match = next(scan_items(line, dotall=False), None)
 
     if not match:
         return []
 
     # Separate brand and description
-    brand_and_desc = match.group(6).strip()
-    parts = brand_and_desc.split(" ", 1)
+    qty, sku, dev_code, upc, hts_code, brand_and_desc, rate, amount = match.groups
+    parts = brand_and_desc.strip().split(" ", 1)
     brand = parts[0]
     description = parts[1] if len(parts) > 1 else ""
-    
-    rate = match.group(7).replace('$', '')
-    amount = match.group(8).replace('$', '')
 
     return [
-        match.group(1),  # Qty
-        match.group(2),  # SKU
-        match.group(3),  # Dev
-        match.group(4),  # UPC
-        match.group(5),  # HTS
+        qty,
+        sku,
+        dev_code,
+        upc,
+        hts_code,
         brand,
         description,
-        rate,
-        amount
-    ] 
\ No newline at end of file
+        rate.replace('$', ''),
+        amount.replace('$', ''),
+    ]
@@ -0,0 +1,161 @@
+"""
+Linear-time line-item scanner.
+
+Finds the same items as parser.ITEM_PATTERN without a backtracking regex.
+The text is split into whitespace-separated tokens once, each token is
+classified once, and for every position the next "$rate $amount" pair and
+the next item start are precomputed right to left. Each candidate item start
+is then checked in constant time, so a scan is O(len(text)) however broken
+the input is.
+
+On well-formed text the items are exactly those ITEM_PATTERN.finditer
+reports. The one deliberate difference is resynchronisation: a candidate
+whose description would run over the start of another item (typically
+because its Rate is missing) is rejected, so the scan picks up again at the
+next item instead of swallowing it. Past an amount, the start of an item
+with damaged codes (say a short UPC) counts too, so an item missing its Rate
+does not swallow a damaged item that follows either.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\S+")
+DIGITS_PATTERN = re.compile(r"\d+")
+SKU_PATTERN = re.compile(r"[A-Z0-9-]+")
+DEV_CODE_PATTERN = re.compile(r"[A-Z0-9]+")
+UPC_PATTERN = re.compile(r"\d{12}")
+HTS_PATTERN = re.compile(r"\d{10}")
+MONEY_PATTERN = re.compile(r"\$\d{1,3}(?:,\d{3})*\.\d{2}")
+
+# Tokens from an item's Qty to its first description word.
+PREFIX_TOKENS = 5
+
+
+class ItemMatch(NamedTuple):
+    """
+    One scanned item. `groups` mirrors ITEM_PATTERN's groups:
+    (qty, sku, dev_code, upc, hts_code, brand_and_description, rate, amount).
+    """
+    groups: Tuple[str, ...]
+    start: int
+    end: int
+
+
+class _Tokens:
+    """Token spans of a text plus the per-token lookups the scan needs."""
+
+    def __init__(self, text: str):
+        spans = [m.span() for m in TOKEN_PATTERN.finditer(text)]
+        self.starts = [s for s, _ in spans]
+        self.ends = [e for _, e in spans]
+        words = [text[s:e] for s, e in spans]
+        n = len(words)
+        self.n = n
+
+        # Offset where the digit run ending each token starts (its Qty), found
+        # on the reversed token so long tokens cost no more than their length.
+        self.qty_start: List[Optional[int]] = []
+        for e, w in zip(self.ends, words):
+            m = DIGITS_PATTERN.match(w[::-1])
+            self.qty_start.append(e - m.end() if m else None)
+        sku = [SKU_PATTERN.fullmatch(w) is not None for w in words]
+        dev = [DEV_CODE_PATTERN.fullmatch(w) is not None for w in words]
+        upc = [UPC_PATTERN.fullmatch(w) is not None for w in words]
+        hts = [HTS_PATTERN.fullmatch(w) is not None for w in words]
+        # End offset of the money prefix of each token (amounts need only a
+        # prefix, as in ITEM_PATTERN), and whether the whole token is money.
+        money_end: List[Optional[int]] = []
+        rate = []
+        for s, w in zip(self.starts, words):
+            m = MONEY_PATTERN.match(w)
+            money_end.append(s + m.end() if m else None)
+            rate.append(m is not None and m.end() == len(w))
+        self.money_end = money_end
+
+        # is_codes[i]: tokens i+1..i+4 are SKU, Dev Code, UPC and HTS Code.
+        self.is_codes = [
+            i + 4 < n and sku[i + 1] and dev[i + 2] and upc[i + 3] and hts[i + 4]
+            for i in range(n)
+        ]
+
+        # Like is_codes, but with the UPC and HTS Code only required to be
+        # digits, as when one of them is damaged.
+        digits = [w.isdigit() for w in words]
+        loose_codes = [
+            i + 4 < n and sku[i + 1] and dev[i + 2] and digits[i + 3] and digits[i + 4]
+            for i in range(n)
+        ]
+
+        # next_pair[i]: first j >= i with a whole-token rate at j followed by
+        # an amount at j + 1; next_start[i]: first item start at or after i;
+        # next_break[i]: first item start, damaged or not, that comes after a
+        # whole-token amount at or after i (an earlier item's end).
+        self.next_pair = [n] * (n + 1)
+        self.next_start = [n] * (n + 1)
+        self.next_break = [n] * (n + 1)
+        next_loose = n
+        for i in range(n - 1, -1, -1):
+            self.next_pair[i] = i if rate[i] and i + 1 < n and money_end[i + 1] is not None else self.next_pair[i + 1]
+            self.next_start[i] = i if self.qty_start[i] is not None and self.is_codes[i] else self.next_start[i + 1]
+            self.next_break[i] = next_loose if rate[i] else self.next_break[i + 1]
+            if self.qty_start[i] is not None and loose_codes[i]:
+                next_loose = i
+
+        # newlines_before[i]: line breaks between the start of the text and token i.
+        self.newlines_before = [0] * (n + 1)
+        count = 0
+        previous_end = 0
+        for i, s in enumerate(self.starts):
+            count += text.count("\n", previous_end, s)
+            self.newlines_before[i] = count
+            previous_end = self.ends[i]
+        self.newlines_before[n] = count
+
+
+def scan_items(text: str, dotall: bool = True) -> Iterator[ItemMatch]:
+    """
+    Yields the items in `text` left to right, like ITEM_PATTERN.finditer.
+
+    With dotall=False a description may not span a line break, matching a
+    pattern compiled without re.DOTALL.
+    """
+    tokens = _Tokens(text)
+    n = tokens.n
+    pos = 0
+    i = 0
+    while i < n:
+        # Only the first token after a match can be partly consumed (by an
+        # amount such as "$1.234"); Qty is the digit run ending the token.
+        qty_start = tokens.qty_start[i]
+        if qty_start is None or not tokens.is_codes[i] or max(qty_start, pos) >= tokens.ends[i]:
+            i += 1
+            continue
+        qty_start = max(qty_start, pos)
+
+        description = i + PREFIX_TOKENS
+        j = tokens.next_pair[description + 1] if description + 1 < n else n
+        if (j >= n
+                or tokens.next_start[description] < j
+                or tokens.next_break[description] < j
+                or (not dotall and tokens.newlines_before[j - 1] != tokens.newlines_before[description])):
+            i += 1
+            continue
+
+        amount_end = tokens.money_end[j + 1]
+        yield ItemMatch(
+            groups=(
+                text[qty_start:tokens.ends[i]],
+                text[tokens.starts[i + 1]:tokens.ends[i + 1]],
+                text[tokens.starts[i + 2]:tokens.ends[i + 2]],
+                text[tokens.starts[i + 3]:tokens.ends[i + 3]],
+                text[tokens.starts[i + 4]:tokens.ends[i + 4]],
+                text[tokens.starts[description]:tokens.ends[j - 1]],
+                text[tokens.starts[j]:tokens.ends[j]],
+                text[tokens.starts[j + 1]:amount_end],
+            ),
+            start=qty_start,
+            end=amount_end,
+        )
+        pos = amount_end
+        i = j + 1 if amount_end < tokens.ends[j + 1] else j + 2
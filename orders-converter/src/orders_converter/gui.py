@@ -1,17 +1,15 @@
 import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from orders_converter.io.pdf_reader import read_pdf_table_and_meta
-from orders_converter.io.excel_writer import write_to_excel
-import pandas as pd
 import logging
+import queue
 from pathlib import Path
+from orders_converter import jobs
+from orders_converter.preview import PreviewModel
 from orders_converter.utils.logging_config import setup_logging
-from PIL import Image, ImageTk
 
-# --- Setup Logging ---
-setup_logging()
-# ---
+# The conversion stack (pdfplumber, openpyxl) and PIL are imported on first
+# use, so the window appears without waiting for them.
 
 # --- Modern Theming ---
 BG_COLOR = '#F8FAFC'  # Lighter gray
@@ -24,6 +22,17 @@ TEXT_PRIMARY = '#1E293B'  # Darker text
 TEXT_SECONDARY = '#64748B'  # Lighter text
 BORDER_COLOR = '#E2E8F0'
 
+# Worker events are drained every 16 ms (about 60 fps), at most
+# MAX_EVENTS_PER_POLL at a time so a burst never stalls a frame.
+POLL_MS = 16
+MAX_EVENTS_PER_POLL = 200
+
+# Same order as parser.TABLE_COLUMNS, which is not imported here to keep the
+# parser off the startup path.
+PREVIEW_COLUMNS = ["Qty", "Item_SKU", "Dev_Code", "UPC", "HTS_Code", "Brand", "Description", "Rate", "Amount"]
+PREVIEW_ROWS = 12
+SEARCH_SCOPES = {"SKU or UPC": None, "Item SKU": "item_sku", "UPC": "upc"}
+
 class ModernButton(tk.Button):
     def __init__(self, parent, **kwargs):
         self.hover_color = kwargs.pop('hover_color', '#1D4ED8') # Darker blue for hover
@@ -49,7 +58,7 @@ class ModernButton(tk.Button):
             self.config(bg=self.original_bg)
 
 class FileDropFrame(tk.Frame):
-    """A frame that accepts file drops and looks good."""
+    """A frame that accepts one or more PDFs and looks good."""
     def __init__(self, parent, **kwargs):
         super().__init__(parent, bg=CARD_BG)
         self.config(
@@ -61,7 +70,7 @@ class FileDropFrame(tk.Frame):
         
         self.label = tk.Label(
             self, 
-            text="📄 Drop PDF file here or click to browse", 
+            text="📄 Drop PDF files here or click to browse", 
             font=('Segoe UI', 12), 
             bg=CARD_BG, 
             fg=TEXT_SECONDARY,
@@ -75,6 +84,74 @@ class FileDropFrame(tk.Frame):
         # Propagate the click to the parent to trigger the file dialog
         self.event_generate("<<FileBrowse>>")
 
+class VirtualRowView(tk.Frame):
+    """
+    Shows a window of a PreviewModel's rows. The Treeview only ever holds
+    visible_rows items, which are refilled as the user scrolls, so redrawing
+    costs the same for a 20-row PO and a 20,000-row one.
+    """
+    def __init__(self, parent, model, visible_rows=PREVIEW_ROWS):
+        super().__init__(parent, bg=CARD_BG)
+        self.model = model
+        self.visible_rows = visible_rows
+        self.offset = 0
+        self.matches = None  # row numbers of the active search, or None for all rows
+
+        self.tree = ttk.Treeview(self, columns=PREVIEW_COLUMNS, show='headings', height=visible_rows)
+        for column in PREVIEW_COLUMNS:
+            self.tree.heading(column, text=column.replace('_', ' '))
+            self.tree.column(column, width=200 if column == 'Description' else 90, stretch=column == 'Description')
+        for i in range(visible_rows):
+            self.tree.insert('', 'end', iid=str(i), values=())
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_to(self.offset + 3))
+
+    def row_count(self):
+        return len(self.model) if self.matches is None else len(self.matches)
+
+    def set_model(self, model):
+        self.model = model
+        self.matches = None
+        self.scroll_to(0)
+
+    def filter(self, matches):
+        self.matches = matches
+        self.scroll_to(0)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, self.row_count() - self.visible_rows))
+        self.refresh()
+
+    def refresh(self):
+        total = self.row_count()
+        stop = min(self.offset + self.visible_rows, total)
+        numbers = range(self.offset, stop) if self.matches is None else self.matches[self.offset:stop]
+        rows = self.model.rows(numbers)
+        for i in range(self.visible_rows):
+            self.tree.item(str(i), values=rows[i] if i < len(rows) else ())
+        if total:
+            self.scrollbar.set(self.offset / total, stop / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif unit == 'pages':
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small integers.
+        self.scroll_to(self.offset + (-3 if event.delta > 0 else 3))
+
+
 class OrdersSheetConverterApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -84,14 +161,27 @@ class OrdersSheetConverterApp(tk.Tk):
         self.eval('tk::PlaceWindow . center')
 
         # --- Variables ---
-        self.pdf_path = tk.StringVar()
+        self.pdf_paths = []  # PDFs picked but not queued yet
         self.output_dir = tk.StringVar()
         self.filename = tk.StringVar()
         self.status = tk.StringVar(value='')
 
+        # --- Conversion queue ---
+        self.jobs = jobs.ConversionQueue()
+        self._job_rows = {}  # job id -> queue list row
+        self._job_outputs = {}  # job id -> output path, while the job is queued or running
+        self._job_fractions = {}  # job id -> share of pages read, for the run
+        self._run_outputs = []
+        self._run_errors = []
+        self._row_paths = {}  # queue list row -> PDF path
+        self._preview_job = None
+        self._preview_rows_shown = 0
+
         # --- Build UI ---
         self._build_ui()
         self._bind_events()
+        self.protocol('WM_DELETE_WINDOW', self._on_close)
+        self.after(POLL_MS, self._poll_events)
 
     def _build_ui(self):
         # Create a main frame that holds everything
@@ -113,6 +203,7 @@ class OrdersSheetConverterApp(tk.Tk):
         self._build_header(content_frame)
         self._build_file_selection(content_frame)
         self._build_output_settings(content_frame)
+        self._build_preview(content_frame)
 
     def _build_header(self, parent):
         header_frame = tk.Frame(parent, bg=BG_COLOR)
@@ -129,8 +220,13 @@ class OrdersSheetConverterApp(tk.Tk):
             bg=BG_COLOR
         ).pack(anchor='w')
 
-        # --- Logo ---
+        # The logo loads once the window is up.
+        self.after_idle(self._load_logo, header_frame)
+
+    def _load_logo(self, header_frame):
         try:
+            from PIL import Image, ImageTk
+
             base_path = Path(__file__).resolve().parent.parent.parent
             logo_path = base_path / "assets" / "logo.jpg"
             if not logo_path.exists():
@@ -155,14 +251,22 @@ class OrdersSheetConverterApp(tk.Tk):
         
         tk.Label(
             header_frame,
-            text="Select PDF File",
+            text="Select PDF Files",
             font=('Segoe UI', 14, 'bold'),
             fg=TEXT_PRIMARY,
             bg=CARD_BG
         ).pack(side='left')
 
         self.file_drop = FileDropFrame(frame)
-        self.file_drop.pack(fill='x', expand=False, padx=20, pady=(0, 20))
+        self.file_drop.pack(fill='x', expand=False, padx=20, pady=(0, 10))
+
+        # One row per PDF: waiting, queued, converting (pages read) or finished.
+        self.queue_list = ttk.Treeview(frame, columns=('file', 'status'), show='headings', height=5)
+        self.queue_list.heading('file', text='File')
+        self.queue_list.heading('status', text='Status')
+        self.queue_list.column('file', width=320)
+        self.queue_list.column('status', width=180)
+        self.queue_list.pack(fill='x', expand=False, padx=20, pady=(0, 20))
 
     def _build_output_settings(self, parent):
         frame = tk.Frame(parent, bg=CARD_BG, relief='solid', bd=1, highlightbackground=BORDER_COLOR)
@@ -234,6 +338,45 @@ class OrdersSheetConverterApp(tk.Tk):
         )
         self.filename_entry.pack(fill='x', pady=(5, 0), ipady=4)
 
+    def _build_preview(self, parent):
+        frame = tk.Frame(parent, bg=CARD_BG, relief='solid', bd=1, highlightbackground=BORDER_COLOR)
+        frame.pack(fill='both', expand=True, pady=(20, 0))
+
+        header_frame = tk.Frame(frame, bg=CARD_BG)
+        header_frame.pack(fill='x', padx=20, pady=15)
+
+        tk.Label(
+            header_frame,
+            text="Preview",
+            font=('Segoe UI', 14, 'bold'),
+            fg=TEXT_PRIMARY,
+            bg=CARD_BG
+        ).pack(side='left')
+
+        self.preview_status = tk.StringVar(value='Double-click a file to preview its rows')
+        tk.Label(
+            header_frame,
+            textvariable=self.preview_status,
+            font=('Segoe UI', 10),
+            fg=TEXT_SECONDARY,
+            bg=CARD_BG
+        ).pack(side='left', padx=(15, 0))
+
+        self.search_text = tk.StringVar()
+        self.search_scope = tk.StringVar(value=next(iter(SEARCH_SCOPES)))
+        ttk.Entry(header_frame, textvariable=self.search_text, font=('Segoe UI', 10), width=20).pack(side='right')
+        ttk.Combobox(
+            header_frame,
+            textvariable=self.search_scope,
+            values=list(SEARCH_SCOPES),
+            state='readonly',
+            width=12
+        ).pack(side='right', padx=(0, 10))
+
+        self.preview_model = PreviewModel()
+        self.preview = VirtualRowView(frame, self.preview_model)
+        self.preview.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+
     def _build_convert_section(self, parent):
         # This function now packs into the footer_frame
         self.convert_btn = ModernButton(
@@ -251,8 +394,25 @@ class OrdersSheetConverterApp(tk.Tk):
         )
         self.convert_btn.pack()
 
+        self.cancel_btn = ModernButton(
+            parent,
+            text="Cancel",
+            font=('Segoe UI', 10, 'bold'),
+            bg=SECONDARY_COLOR,
+            hover_color='#5A6268',
+            fg='white',
+            disabledforeground='#B0BEC5',
+            command=self.cancel,
+            state='disabled',
+            bd=0
+        )
+        self.cancel_btn.pack(pady=(10, 0))
+
     def _build_progress_status(self, parent):
         # This function now packs into the footer_frame
+        self.progress = ttk.Progressbar(parent, mode='determinate', maximum=1.0)
+        self.progress.pack(fill='x', pady=(10, 0))
+
         self.status_label = ttk.Label(
             parent, # Pack directly into the parent (footer)
             textvariable=self.status,
@@ -264,25 +424,43 @@ class OrdersSheetConverterApp(tk.Tk):
 
     def _bind_events(self):
         self.file_drop.bind('<<FileBrowse>>', self.browse_pdf)
-        self.pdf_path.trace_add('write', self._on_field_change)
         self.output_dir.trace_add('write', self._on_field_change)
         self.filename.trace_add('write', self._on_field_change)
+        self.queue_list.bind('<Double-1>', self.preview_selected)
+        self.search_text.trace_add('write', self._on_search)
+        self.search_scope.trace_add('write', self._on_search)
 
     def browse_pdf(self, event=None):
-        path = filedialog.askopenfilename(
-            title="Select PDF File",
+        paths = filedialog.askopenfilenames(
+            title="Select PDF Files",
             filetypes=[('PDF Files', '*.pdf')]
         )
-        if path:
-            self.pdf_path.set(path)
-            self.output_dir.set(os.path.dirname(path))
-            base = os.path.splitext(os.path.basename(path))[0]
+        if paths:
+            self.add_pdfs(paths)
+
+    def add_pdfs(self, paths):
+        """Adds PDFs to the list waiting for Convert."""
+        for path in paths:
+            if path not in self.pdf_paths:
+                self.pdf_paths.append(path)
+                self.queue_list.insert('', 'end', iid=f"pending:{path}",
+                                       values=(os.path.basename(path), 'Waiting'))
+                self._row_paths[f"pending:{path}"] = path
+        if not self.output_dir.get():
+            self.output_dir.set(os.path.dirname(self.pdf_paths[0]))
+        # A filename only makes sense for a single PDF; several PDFs are
+        # each written next to their name.
+        if len(self.pdf_paths) == 1:
+            base = os.path.splitext(os.path.basename(self.pdf_paths[0]))[0]
             self.filename.set(base + '.xlsx')
-            
-            self.file_drop.label.configure(
-                text=f"✅ {os.path.basename(path)}",
-                fg=SUCCESS_COLOR
-            )
+            self.filename_entry.config(state='normal')
+        else:
+            self.filename.set('')
+            self.filename_entry.config(state='disabled')
+
+        label = os.path.basename(self.pdf_paths[0]) if len(self.pdf_paths) == 1 else f"{len(self.pdf_paths)} PDF files"
+        self.file_drop.label.configure(text=f"✅ {label}", fg=SUCCESS_COLOR)
+        self._on_field_change()
 
     def browse_output_dir(self):
         path = filedialog.askdirectory(title="Select Output Folder")
@@ -290,58 +468,194 @@ class OrdersSheetConverterApp(tk.Tk):
             self.output_dir.set(path)
 
     def _on_field_change(self, *args):
-        if self.pdf_path.get() and self.output_dir.get() and self.filename.get():
-            self.convert_btn.config(state='normal')
-        else:
-            self.convert_btn.config(state='disabled')
+        ready = self.pdf_paths and self.output_dir.get() and (len(self.pdf_paths) > 1 or self.filename.get())
+        self.convert_btn.config(state='normal' if ready else 'disabled')
 
     def _update_status(self, text, color=TEXT_SECONDARY):
         self.status.set(text)
         self.status_label.config(foreground=color)
-        self.update_idletasks()
+
+    def _output_targets(self):
+        """
+        Pairs each waiting PDF with its output, as batch runs do: PDFs from
+        different folders that share a name keep their subfolders. Raises
+        ValueError if an output is taken by another waiting PDF or a queued job.
+        """
+        from orders_converter.batch import output_targets
+
+        if len(self.pdf_paths) == 1:
+            targets = [(self.pdf_paths[0], os.path.join(self.output_dir.get(), self.filename.get()))]
+        else:
+            targets = output_targets(self.pdf_paths, self.output_dir.get())
+        queued = {os.path.normcase(os.path.normpath(output)) for output in self._job_outputs.values()}
+        for pdf_path, output_path in targets:
+            if os.path.normcase(os.path.normpath(output_path)) in queued:
+                raise ValueError(f"{output_path} is already being written by a queued conversion.")
+        return targets
 
     def convert(self):
-        self.convert_btn.config(state='disabled', text="Converting...")
-        self._update_status('Starting conversion...')
-        
+        """Queues every waiting PDF; conversions run in the background."""
+        logging.info("--- Conversion process started from GUI ---")
+        if not self._job_rows:
+            self._job_fractions.clear()
+            self._run_outputs = []
+            self._run_errors = []
         try:
-            pdf_path_str = self.pdf_path.get()
-            output_dir_str = self.output_dir.get()
-            filename_str = self.filename.get()
-            
-            logging.info("--- Conversion process started from GUI ---")
-            logging.info(f"Input PDF: {pdf_path_str}")
-            
-            meta_data, table_data = read_pdf_table_and_meta(pdf_path_str)
-            
-            if not table_data or len(table_data) <= 1:
-                raise ValueError("No table data found in the PDF.")
-            
-            header, data = table_data[0], table_data[1:]
-            df = pd.DataFrame(data, columns=header)
-            logging.info(f"Created DataFrame with {len(df)} rows.")
-
-            output_path = os.path.join(output_dir_str, filename_str)
-            write_to_excel(df, meta_data, output_path)
-            
-            self._update_status('✅ Conversion successful!', SUCCESS_COLOR)
-            
+            targets = self._output_targets()
+        except ValueError as e:
+            logging.error(f"Not queuing conversion: {e}")
+            messagebox.showerror("Conversion Error", str(e))
+            return
+        for pdf_path, output_path in targets:
+            logging.info(f"Input PDF: {pdf_path}")
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            job_id = self.jobs.submit(pdf_path, output_path)
+            row = f"job:{job_id}"
+            self.queue_list.delete(f"pending:{pdf_path}")
+            del self._row_paths[f"pending:{pdf_path}"]
+            self.queue_list.insert('', 'end', iid=row, values=(os.path.basename(pdf_path), 'Queued'))
+            self._row_paths[row] = pdf_path
+            self._job_rows[job_id] = row
+            self._job_outputs[job_id] = output_path
+            self._job_fractions[job_id] = 0.0
+        self.pdf_paths = []
+        self.filename.set('')
+        self.filename_entry.config(state='normal')
+        self.file_drop.label.configure(text="📄 Drop PDF files here or click to browse", fg=TEXT_SECONDARY)
+        self.cancel_btn.config(state='normal')
+        self._on_field_change()
+        self._update_run_status()
+
+    def cancel(self):
+        """Cancels the selected conversions, or all of them if none is selected."""
+        selected = set(self.queue_list.selection())
+        targets = [job_id for job_id, row in self._job_rows.items() if not selected or row in selected]
+        for job_id in targets:
+            if self.jobs.cancel(job_id):
+                self.queue_list.set(self._job_rows[job_id], 'status', 'Cancelling...')
+
+    def preview_selected(self, event=None):
+        """Parses the double-clicked PDF into the preview pane in the background."""
+        row = self.queue_list.identify_row(event.y) if event is not None else self.queue_list.focus()
+        pdf_path = self._row_paths.get(row)
+        if pdf_path is None:
+            return
+        if self._preview_job is not None:
+            self.jobs.cancel(self._preview_job)
+        # A fresh model: rows of the cancelled preview may still be arriving
+        # in the old one.
+        self.preview_model = PreviewModel()
+        self.preview.set_model(self.preview_model)
+        self._preview_rows_shown = 0
+        self._preview_name = os.path.basename(pdf_path)
+        self.preview_status.set(f"{self._preview_name}: reading...")
+        self._preview_job = self.jobs.submit_preview(pdf_path, self.preview_model)
+        logging.info(f"Previewing {pdf_path}")
+
+    def _on_search(self, *args):
+        query = self.search_text.get().strip()
+        if not query:
+            self.preview.filter(None)
+            return
+        self.preview.filter(self.preview_model.search(query, SEARCH_SCOPES[self.search_scope.get()]))
+
+    def _refresh_preview(self):
+        """Shows rows that arrived since the last frame."""
+        count = len(self.preview_model)
+        if count == self._preview_rows_shown:
+            return
+        self._preview_rows_shown = count
+        if self.search_text.get().strip():
+            offset = self.preview.offset
+            self._on_search()
+            self.preview.scroll_to(offset)
+        else:
+            self.preview.refresh()
+
+    def _poll_events(self):
+        for _ in range(MAX_EVENTS_PER_POLL):
             try:
-                os.startfile(output_path)
+                event = self.jobs.events.get_nowait()
+            except queue.Empty:
+                break
+            self._on_job_event(event)
+        self._refresh_preview()
+        self.after(POLL_MS, self._poll_events)
+
+    def _on_preview_event(self, event):
+        if event.kind == jobs.PROGRESS:
+            self.preview_status.set(
+                f"{self._preview_name}: page {event.pages_read} of {event.page_count}, {len(self.preview_model)} rows")
+        elif event.kind == jobs.DONE:
+            self.preview_status.set(f"{self._preview_name}: {event.rows} rows")
+        elif event.kind == jobs.FAILED:
+            self.preview_status.set(f"{self._preview_name}: ❌ {event.message}")
+        if event.kind in jobs.FINISHED:
+            self._preview_job = None
+
+    def _on_job_event(self, event):
+        if event.job_id == self._preview_job:
+            self._on_preview_event(event)
+            return
+        row = self._job_rows.get(event.job_id)
+        if row is None:
+            return
+        if event.kind == jobs.STARTED:
+            self.queue_list.set(row, 'status', 'Converting...')
+        elif event.kind == jobs.PROGRESS:
+            self.queue_list.set(row, 'status', f"Page {event.pages_read} of {event.page_count}")
+            self._job_fractions[event.job_id] = event.pages_read / event.page_count
+        elif event.kind in jobs.FINISHED:
+            self._job_fractions[event.job_id] = 1.0
+            del self._job_rows[event.job_id]
+            del self._job_outputs[event.job_id]
+            if event.kind == jobs.DONE:
+                self.queue_list.set(row, 'status', f"✅ {event.rows} rows")
+                self._run_outputs.append(event.message)
+                logging.info(f"Wrote {event.rows} rows.")
+            elif event.kind == jobs.FAILED:
+                self.queue_list.set(row, 'status', f"❌ {event.message}")
+                self._run_errors.append(f"{self.queue_list.set(row, 'file')}: {event.message}")
+            else:
+                self.queue_list.set(row, 'status', 'Cancelled')
+            if not self._job_rows:
+                self._finish_run()
+                return
+        self._update_run_status()
+
+    def _update_run_status(self):
+        if not self._job_fractions:
+            return
+        self.progress['value'] = sum(self._job_fractions.values()) / len(self._job_fractions)
+        finished = len(self._job_fractions) - len(self._job_rows)
+        self._update_status(f"Converting... {finished} of {len(self._job_fractions)} files done")
+
+    def _finish_run(self):
+        self.progress['value'] = 1.0
+        self.cancel_btn.config(state='disabled')
+        if self._run_errors:
+            self._update_status(f"❌ {len(self._run_errors)} of {len(self._job_fractions)} conversions failed",
+                                ERROR_COLOR)
+            messagebox.showerror("Conversion Error", "An error occurred:\n" + "\n".join(self._run_errors))
+        elif self._run_outputs:
+            self._update_status(f"✅ Converted {len(self._run_outputs)} of {len(self._job_fractions)} files",
+                                SUCCESS_COLOR)
+        else:
+            self._update_status('Conversion cancelled.')
+        if len(self._run_outputs) == 1 and len(self._job_fractions) == 1:
+            try:
+                os.startfile(self._run_outputs[0])
             except AttributeError:
-                logging.warning(f"Could not open {output_path}. Please open it manually.")
-
-        except Exception as e:
-            self._update_status(f"❌ Error: {e}", ERROR_COLOR)
-            logging.error(f"Conversion error: {e}", exc_info=True)
-            messagebox.showerror("Conversion Error", f"An error occurred: {e}")
+                logging.warning(f"Could not open {self._run_outputs[0]}. Please open it manually.")
 
-        finally:
-            self.convert_btn.config(text="🔄 Convert to Excel")
-            self._on_field_change()
+    def _on_close(self):
+        # Workers stop at their next page; the window closes right away.
+        self.jobs.shutdown(wait=False)
+        self.destroy()
 
 def main():
     """Main function to run the application."""
+    setup_logging()
     app = OrdersSheetConverterApp()
     app.mainloop()
 
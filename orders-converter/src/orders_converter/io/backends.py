@@ -0,0 +1,368 @@
+"""
+PDF text backends.
+
+A backend opens a PDF and lays its pages out as text. PurchaseOrderDocument
+reads every page through one, so the parser never talks to a PDF library
+directly:
+
+- "pdfplumber" (default): pdfplumber's text layout. The only backend with
+  positioned characters, which the "words" engine needs.
+- "pdfium": PDFium's text extraction via pypdfium2, several times faster.
+- "pdfminer": pdfminer.six's layout analysis without pdfplumber's object
+  model, with lines regrouped by position.
+
+The faster backends order some page furniture differently, so
+tests/unit/test_backends.py pins the fixtures on which they give identical
+rows and meta.
+
+Each backend imports its library when a PDF is first opened with it, so
+importing this module stays cheap. release(index) drops whatever a backend
+keeps of a page after laying it out; PurchaseOrderDocument calls it once a
+page falls out of its window.
+
+Backends open a path or a PdfBuffer, which holds a PDF received as bytes, a
+buffer, an mmap or a binary file object without copying it, so PDFs that
+arrive over the wire need no temporary file.
+"""
+
+import io
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+# Tolerances used for every pdfplumber text layout; keeping them in one place
+# guarantees cached page text is interchangeable between callers.
+TEXT_X_TOLERANCE = 2
+TEXT_Y_TOLERANCE = 2
+
+Box = Tuple[float, float, float, float]
+
+# What a PDF can be read from: a path, its bytes (or any buffer, including an
+# mmap), or a binary file object.
+PdfSource = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+
+def is_path(source: Any) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+class _BufferReader(io.RawIOBase):
+    """A seekable binary file over a memoryview; reads copy only what is asked for."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = max(0, min(len(buffer), len(self._view) - self._pos))
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class PdfBuffer:
+    """
+    The bytes of a PDF held in memory, without copying them: bytes, buffers
+    and mmaps are viewed in place, a BytesIO through its buffer, and a file
+    object with a descriptor is memory-mapped, so the OS pages it in as the
+    PDF library reads it. Only streams with neither (sockets, pipes, HTTP
+    bodies) are read, once. File objects are read whole, from offset 0,
+    except streams that cannot seek, which are read from where they are.
+
+    Close it (or use it as a context manager) to unmap the file and release
+    the views; the caller's source is never closed.
+    """
+
+    def __init__(self, source: PdfSource):
+        self.name = getattr(source, "name", None)
+        self._mmap = None
+        self._exported = None
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            data = source
+        elif isinstance(source, io.BytesIO):
+            data = self._exported = source.getbuffer()
+        else:
+            try:
+                fileno = source.fileno()
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                fileno = None
+            if fileno is not None and os.fstat(fileno).st_size > 0:
+                data = self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            else:
+                if getattr(source, "seekable", lambda: False)():
+                    source.seek(0)
+                data = source.read()
+        # Raw bytes can be handed to PDFium as they are.
+        self.data = data if isinstance(data, bytes) else None
+        view = memoryview(data)
+        self.view = view if view.format == "B" and view.ndim == 1 else view.cast("B")
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __enter__(self) -> "PdfBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def reader(self) -> BinaryIO:
+        """A new seekable binary file over the bytes."""
+        return _BufferReader(self.view)
+
+    def close(self) -> None:
+        self.view.release()
+        if self._exported is not None:
+            self._exported.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+def describe_source(source: Any) -> str:
+    """A short name for a PDF source in logs and errors (a path, a file name or its size)."""
+    if is_path(source):
+        return os.fspath(source)
+    name = getattr(source, "name", None)
+    if isinstance(name, str):
+        return name
+    try:
+        return f"<{len(source)}-byte PDF>"
+    except TypeError:
+        return "<PDF stream>"
+
+
+@contextmanager
+def pdf_input(source: Union[PdfSource, PdfBuffer]) -> Iterator[Union[str, PdfBuffer]]:
+    """
+    Yields a path unchanged, or the PdfBuffer for any other source, closed
+    when the block exits unless the caller passed it in. Use it to read a
+    stream once when it is needed twice, e.g. to hash and then parse it.
+    """
+    if is_path(source):
+        yield os.fspath(source)
+    elif isinstance(source, PdfBuffer):
+        yield source
+    else:
+        with PdfBuffer(source) as buffer:
+            yield buffer
+
+
+class PdfplumberBackend:
+    """pdfplumber's character model and text layout (the reference backend)."""
+
+    name = "pdfplumber"
+
+    def __init__(self, source: Union[str, PdfBuffer]):
+        import pdfplumber
+
+        self.pdf = pdfplumber.open(source if is_path(source) else source.reader())
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        page = self.pdf.pages[index]
+        return float(page.width), float(page.height)
+
+    def page_text(self, index: int) -> str:
+        page = self.pdf.pages[index]
+        return page.extract_text(x_tolerance=TEXT_X_TOLERANCE, y_tolerance=TEXT_Y_TOLERANCE) or ""
+
+    def region_text(self, index: int, box: Box) -> str:
+        """Lays out the part of a page inside an absolute (x0, top, x1, bottom) box."""
+        region = self.pdf.pages[index].crop(box)
+        return region.extract_text(x_tolerance=TEXT_X_TOLERANCE, y_tolerance=TEXT_Y_TOLERANCE) or ""
+
+    def page_chars(self, index: int) -> List[Dict[str, Any]]:
+        return self.pdf.pages[index].chars
+
+    def content_streams(self, index: int) -> List[Any]:
+        return self.pdf.pages[index].page_obj.contents or []
+
+    def release(self, index: int) -> None:
+        # A page keeps its layout and every character object until closed.
+        self.pdf.pages[index].close()
+
+    def close(self) -> None:
+        self.pdf.close()
+
+
+class PdfiumBackend:
+    """PDFium text extraction through pypdfium2."""
+
+    name = "pdfium"
+
+    def __init__(self, source: Union[str, PdfBuffer]):
+        import pypdfium2
+
+        if is_path(source):
+            self.pdf = pypdfium2.PdfDocument(source)
+        else:
+            # PDFium reads bytes in place and anything else block by block.
+            self.pdf = pypdfium2.PdfDocument(source.data if source.data is not None else source.reader())
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf)
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        width, height = self.pdf[index].get_size()
+        return float(width), float(height)
+
+    def page_text(self, index: int) -> str:
+        page = self.pdf[index]
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+        return text.replace("\r\n", "\n").strip("\n")
+
+    def region_text(self, index: int, box: Box) -> str:
+        page = self.pdf[index]
+        textpage = page.get_textpage()
+        try:
+            height = page.get_height()
+            x0, top, x1, bottom = box
+            # PDFium measures y from the bottom of the page.
+            text = textpage.get_text_bounded(left=x0, bottom=height - bottom, right=x1, top=height - top)
+        finally:
+            textpage.close()
+            page.close()
+        return text.replace("\r\n", "\n").strip("\n")
+
+    def page_chars(self, index: int) -> List[Dict[str, Any]]:
+        raise ValueError("The pdfium backend has no character positions; use the pdfplumber backend.")
+
+    def content_streams(self, index: int) -> List[Any]:
+        return []
+
+    def release(self, index: int) -> None:
+        # Pages and text pages are closed as soon as they are read.
+        pass
+
+    def close(self) -> None:
+        self.pdf.close()
+
+
+class PdfminerBackend:
+    """
+    pdfminer.six's layout analysis, skipping pdfplumber's per-character
+    object model. Text lines that share a baseline are rejoined left to right,
+    which reproduces pdfplumber's layout on our POs.
+    """
+
+    name = "pdfminer"
+
+    def __init__(self, source: Union[str, PdfBuffer]):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        self._fh = open(source, "rb") if is_path(source) else source.reader()
+        try:
+            self._pages = list(PDFPage.get_pages(self._fh))
+        except Exception:
+            self._fh.close()
+            raise
+        # Lines only: no grouping into boxes, which our layout does not need.
+        laparams = LAParams(line_overlap=0.5, char_margin=1.0, line_margin=0.0, boxes_flow=None, all_texts=True)
+        self._device = PDFPageAggregator(PDFResourceManager(), laparams=laparams)
+        self._interpreter = PDFPageInterpreter(self._device.rsrcmgr, self._device)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        x0, y0, x1, y1 = self._pages[index].mediabox
+        return float(x1 - x0), float(y1 - y0)
+
+    def _lines(self, index: int) -> List[Tuple[float, float, float, float, str]]:
+        """Returns (top, x0, x1, bottom, text) for each text line on a page."""
+        from pdfminer.layout import LTContainer, LTTextLineHorizontal
+
+        self._interpreter.process_page(self._pages[index])
+        layout = self._device.get_result()
+        lines = []
+        stack = [layout]
+        while stack:
+            for item in stack.pop():
+                if isinstance(item, LTTextLineHorizontal):
+                    lines.append((layout.height - item.y1, item.x0, item.x1, layout.height - item.y0,
+                                  item.get_text().strip()))
+                elif isinstance(item, LTContainer):
+                    stack.append(item)
+        return sorted(lines)
+
+    @staticmethod
+    def _join(lines: List[Tuple[float, float, float, float, str]]) -> str:
+        from pdfplumber.utils.text import LIGATURES
+
+        rows: List[Tuple[float, List[Tuple[float, str]]]] = []
+        for top, x0, _, _, text in lines:
+            if rows and top - rows[-1][0] <= TEXT_Y_TOLERANCE:
+                rows[-1][1].append((x0, text))
+            else:
+                rows.append((top, [(x0, text)]))
+        text = "\n".join(" ".join(t for _, t in sorted(parts)).strip() for _, parts in rows)
+        for ligature, expanded in LIGATURES.items():
+            text = text.replace(ligature, expanded)
+        # Justified text comes out with runs of spaces between words.
+        return re.sub(" {2,}", " ", text)
+
+    def page_text(self, index: int) -> str:
+        return self._join(self._lines(index))
+
+    def region_text(self, index: int, box: Box) -> str:
+        """Lays out the lines that fall inside the box (whole lines only)."""
+        x0, top, x1, bottom = box
+        return self._join([line for line in self._lines(index)
+                           if line[1] >= x0 and line[2] <= x1 and line[0] >= top and line[3] <= bottom])
+
+    def page_chars(self, index: int) -> List[Dict[str, Any]]:
+        raise ValueError("The pdfminer backend has no character positions; use the pdfplumber backend.")
+
+    def content_streams(self, index: int) -> List[Any]:
+        return self._pages[index].contents or []
+
+    def release(self, index: int) -> None:
+        # The aggregator only holds the layout of the last page processed.
+        pass
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PdfiumBackend.name: PdfiumBackend,
+    PdfminerBackend.name: PdfminerBackend,
+}
+DEFAULT_BACKEND = PdfplumberBackend.name
+
+
+def open_backend(source: Union[str, PdfBuffer], backend: str = DEFAULT_BACKEND):
+    """Opens a PDF path or PdfBuffer with the named backend (see BACKENDS)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend {backend!r}; expected one of {', '.join(BACKENDS)}.")
+    return BACKENDS[backend](source)
@@ -1,21 +1,107 @@
 import pandas as pd
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, Font, numbers
-from openpyxl import load_workbook
+from openpyxl.styles import Font
 import logging
 
+from orders_converter.core.order_table import LineItem, OrderTable
+from orders_converter.core.parser import TABLE_COLUMNS
+from orders_converter.utils.profiling import span
+
+# Column widths are measured over this many leading rows before streaming
+# starts: a write-only sheet emits its column definitions with the first row,
+# so widths cannot be changed once rows have been written.
+WIDTH_SAMPLE_ROWS = 1000
+
+SUMMARY_LABELS = {
+    "po_number": "PO Number",
+    "vendor_number": "Vendor Number",
+    "ship_by_date": "Ship By Date",
+    "payment_terms": "Payment Terms",
+    "total": "Total",
+    "page_count": "Page Count",
+}
+
+
+def _column_width(column: str, max_len: int) -> int:
+    # Add some padding, especially for long descriptions
+    return max_len + 4 if column == 'Description' else max_len + 2
+
+
+def write_order_excel(rows: Union[pd.DataFrame, OrderTable, Iterable[Union[Sequence[Any], LineItem]]],
+                      meta: Dict[str, Any],
+                      output_path: str, columns: Optional[List[str]] = None) -> int:
+    """
+    Streams order rows into an 'Order' sheet and the meta into a 'Summary' sheet.
+
+    Rows may be a DataFrame, an OrderTable, or any iterable of string rows
+    (such as parser.iter_table_rows) or LineItems, with `columns` naming the
+    header; LineItems are written as their string rows. The workbook is
+    written in openpyxl's write-only mode, so memory does not grow with the
+    number of rows. Returns the number of data rows written.
+    """
+    if isinstance(rows, pd.DataFrame):
+        columns = [str(col) for col in rows.columns]
+        rows = rows.itertuples(index=False, name=None)
+    elif isinstance(rows, OrderTable):
+        columns = columns or list(TABLE_COLUMNS)
+    columns = list(columns or [])
+    rows = (row.to_row() if isinstance(row, LineItem) else row for row in rows)
+
+    with span("excel_write") as s:
+        wb = Workbook(write_only=True)
+        order_ws = wb.create_sheet('Order')
+
+        # Track widths incrementally over the lookahead window, then fix them
+        # before the first row is emitted.
+        max_lens = [len(col) for col in columns]
+        window = list(islice(rows, WIDTH_SAMPLE_ROWS))
+        for row in window:
+            for col_idx, value in enumerate(row):
+                if col_idx < len(max_lens):
+                    max_lens[col_idx] = max(max_lens[col_idx], len(str(value)))
+        for col_idx, col in enumerate(columns, 1):
+            order_ws.column_dimensions[get_column_letter(col_idx)].width = _column_width(col, max_lens[col_idx - 1])
+
+        header_cells = []
+        for col in columns:
+            cell = WriteOnlyCell(order_ws, value=col)
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        order_ws.append(header_cells)
+
+        row_count = 0
+        for row in window:
+            order_ws.append(list(row))
+            row_count += 1
+        del window
+        for row in rows:
+            order_ws.append(list(row))
+            row_count += 1
+
+        # --- Summary Sheet ---
+        summary_ws = wb.create_sheet('Summary')
+        summary_ws.column_dimensions['A'].width = max([len(label) for label in SUMMARY_LABELS.values()] + [5]) + 2
+        summary_ws.column_dimensions['B'].width = max([len(str(v)) for v in meta.values()] + [5]) + 2
+        field_cell = WriteOnlyCell(summary_ws, value='Field')
+        field_cell.font = Font(bold=True)
+        value_cell = WriteOnlyCell(summary_ws, value='Value')
+        value_cell.font = Font(bold=True)
+        summary_ws.append([field_cell, value_cell])
+        for key, value in meta.items():
+            summary_ws.append([SUMMARY_LABELS.get(key, key), value])
+        summary_ws.append(['Line Items', row_count])
+
+        with span("excel_save"):
+            wb.save(output_path)
+        s.set(rows=row_count)
+    logging.info(f"Excel file written to: {output_path} ({row_count} rows)")
+    return row_count
+
+
 def write_to_excel(df: pd.DataFrame, meta: dict, output_path: str):
     """Writes the DataFrame to an Excel file with a summary sheet."""
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        # --- Orders Sheet ---
-        df.to_excel(writer, sheet_name='Order', index=False)
-        order_ws = writer.sheets['Order']
-        # Adjust column widths for the 'Order' sheet
-        for col_idx, col in enumerate(df.columns, 1):
-            column_letter = get_column_letter(col_idx)
-            max_len = max(df[col].astype(str).map(len).max(), len(col))
-            # Add some padding, especially for long descriptions
-            adjusted_width = max_len + 4 if col == 'Description' else max_len + 2
-            order_ws.column_dimensions[column_letter].width = adjusted_width
-
-    logging.info(f"Excel file written to: {output_path}")
+    write_order_excel(df, meta, output_path)
@@ -0,0 +1,206 @@
+"""
+Persistent, content-addressed cache of extraction results.
+
+Entries are keyed by a hash of the PDF bytes plus a fingerprint of the
+parsing code, so resent copies of a PO skip PDF parsing entirely while any
+change to core/parser.py invalidates everything cached before it.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from orders_converter.core import parser
+from orders_converter.io import backends
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+# Modules whose source decides the cached output.
+FINGERPRINT_MODULES = (
+    "orders_converter.core.parser",
+    "orders_converter.core.document",
+    "orders_converter.core.scanner",
+    "orders_converter.core.extractor",
+    "orders_converter.core.layouts",
+    "orders_converter.io.backends",
+)
+
+_parser_fingerprint: Optional[str] = None
+
+
+def parser_fingerprint() -> str:
+    """
+    Returns a digest of the parsing logic: PARSER_VERSION plus the source of
+    the modules whose output is cached. Falls back to PARSER_VERSION alone
+    when the source is not available (e.g. frozen executables).
+    """
+    global _parser_fingerprint
+    if _parser_fingerprint is None:
+        digest = hashlib.sha256(parser.PARSER_VERSION.encode())
+        for name in FINGERPRINT_MODULES:
+            # Located rather than imported, so the words engine's NumPy is
+            # not loaded just to compute a cache key.
+            spec = importlib.util.find_spec(name)
+            try:
+                with open(spec.origin, "rb") as fh:
+                    digest.update(fh.read())
+            except (AttributeError, OSError, TypeError):
+                logging.debug(f"No source for {name}; cache keyed on PARSER_VERSION only.")
+        _parser_fingerprint = digest.hexdigest()[:16]
+    return _parser_fingerprint
+
+
+def default_cache_dir() -> str:
+    """Returns $ORDERS_CONVERTER_CACHE_DIR, or orders-converter under the XDG cache dir."""
+    env_dir = os.environ.get("ORDERS_CONVERTER_CACHE_DIR")
+    if env_dir:
+        return env_dir
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "orders-converter")
+
+
+def hash_file(pdf_path: str) -> str:
+    """Returns the sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class EntryWriter:
+    """
+    Builds one cache entry row by row (see ExtractionCache.writer). Rows are
+    compressed as they are added, so only the compressed payload is held.
+    """
+
+    def __init__(self, cache: "ExtractionCache", key: str, meta: Dict[str, Any], columns: List[str]):
+        self._cache = cache
+        self._key = key
+        self._compressor = zlib.compressobj()
+        self._chunks = [self._compressor.compress(
+            f'{{"meta": {json.dumps(meta)}, "rows": [{json.dumps(columns)}'.encode("utf-8"))]
+        self.rows = 0
+
+    def add(self, row: List[str]) -> None:
+        self._chunks.append(self._compressor.compress(f", {json.dumps(row)}".encode("utf-8")))
+        self.rows += 1
+
+    def commit(self) -> None:
+        """Stores the entry; the same payload put() would have stored for the rows added."""
+        self._chunks.append(self._compressor.compress(b"]}"))
+        self._chunks.append(self._compressor.flush())
+        self._cache._store(self._key, b"".join(self._chunks))
+
+
+class ExtractionCache:
+    """
+    SQLite-backed store of (meta, rows) results with LRU eviction.
+
+    Entries older than max_age_days (by last access) are dropped first, then
+    the least recently used entries until the payload fits in max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 3600
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.db_path = os.path.join(self.cache_dir, "extraction-cache.sqlite3")
+        # Batch workers share the database, so wait for locks instead of failing.
+        self._conn = sqlite3.connect(self.db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.commit()
+
+    def __enter__(self) -> "ExtractionCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def key_for(self, pdf: Union[str, backends.PdfBuffer], engine: str = "text",
+                backend: str = backends.DEFAULT_BACKEND) -> str:
+        """The cache key of a PDF path or in-memory PdfBuffer (see backends.pdf_input)."""
+        digest = hash_file(pdf) if backends.is_path(pdf) else hashlib.sha256(pdf.view).hexdigest()
+        key = f"{digest}:{parser_fingerprint()}"
+        # Engines and backends differ on wrapped descriptions, so each
+        # combination gets its own entry.
+        if engine != "text":
+            key = f"{key}:{engine}"
+        if backend != backends.DEFAULT_BACKEND:
+            key = f"{key}:{backend}"
+        # Layouts registered at runtime can change which grammar a PDF is
+        # parsed with.
+        extra_layouts = [p.name for p in parser.LAYOUTS.profiles if p is not parser.STANDARD_LAYOUT]
+        if extra_layouts:
+            key = f"{key}:layouts={','.join(sorted(extra_layouts))}"
+        return key
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], List[List[str]]]]:
+        """Returns the cached (meta, rows) for a key, or None on a miss."""
+        row = self._conn.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        data = json.loads(zlib.decompress(row[0]))
+        return data["meta"], data["rows"]
+
+    def put(self, key: str, meta: Dict[str, Any], rows: List[List[str]]) -> None:
+        self._store(key, zlib.compress(json.dumps({"meta": meta, "rows": rows}).encode("utf-8")))
+
+    def writer(self, key: str, meta: Dict[str, Any], columns: List[str]) -> EntryWriter:
+        """
+        Returns an EntryWriter for an entry whose rows are streamed; nothing
+        is stored unless it is committed.
+        """
+        return EntryWriter(self, key, meta, columns)
+
+    def _store(self, key: str, payload: bytes) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, payload, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload), now, now),
+        )
+        self._conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """Applies the age and size limits; returns the number of entries removed."""
+        removed = self._conn.execute(
+            "DELETE FROM entries WHERE accessed < ?", (time.time() - self.max_age_seconds,)
+        ).rowcount
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        self._conn.commit()
+        if removed:
+            logging.info(f"Evicted {removed} extraction cache entries.")
+        return removed
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,216 @@
+"""
+Durable, append-only journal of batch conversions.
+
+Every batch run and every change of a file's status is appended to an
+SQLite database: `running` when a file is handed to a worker, then `done`,
+`failed` or `quarantined` with its input hash, output path, row count and
+timings. Nothing is updated in place, so a crash at any point leaves a
+consistent history, and a resumed run reads only each file's latest event
+to decide what is left.
+
+Whether a file is unchanged since it was journaled is decided by its size
+and mtime; only files whose stat changed are re-hashed, so resuming costs a
+stat per finished file plus the work that remains.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from orders_converter.io.extraction_cache import hash_file
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+QUARANTINED = "quarantined"
+FINISHED = (DONE, FAILED, QUARANTINED)
+
+# Groupings for BatchJournal.stats, as SQLite expressions over events.
+STATS_PERIODS = {
+    "run": "events.run_id",
+    "hour": "strftime('%Y-%m-%d %H:00', events.at, 'unixepoch', 'localtime')",
+    "day": "strftime('%Y-%m-%d', events.at, 'unixepoch', 'localtime')",
+}
+
+
+class JournalEntry(NamedTuple):
+    """The latest journaled event of one input file."""
+    pdf_path: str
+    status: str
+    output_path: str = ""
+    input_hash: str = ""
+    size: int = 0
+    mtime_ns: int = 0
+    rows: int = 0
+    error: str = ""
+    seconds: float = 0.0
+
+
+def _signature(pdf_path: str) -> Tuple[int, int]:
+    stat = os.stat(pdf_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class BatchJournal:
+    """SQLite-backed journal of batch runs, queryable for throughput over time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # An event lost to a power cut is only a file converted again.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " started REAL NOT NULL,"
+            " finished REAL,"
+            " files INTEGER NOT NULL,"
+            " resumed INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " run_id INTEGER NOT NULL,"
+            " pdf_path TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " output_path TEXT NOT NULL DEFAULT '',"
+            " input_hash TEXT NOT NULL DEFAULT '',"
+            " size INTEGER NOT NULL DEFAULT 0,"
+            " mtime_ns INTEGER NOT NULL DEFAULT 0,"
+            " rows INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT NOT NULL DEFAULT '',"
+            " seconds REAL NOT NULL DEFAULT 0,"
+            " at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS events_path ON events (pdf_path, id)")
+        self._conn.commit()
+
+    def __enter__(self) -> "BatchJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def start_run(self, files: int, resumed: bool = False) -> int:
+        """Records the start of a batch run over `files` inputs; returns its run id."""
+        cursor = self._conn.execute("INSERT INTO runs (started, files, resumed) VALUES (?, ?, ?)",
+                                    (time.time(), files, int(resumed)))
+        self._conn.commit()
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int) -> None:
+        self._conn.execute("UPDATE runs SET finished = ? WHERE run_id = ?", (time.time(), run_id))
+        self._conn.commit()
+
+    def running(self, run_id: int, targets: Iterable[Tuple[str, str]]) -> None:
+        """Records (pdf_path, output_path) pairs as handed to workers, in one transaction."""
+        now = time.time()
+        events = []
+        for pdf_path, output_path in targets:
+            try:
+                size, mtime_ns = _signature(pdf_path)
+            except OSError:
+                size, mtime_ns = 0, 0
+            events.append((run_id, os.path.abspath(pdf_path), RUNNING, output_path, size, mtime_ns, now))
+        self._conn.executemany(
+            "INSERT INTO events (run_id, pdf_path, status, output_path, size, mtime_ns, at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)", events)
+        self._conn.commit()
+
+    def record(self, run_id: int, pdf_path: str, status: str, output_path: str = "", input_hash: str = "",
+               rows: int = 0, error: str = "", seconds: float = 0.0) -> None:
+        """Appends a file's outcome (one of FINISHED)."""
+        try:
+            size, mtime_ns = _signature(pdf_path)
+        except OSError:
+            size, mtime_ns = 0, 0
+        self._conn.execute(
+            "INSERT INTO events (run_id, pdf_path, status, output_path, input_hash, size, mtime_ns, rows,"
+            " error, seconds, at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, os.path.abspath(pdf_path), status, output_path, input_hash, size, mtime_ns, rows,
+             error, seconds, time.time()))
+        self._conn.commit()
+
+    def latest(self) -> Dict[str, JournalEntry]:
+        """Returns each journaled file's latest event, by absolute path."""
+        rows = self._conn.execute(
+            "SELECT pdf_path, status, output_path, input_hash, size, mtime_ns, rows, error, seconds"
+            " FROM events WHERE id IN (SELECT MAX(id) FROM events GROUP BY pdf_path)"
+        ).fetchall()
+        return {row[0]: JournalEntry(*row) for row in rows}
+
+    def finished(self, targets: Iterable[Tuple[str, str]]) -> Dict[str, JournalEntry]:
+        """
+        Returns the entries of the (pdf_path, output_path) targets that a
+        resumed run can skip: done into the same, still present output, or
+        quarantined, and unchanged since. Failed and running files are left
+        out, so they are retried.
+        """
+        latest = self.latest()
+        skippable = {}
+        for pdf_path, output_path in targets:
+            entry = latest.get(os.path.abspath(pdf_path))
+            if entry is None or entry.status not in (DONE, QUARANTINED):
+                continue
+            if entry.status == DONE and (entry.output_path != output_path or not os.path.exists(output_path)):
+                continue
+            try:
+                unchanged = _signature(pdf_path) == (entry.size, entry.mtime_ns)
+                if not unchanged and entry.input_hash:
+                    # Touched or copied, but maybe not edited.
+                    unchanged = hash_file(pdf_path) == entry.input_hash
+            except OSError:
+                continue
+            if unchanged:
+                skippable[pdf_path] = entry
+        return skippable
+
+    def stats(self, by: str = "run") -> List[Dict[str, Any]]:
+        """
+        Throughput per run, hour or day: outcome counts, rows, summed
+        conversion seconds and wall seconds between the first and last event,
+        oldest period first.
+        """
+        if by not in STATS_PERIODS:
+            raise ValueError(f"Unknown period {by!r}; expected one of {', '.join(STATS_PERIODS)}.")
+        period = STATS_PERIODS[by]
+        rows = self._conn.execute(
+            f"SELECT {period} AS period,"
+            " SUM(status = 'done'), SUM(status = 'failed'), SUM(status = 'quarantined'),"
+            " SUM(rows), SUM(seconds), MIN(at), MAX(at)"
+            f" FROM events WHERE status IN {FINISHED!r}"
+            " GROUP BY period ORDER BY MIN(at)"
+        ).fetchall()
+        stats = []
+        for period_key, done, failed, quarantined, row_count, seconds, first, last in rows:
+            if by == "run":
+                # A run's clock starts when it was launched, not at its first result.
+                started = self._conn.execute("SELECT started FROM runs WHERE run_id = ?",
+                                             (period_key,)).fetchone()
+                first = started[0] if started else first
+            files = done + failed + quarantined
+            wall = last - first
+            stats.append({
+                "period": period_key, "files": files, "done": done, "failed": failed,
+                "quarantined": quarantined, "rows": row_count, "seconds": round(seconds, 3),
+                "wall_seconds": round(wall, 3), "files_per_second": round(files / wall, 3) if wall > 0 else None,
+            })
+        return stats
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def format_stats(stats: List[Dict[str, Any]], by: str = "run") -> str:
+    """Formats BatchJournal.stats() as a table."""
+    lines = [f"{by:<16} {'files':>7} {'done':>7} {'failed':>7} {'quar.':>7} {'rows':>9} {'wall s':>9} "
+             f"{'files/s':>8}"]
+    for s in stats:
+        rate = "-" if s["files_per_second"] is None else f"{s['files_per_second']:.2f}"
+        lines.append(f"{str(s['period']):<16} {s['files']:>7} {s['done']:>7} {s['failed']:>7} "
+                     f"{s['quarantined']:>7} {s['rows']:>9} {s['wall_seconds']:>9.1f} {rate:>8}")
+    return "\n".join(lines)
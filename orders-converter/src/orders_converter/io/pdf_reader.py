@@ -1,14 +1,40 @@
 """
-PDF reading utilities (placeholder).
+PDF reading utilities.
 """
 
 from orders_converter.core import parser
-from typing import Tuple, List, Dict, Any
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.io.backends import DEFAULT_BACKEND, PdfSource, pdf_input
+from orders_converter.io.extraction_cache import ExtractionCache
+from typing import Tuple, List, Dict, Any, Optional
 
-def read_pdf_table_and_meta(pdf_path: str) -> Tuple[Dict[str, Any], List[List[str]]]:
+def read_pdf_table_and_meta(pdf: PdfSource, page_jobs: int = 1, cache: Optional[ExtractionCache] = None,
+                            engine: str = "text",
+                            backend: str = DEFAULT_BACKEND) -> Tuple[Dict[str, Any], List[List[str]]]:
     """
     Reads the PDF and returns (meta, table_rows).
+    pdf is a path, or the PDF's bytes, a buffer, an mmap or a binary file
+    object, read in place (see io.backends.PdfBuffer).
+    The PDF is opened once and each page's text is laid out only once.
+    With page_jobs > 1 pages of a PDF given by path are laid out in parallel
+    worker processes first.
+    With a cache, previously seen PDFs are served without parsing.
+    engine selects the table extraction engine (see parser.ENGINES) and
+    backend the PDF library pages are read with (see io.backends.BACKENDS).
     """
-    meta = parser.extract_header_meta(pdf_path)
-    rows = parser.extract_table_rows(pdf_path)
-    return meta, rows 
\ No newline at end of file
+    with pdf_input(pdf) as source:
+        if cache is not None:
+            key = cache.key_for(source, engine, backend)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+
+        with PurchaseOrderDocument(source, backend=backend) as document:
+            if page_jobs > 1:
+                document.load_all_text(jobs=page_jobs)
+            meta = parser.extract_header_meta(document)
+            rows = parser.extract_table_rows(document, engine=engine)
+
+    if cache is not None:
+        cache.put(key, meta, rows)
+    return meta, rows
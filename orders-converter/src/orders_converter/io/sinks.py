@@ -0,0 +1,299 @@
+"""
+Typed columnar output: CSV, JSON Lines, Parquet and Arrow IPC.
+
+Extracted rows are all strings. The sinks here convert them once to a fixed
+schema (integer Qty, two-decimal Rate and Amount, zero-padded UPC and HTS
+Code) and prefix every row with the PO's meta, so the files of many POs can
+be loaded as one dataset. Parquet and Arrow need pyarrow, which is optional.
+"""
+
+import csv
+import glob
+import json
+import logging
+import os
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from orders_converter.core.order_table import LineItem
+from orders_converter.core.parser import TABLE_COLUMNS
+from orders_converter.utils.profiling import span
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CENTS = Decimal("0.01")
+# Rows per Parquet row group / Arrow record batch.
+BATCH_ROWS = 10_000
+
+
+class Field(NamedTuple):
+    name: str
+    # One of "string", "int", "decimal" (two places) or "date".
+    kind: str
+
+
+# Meta fields repeated on every row, then the line item.
+SCHEMA = [
+    Field("po_number", "string"),
+    Field("vendor_number", "string"),
+    Field("ship_by_date", "date"),
+    Field("payment_terms", "string"),
+    Field("order_total", "decimal"),
+    Field("qty", "int"),
+    Field("item_sku", "string"),
+    Field("dev_code", "string"),
+    Field("upc", "string"),
+    Field("hts_code", "string"),
+    Field("brand", "string"),
+    Field("description", "string"),
+    Field("rate", "decimal"),
+    Field("amount", "decimal"),
+]
+COLUMN_NAMES = [field.name for field in SCHEMA]
+
+UPC_DIGITS = 12
+HTS_DIGITS = 10
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    if value in (None, "", "N/A"):
+        return None
+    try:
+        return Decimal(str(value).replace("$", "").replace(",", "")).quantize(CENTS)
+    except InvalidOperation:
+        raise ValueError(f"Not an amount: {value!r}")
+
+
+def _date(value: Any) -> Optional[date]:
+    if value in (None, "", "N/A"):
+        return None
+    try:
+        return datetime.strptime(value, "%m/%d/%Y").date()
+    except ValueError:
+        raise ValueError(f"Not a MM/DD/YYYY date: {value!r}")
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value in (None, "N/A") else str(value)
+
+
+def _from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def typed_rows(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any]) -> Iterator[tuple]:
+    """
+    Converts extracted rows (TABLE_COLUMNS order, all strings) or LineItems
+    (already typed, so nothing is re-parsed) into SCHEMA tuples. Raises
+    ValueError on a string that does not fit its type.
+    """
+    prefix = (
+        _text(meta.get("po_number")),
+        _text(meta.get("vendor_number")),
+        _date(meta.get("ship_by_date")),
+        _text(meta.get("payment_terms")),
+        _decimal(meta.get("total")),
+    )
+    for row in rows:
+        if isinstance(row, LineItem):
+            yield prefix + (row.qty, row.item_sku, row.dev_code, row.upc.zfill(UPC_DIGITS),
+                            row.hts_code.zfill(HTS_DIGITS), row.brand, row.description,
+                            _from_cents(row.rate_cents), _from_cents(row.amount_cents))
+            continue
+        qty, sku, dev_code, upc, hts_code, brand, description, rate, amount = row
+        try:
+            qty = int(qty)
+        except ValueError:
+            raise ValueError(f"Not a quantity: {qty!r}")
+        yield prefix + (qty, sku, dev_code, upc.zfill(UPC_DIGITS), hts_code.zfill(HTS_DIGITS), brand, description,
+                        _decimal(rate), _decimal(amount))
+
+
+def _check_columns(columns: Optional[List[str]]) -> None:
+    if columns is not None and list(columns) != TABLE_COLUMNS:
+        raise ValueError(f"Typed output needs the standard PO columns, got {columns}.")
+
+
+def _plain(value: Any) -> Any:
+    """Text form of dates and decimals for CSV and JSON ("2025-05-01", "8.50")."""
+    if isinstance(value, (date, Decimal)):
+        return str(value)
+    return value
+
+
+def write_order_csv(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any], output_path: str,
+                    columns: Optional[List[str]] = None) -> int:
+    """Streams typed rows to a CSV file with a header line. Returns the row count."""
+    _check_columns(columns)
+    with span("csv_write") as s, open(output_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(COLUMN_NAMES)
+        row_count = 0
+        for row in typed_rows(rows, meta):
+            writer.writerow(["" if value is None else _plain(value) for value in row])
+            row_count += 1
+        s.set(rows=row_count)
+    logging.info(f"CSV file written to: {output_path} ({row_count} rows)")
+    return row_count
+
+
+def write_order_jsonl(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any], output_path: str,
+                      columns: Optional[List[str]] = None) -> int:
+    """
+    Streams typed rows to a JSON Lines file, one object per row. Decimals
+    are written as strings so no cents are lost to floating point.
+    """
+    _check_columns(columns)
+    with span("jsonl_write") as s, open(output_path, "w", encoding="utf-8") as fh:
+        row_count = 0
+        for row in typed_rows(rows, meta):
+            fh.write(json.dumps(dict(zip(COLUMN_NAMES, map(_plain, row)))))
+            fh.write("\n")
+            row_count += 1
+        s.set(rows=row_count)
+    logging.info(f"JSON Lines file written to: {output_path} ({row_count} rows)")
+    return row_count
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ValueError("Parquet and Arrow output need pyarrow; install it with `pip install pyarrow`.") from e
+    return pyarrow
+
+
+def arrow_schema():
+    """SCHEMA as a pyarrow schema (decimals are decimal128(12, 2))."""
+    pa = _pyarrow()
+    types = {"string": pa.string(), "int": pa.int64(), "decimal": pa.decimal128(12, 2), "date": pa.date32()}
+    return pa.schema([(field.name, types[field.kind]) for field in SCHEMA])
+
+
+def _record_batches(rows: Iterable[Sequence[Any]], meta: Dict[str, Any]) -> Iterator[Any]:
+    pa = _pyarrow()
+    schema = arrow_schema()
+    typed = typed_rows(rows, meta)
+    while True:
+        chunk = list(islice(typed, BATCH_ROWS))
+        if not chunk:
+            return
+        yield pa.RecordBatch.from_arrays([pa.array(values, type=schema.field(i).type)
+                                          for i, values in enumerate(zip(*chunk))], schema=schema)
+
+
+def write_order_parquet(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any], output_path: str,
+                        columns: Optional[List[str]] = None) -> int:
+    """Streams typed rows to a Parquet file, one row group per BATCH_ROWS rows."""
+    _check_columns(columns)
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    with span("parquet_write") as s:
+        row_count = 0
+        batches = _record_batches(rows, meta)
+        with pq.ParquetWriter(output_path, arrow_schema()) as writer:
+            for record_batch in batches:
+                writer.write_batch(record_batch)
+                row_count += record_batch.num_rows
+        s.set(rows=row_count)
+    logging.info(f"Parquet file written to: {output_path} ({row_count} rows)")
+    return row_count
+
+
+def write_order_arrow(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any], output_path: str,
+                      columns: Optional[List[str]] = None) -> int:
+    """Streams typed rows to an Arrow IPC (Feather v2) file."""
+    _check_columns(columns)
+    pa = _pyarrow()
+    with span("arrow_write") as s:
+        row_count = 0
+        with pa.OSFile(output_path, "wb") as sink, pa.ipc.new_file(sink, arrow_schema()) as writer:
+            for record_batch in _record_batches(rows, meta):
+                writer.write_batch(record_batch)
+                row_count += record_batch.num_rows
+        s.set(rows=row_count)
+    logging.info(f"Arrow file written to: {output_path} ({row_count} rows)")
+    return row_count
+
+
+def write_order_xlsx(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any], output_path: str,
+                     columns: Optional[List[str]] = None) -> int:
+    """io.excel_writer.write_order_excel, imported (with openpyxl) on first use."""
+    from orders_converter.io.excel_writer import write_order_excel
+
+    return write_order_excel(rows, meta, output_path, columns=columns)
+
+
+# Output formats by file extension (without the dot).
+FORMATS: Dict[str, Callable[..., int]] = {
+    "xlsx": write_order_xlsx,
+    "csv": write_order_csv,
+    "jsonl": write_order_jsonl,
+    "parquet": write_order_parquet,
+    "arrow": write_order_arrow,
+}
+
+
+def format_for(output_path: str) -> str:
+    """Returns the output format for a path's extension; raises ValueError if unknown."""
+    fmt = os.path.splitext(output_path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    return fmt
+
+
+def write_order(rows: Iterable[Union[Sequence[Any], LineItem]], meta: Dict[str, Any], output_path: str,
+                columns: Optional[List[str]] = None) -> int:
+    """Writes rows with the sink matching output_path's extension. Returns the row count."""
+    return FORMATS[format_for(output_path)](rows, meta, output_path, columns=columns)
+
+
+def read_dataset(paths: Iterable[str]) -> "pd.DataFrame":
+    """
+    Loads typed output files (CSV, JSON Lines, Parquet or Arrow; directories
+    are searched for all of them) into one DataFrame with SCHEMA's types:
+    strings stay strings (leading zeros intact), Qty is an integer, and dates
+    and decimals are date and Decimal objects, as pyarrow reads them.
+    """
+    import pandas as pd
+
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for fmt in ("csv", "jsonl", "parquet", "arrow"):
+                files.extend(sorted(glob.glob(os.path.join(path, f"*.{fmt}"))))
+        else:
+            files.append(path)
+
+    string_columns = {field.name: "string" for field in SCHEMA if field.kind == "string"}
+    decimal_columns = [field.name for field in SCHEMA if field.kind == "decimal"]
+    # Decimals are read as text and converted exactly, never through float.
+    text_dtypes = {**string_columns, **{name: "string" for name in decimal_columns}, "qty": "Int64"}
+    frames = []
+    for path in files:
+        fmt = format_for(path)
+        if fmt == "csv":
+            frame = pd.read_csv(path, dtype=text_dtypes, keep_default_na=False,
+                                na_values={name: [""] for name in COLUMN_NAMES if name not in string_columns})
+        elif fmt == "jsonl":
+            frame = pd.read_json(path, lines=True, dtype=text_dtypes)
+        elif fmt == "parquet":
+            _pyarrow()
+            frame = pd.read_parquet(path)
+        elif fmt == "arrow":
+            _pyarrow()
+            frame = pd.read_feather(path)
+        else:
+            raise ValueError(f"{path} is not a typed output file.")
+        if fmt in ("csv", "jsonl"):
+            for name in decimal_columns:
+                frame[name] = [None if pd.isna(v) else Decimal(v) for v in frame[name]]
+            frame["ship_by_date"] = pd.to_datetime(frame["ship_by_date"]).dt.date
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=COLUMN_NAMES)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,170 @@
+"""
+Background conversion queue used by the GUI.
+
+Conversions run on worker threads, at most max_workers at a time, so the
+caller's thread (the Tk main loop) never blocks on a PDF. Workers never touch
+the caller's state: they post JobEvents onto a thread-safe queue that the
+caller drains at its own pace. Cancelling is cooperative: a running job stops
+at its next page and removes the output it had started. Preview jobs parse a
+PDF into a PreviewModel instead of writing a file.
+"""
+
+import itertools
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, NamedTuple, Tuple
+
+if TYPE_CHECKING:
+    from orders_converter.preview import PreviewModel
+
+# PDF parsing holds the GIL, so more threads than this only slow each other
+# (and the UI) down without finishing the queue sooner.
+DEFAULT_WORKERS = 2
+
+QUEUED = "queued"
+STARTED = "started"
+PROGRESS = "progress"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker to stop a cancelled conversion."""
+
+
+class JobEvent(NamedTuple):
+    job_id: int
+    # One of QUEUED, STARTED, PROGRESS, DONE, FAILED or CANCELLED.
+    kind: str
+    pages_read: int = 0
+    page_count: int = 0
+    rows: int = 0
+    # The output path when a conversion is done, the error when failed.
+    message: str = ""
+
+
+Progress = Callable[[int, int], None]
+
+
+class ConversionQueue:
+    """
+    Converts PDFs on a pool of worker threads and reports on `events`.
+
+    Every job posts QUEUED, then STARTED and one PROGRESS event per page read,
+    and ends with exactly one of DONE, FAILED or CANCELLED.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS):
+        self.events: "queue.Queue[JobEvent]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="convert")
+        self._cancel: Dict[int, threading.Event] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_path: str, output_path: str) -> int:
+        """Queues a conversion and returns its job id."""
+        def convert(progress: Progress) -> Tuple[int, str]:
+            from orders_converter.pipeline import convert_pdf_to_excel
+
+            existed = os.path.exists(output_path)
+            try:
+                _, row_count = convert_pdf_to_excel(pdf_path, output_path, progress=progress)
+            except JobCancelled:
+                # Never delete a file the job did not create.
+                if not existed and os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+            return row_count, output_path
+
+        return self._submit(pdf_path, convert)
+
+    def submit_preview(self, pdf_path: str, model: "PreviewModel") -> int:
+        """
+        Queues parsing a PDF into model and returns the job id. Items are
+        added a page at a time, so the model fills while the job runs.
+        """
+        def preview(progress: Progress) -> Tuple[int, str]:
+            from orders_converter.core import parser
+            from orders_converter.core.document import PurchaseOrderDocument
+
+            parsed = []
+
+            def on_page(pages_read: int, page_count: int) -> None:
+                model.extend(parsed)
+                parsed.clear()
+                progress(pages_read, page_count)
+
+            with PurchaseOrderDocument(pdf_path, cache_text=False, on_page=on_page) as document:
+                for item in parser.iter_line_items(document):
+                    parsed.append(item)
+            model.extend(parsed)
+            return len(model), ""
+
+        return self._submit(pdf_path, preview)
+
+    def _submit(self, pdf_path: str, work: Callable[[Progress], Tuple[int, str]]) -> int:
+        cancelled = threading.Event()
+        with self._lock:
+            job_id = next(self._ids)
+            self._cancel[job_id] = cancelled
+        self.events.put(JobEvent(job_id, QUEUED))
+        self._executor.submit(self._run, job_id, pdf_path, work, cancelled)
+        return job_id
+
+    def cancel(self, job_id: int) -> bool:
+        """Asks a job to stop; returns False if it has already finished."""
+        with self._lock:
+            cancelled = self._cancel.get(job_id)
+        if cancelled is None:
+            return False
+        cancelled.set()
+        return True
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            pending = list(self._cancel.values())
+        for cancelled in pending:
+            cancelled.set()
+
+    @property
+    def active(self) -> int:
+        """Jobs queued or running."""
+        with self._lock:
+            return len(self._cancel)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancels every job and stops the workers."""
+        self.cancel_all()
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id: int, pdf_path: str, work: Callable[[Progress], Tuple[int, str]],
+             cancelled: threading.Event) -> None:
+        try:
+            if cancelled.is_set():
+                self.events.put(JobEvent(job_id, CANCELLED))
+                return
+            self.events.put(JobEvent(job_id, STARTED))
+
+            def progress(pages_read: int, page_count: int) -> None:
+                if cancelled.is_set():
+                    raise JobCancelled()
+                self.events.put(JobEvent(job_id, PROGRESS, pages_read, page_count))
+
+            try:
+                row_count, message = work(progress)
+            except JobCancelled:
+                logging.info(f"Cancelled job for {pdf_path}.")
+                self.events.put(JobEvent(job_id, CANCELLED))
+            except Exception as e:
+                logging.error(f"Error processing {pdf_path}: {e}", exc_info=True)
+                self.events.put(JobEvent(job_id, FAILED, message=str(e)))
+            else:
+                self.events.put(JobEvent(job_id, DONE, rows=row_count, message=message))
+        finally:
+            with self._lock:
+                del self._cancel[job_id]
@@ -0,0 +1,102 @@
+"""
+End-to-end conversion of a PDF to Excel or another output format, shared by
+the CLI, GUI and batch mode.
+"""
+
+import logging
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from orders_converter.core import parser
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.io.backends import DEFAULT_BACKEND, PdfBuffer, PdfSource, describe_source, pdf_input
+from orders_converter.io.extraction_cache import EntryWriter, ExtractionCache
+from orders_converter.io.sinks import format_for, write_order
+from orders_converter.utils.profiling import span
+
+
+def _collect(rows: Iterator[List[str]], entry: EntryWriter) -> Iterator[List[str]]:
+    """Passes rows through, adding each to a cache entry."""
+    for row in rows:
+        entry.add(row)
+        yield row
+
+
+def convert_pdf_to_excel(pdf: PdfSource, output_path: str, page_jobs: int = 1,
+                         cache: Optional[ExtractionCache] = None,
+                         engine: str = "text",
+                         backend: str = DEFAULT_BACKEND,
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         memory_budget_mb: Optional[float] = None) -> Tuple[Dict[str, Any], int]:
+    """
+    Converts one PDF and returns (meta, row_count).
+
+    Despite the name, the output can be any format in io.sinks.FORMATS,
+    chosen by output_path's extension. Rows stream from the parser straight
+    into the output, so no row list or DataFrame is built, and ValueError is
+    raised before anything is written if the PDF has no table rows.
+
+    pdf is a path, or the PDF's bytes, a buffer, an mmap or a binary file
+    object, read in place (see io.backends.PdfBuffer). With a cache, a hit
+    skips parsing and a miss stores the rows, compressed as they stream past.
+    engine and backend pick the extraction engine (parser.ENGINES) and the
+    PDF library (io.backends.BACKENDS). progress(pages_read, page_count) is
+    called as pages are read; raising from it stops the conversion.
+    memory_budget_mb caps the RSS the conversion tries to stay under (see
+    PurchaseOrderDocument) and turns off parallel page layout, which holds
+    every page's text at once.
+    """
+    # Reject an unknown extension before any parsing.
+    format_for(output_path)
+    with pdf_input(pdf) as source:
+        return _convert(source, output_path, page_jobs, cache, engine, backend, progress, memory_budget_mb)
+
+
+def _convert(source: Union[str, PdfBuffer], output_path: str, page_jobs: int, cache: Optional[ExtractionCache],
+             engine: str, backend: str, progress: Optional[Callable[[int, int], None]],
+             memory_budget_mb: Optional[float]) -> Tuple[Dict[str, Any], int]:
+    name = describe_source(source)
+    key = None
+    if cache is not None:
+        with span("cache_lookup") as s:
+            key = cache.key_for(source, engine, backend)
+            hit = cache.get(key)
+            s.set(hit=hit is not None)
+        if hit is not None:
+            meta, rows = hit
+            logging.info(f"Extraction cache hit for {name}.")
+            if progress is not None and meta.get("page_count"):
+                progress(meta["page_count"], meta["page_count"])
+            if len(rows) <= 1:
+                raise ValueError("No table rows found in the PDF.")
+            row_count = write_order(rows[1:], meta, output_path, columns=rows[0])
+            return meta, row_count
+
+    parallel = page_jobs > 1 and memory_budget_mb is None
+    # Rows stream one page at a time, so only parallel layout needs every page's text.
+    with PurchaseOrderDocument(source, cache_text=parallel, backend=backend, on_page=progress,
+                               memory_budget_mb=memory_budget_mb) as document:
+        if parallel:
+            document.load_all_text(jobs=page_jobs)
+        meta = parser.extract_header_meta(document)
+        _, columns = parser.find_header(document)
+        rows = parser.iter_table_rows(document, engine=engine)
+        entry = None
+        if cache is not None and columns:
+            entry = cache.writer(key, meta, columns)
+            rows = _collect(rows, entry)
+        first = next(rows, None)
+        if not columns or first is None:
+            if entry is not None:
+                entry.commit()
+            elif cache is not None:
+                cache.put(key, meta, [])
+            raise ValueError("No table rows found in the PDF.")
+        row_count = write_order(chain([first], rows), meta, output_path, columns=columns)
+
+    if entry is not None:
+        with span("cache_store", rows=entry.rows):
+            entry.commit()
+
+    logging.info(f"Converted {name} -> {output_path} ({row_count} rows).")
+    return meta, row_count
@@ -0,0 +1,92 @@
+"""
+Row store behind the GUI's extracted-rows preview.
+
+The preview never holds more Tk widgets than fit on screen; this model holds
+the rows. Items are kept column-wise in an OrderTable as the parser produces
+them (from a worker thread, while the GUI reads), and Item SKU and UPC are
+indexed as they arrive, so a search looks up a sorted key list instead of
+scanning every row.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from orders_converter.core.order_table import LineItem, OrderTable
+
+# Columns that can be searched, by LineItem attribute.
+SEARCH_COLUMNS = ("item_sku", "upc")
+
+
+class _PrefixIndex:
+    """Row numbers by key, with the keys kept sorted for prefix lookups."""
+
+    def __init__(self):
+        self.rows: Dict[str, List[int]] = {}
+        self._keys: List[str] = []
+        self._new_keys: List[str] = []
+
+    def add(self, key: str, row: int) -> None:
+        rows = self.rows.get(key)
+        if rows is None:
+            self.rows[key] = [row]
+            self._new_keys.append(key)
+        else:
+            rows.append(row)
+
+    def prefixed(self, prefix: str) -> Iterable[List[int]]:
+        """Yields the row lists of every key starting with prefix."""
+        if self._new_keys:
+            # Sorting an already sorted list plus a short tail is close to linear.
+            self._keys = sorted(self._keys + self._new_keys)
+            self._new_keys = []
+        keys = self._keys
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield self.rows[keys[i]]
+            i += 1
+
+
+class PreviewModel:
+    """
+    Extracted line items for display, appended by one thread and read by
+    another. Rows are numbered in extraction order.
+    """
+
+    def __init__(self):
+        self._table = OrderTable()
+        self._lock = threading.Lock()
+        self._indexes = {column: _PrefixIndex() for column in SEARCH_COLUMNS}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._table)
+
+    def extend(self, items: Iterable[LineItem]) -> None:
+        with self._lock:
+            for item in items:
+                row = len(self._table)
+                self._table.append(item)
+                for column, index in self._indexes.items():
+                    index.add(getattr(item, column).upper(), row)
+
+    def rows(self, numbers: Sequence[int]) -> List[List[str]]:
+        """Returns the given rows as strings, in TABLE_COLUMNS order."""
+        with self._lock:
+            return [self._table[n].to_row() for n in numbers]
+
+    def search(self, query: str, column: Optional[str] = None) -> List[int]:
+        """
+        Returns, in order, the rows whose Item SKU or UPC (or only the named
+        column) starts with query, ignoring case.
+        """
+        if column is not None and column not in self._indexes:
+            raise ValueError(f"Cannot search {column!r}; expected one of {', '.join(SEARCH_COLUMNS)}.")
+        prefix = query.strip().upper()
+        columns = [column] if column is not None else SEARCH_COLUMNS
+        found = set()
+        with self._lock:
+            for name in columns:
+                for rows in self._indexes[name].prefixed(prefix):
+                    found.update(rows)
+        return sorted(found)
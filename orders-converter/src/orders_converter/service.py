@@ -0,0 +1,280 @@
+"""
+Local HTTP conversion service backed by a pool of warm worker processes.
+
+    POST /convert?format=json|xlsx   body: the raw PDF bytes
+    GET  /health
+    GET  /metrics                    cumulative per-stage counters (Prometheus text)
+
+Conversions beyond max_in_flight are rejected with 503 (and Retry-After)
+instead of queueing without bound; uploads are capped by size and pages.
+A PO that cannot be converted gets 422 with the reason; a dead worker pool
+gets 503 while it is replaced, and any other server-side failure 500,
+without internal details.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from orders_converter.utils.profiling import Profiler, StageMetrics
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_PAGES = 2000
+HEADER_TIMEOUT = 30.0
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 422: "Unprocessable Entity",
+    429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+METRICS_TYPE = "text/plain; version=0.0.4"
+
+
+class PageLimitExceeded(ValueError):
+    """Raised by a worker when a PDF has more pages than the service accepts."""
+
+
+class UnreadablePdf(ValueError):
+    """Raised by a worker when the uploaded bytes cannot be opened as a PDF."""
+
+
+def _warm_worker() -> None:
+    """Pool initializer: import the conversion stack once per worker process."""
+    import pandas  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import openpyxl  # noqa: F401
+    from orders_converter import pipeline  # noqa: F401
+
+
+def _noop() -> None:
+    pass
+
+
+def _pool_context() -> Any:
+    """
+    Workers come from a fork server where available: a replacement pool is
+    started while connections are open, and workers forked straight from the
+    service would inherit those sockets and keep them from ever closing.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def convert_upload(pdf_bytes: bytes, fmt: str, max_pages: int) -> Tuple[Dict[str, Any], Any, Dict[str, Any]]:
+    """
+    Worker entry point. Returns (meta, payload, stages) where payload is the
+    table rows for fmt='json' or the workbook bytes for fmt='xlsx', and
+    stages is the conversion's Profiler.stage_totals().
+    """
+    from orders_converter.core import parser
+    from orders_converter.core.document import PurchaseOrderDocument
+    from orders_converter.io.excel_writer import write_order_excel
+
+    with Profiler() as profiler:
+        # Parsed straight from the uploaded bytes; nothing touches the disk.
+        try:
+            document = PurchaseOrderDocument(pdf_bytes)
+        except Exception as e:
+            raise UnreadablePdf(f"Not a readable PDF: {e or type(e).__name__}") from e
+        with document:
+            if document.page_count > max_pages:
+                raise PageLimitExceeded(f"PDF has {document.page_count} pages; the limit is {max_pages}.")
+            meta = parser.extract_header_meta(document)
+            rows = parser.extract_table_rows(document)
+
+        if len(rows) <= 1:
+            raise ValueError("No table rows found in the PDF.")
+        if fmt == "xlsx":
+            buffer = io.BytesIO()
+            write_order_excel(rows[1:], meta, buffer, columns=rows[0])
+            return meta, buffer.getvalue(), profiler.stage_totals()
+    return meta, rows, profiler.stage_totals()
+
+
+class ConversionService:
+    """
+    asyncio HTTP front end for a process pool of warm converters.
+
+    max_in_flight bounds concurrent conversions; requests beyond it get an
+    immediate 503 so callers can back off rather than pile up on the pool.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_pages: int = DEFAULT_MAX_PAGES):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = self.workers * 2 if max_in_flight is None else max_in_flight
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.metrics = StageMetrics()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._restarting: Optional["asyncio.Future[None]"] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _start_pool(self) -> None:
+        """Starts a pool of warm workers; until it is up, self._executor stays None."""
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                       mp_context=_pool_context())
+        loop = asyncio.get_running_loop()
+        try:
+            # Spawn and warm every worker now rather than on the first requests.
+            await asyncio.gather(*(loop.run_in_executor(executor, _noop) for _ in range(self.workers)))
+        except Exception:
+            executor.shutdown(wait=False)
+            raise
+        self._executor = executor
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Drops a pool whose worker died and starts a new one in the background."""
+        if self._executor is broken:
+            self._executor = None
+            broken.shutdown(wait=False)
+        if self._executor is None and (self._restarting is None or self._restarting.done()):
+            logging.warning("Starting a new worker pool.")
+            self._restarting = asyncio.ensure_future(self._start_pool())
+            self._restarting.add_done_callback(self._pool_started)
+
+    @staticmethod
+    def _pool_started(future: "asyncio.Future[None]") -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logging.error("Could not start a new worker pool; retrying on the next request.",
+                          exc_info=future.exception())
+
+    async def start(self) -> None:
+        await self._start_pool()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"Serving on http://{self.host}:{self.port} with {self.workers} workers "
+                     f"(max {self.max_in_flight} in flight).")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._restarting is not None and not self._restarting.done():
+            await asyncio.wait([self._restarting])
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, headers, body = await self._respond(reader)
+        except Exception as e:
+            logging.error(f"Request failed: {e}", exc_info=True)
+            status, headers, body = self._json(500, {"error": "internal error"})
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _json(status: int, payload: Dict[str, Any], **headers: str) -> Tuple[int, Dict[str, str], bytes]:
+        headers = {"Content-Type": "application/json", **headers}
+        return status, headers, json.dumps(payload).encode("utf-8")
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+        try:
+            raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            return self._json(400, {"error": "malformed request"})
+        lines = raw.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            return self._json(400, {"error": "malformed request line"})
+        request_headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                request_headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+
+        if url.path == "/health":
+            if self._executor is None:
+                return self._json(503, {"status": "unavailable", "in_flight": self.in_flight})
+            return self._json(200, {"status": "ok", "in_flight": self.in_flight,
+                                    "max_in_flight": self.max_in_flight, "completed": self.completed,
+                                    "rejected": self.rejected})
+        if url.path == "/metrics":
+            return 200, {"Content-Type": METRICS_TYPE}, self.metrics.render().encode("utf-8")
+        if url.path != "/convert":
+            return self._json(404, {"error": "not found"})
+        if method != "POST":
+            return self._json(405, {"error": "use POST"}, Allow="POST")
+
+        fmt = parse_qs(url.query).get("format", ["json"])[0]
+        if fmt not in ("json", "xlsx"):
+            return self._json(400, {"error": "format must be json or xlsx"})
+        if "content-length" not in request_headers:
+            return self._json(411, {"error": "Content-Length required"})
+        if not (request_headers["content-length"].isascii() and request_headers["content-length"].isdigit()):
+            return self._json(400, {"error": "bad Content-Length"})
+        length = int(request_headers["content-length"])
+        if length > self.max_bytes:
+            return self._json(413, {"error": f"upload exceeds {self.max_bytes} bytes"})
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            return self._json(503, {"error": "converter saturated, retry later"}, **{"Retry-After": "1"})
+        executor = self._executor
+        if executor is None:
+            # The pool is being replaced after a worker died.
+            self._replace_pool(executor)
+            return self._json(503, {"error": "converter unavailable"}, **{"Retry-After": "1"})
+
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            pdf_bytes = await reader.readexactly(length)
+            meta, payload, stages = await loop.run_in_executor(
+                executor, convert_upload, pdf_bytes, fmt, self.max_pages)
+        except asyncio.IncompleteReadError:
+            return self._json(400, {"error": "body shorter than Content-Length"})
+        except PageLimitExceeded as e:
+            self.metrics.add(None, ok=False, seconds=loop.time() - start)
+            return self._json(413, {"error": str(e)})
+        except ValueError as e:
+            # The PO itself is at fault: not a PDF, or no table in it.
+            self.metrics.add(None, ok=False, seconds=loop.time() - start)
+            return self._json(422, {"error": str(e) or type(e).__name__})
+        except BrokenProcessPool:
+            self.metrics.add(None, ok=False, seconds=loop.time() - start)
+            logging.error("A conversion worker died; replacing the pool.", exc_info=True)
+            self._replace_pool(executor)
+            return self._json(503, {"error": "converter unavailable"}, **{"Retry-After": "1"})
+        except Exception:
+            self.metrics.add(None, ok=False, seconds=loop.time() - start)
+            logging.error("Conversion failed with an internal error.", exc_info=True)
+            return self._json(500, {"error": "internal error"})
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        row_count = len(payload) - 1 if fmt == "json" else stages.get("excel_write", {}).get("rows", 0)
+        self.metrics.add(stages, ok=True, rows=row_count, seconds=loop.time() - start)
+        if fmt == "xlsx":
+            return 200, {"Content-Type": XLSX_TYPE}, payload
+        return self._json(200, {"meta": meta, "columns": payload[0], "rows": payload[1:]})
@@ -0,0 +1,153 @@
+"""
+Pre-flight triage: sorts PDFs into convertible and quarantine before any
+layout work.
+
+Only cheap checks are made, cheapest first, and the first failing one is the
+reason a PDF is quarantined: the file's bytes (empty, no PDF header, no
+%%EOF marker as left by a truncated upload), whether it opens (encrypted,
+unreadable), its page count, and the plain text of its first TEXT_PAGES
+pages (no text layer, as in image-only scans). The PO header row of a
+registered layout is looked for on those pages and, like the parser does,
+on the pages after them, so a PO whose table follows a cover letter or terms
+pages is not quarantined. Pages are read with PDFium, which opens a file and
+extracts a page's text in a few milliseconds, so only PDFs that hold text but
+no header at all cost a read of every page.
+"""
+
+import os
+import time
+from collections import Counter
+from typing import Iterable, List, NamedTuple, Optional
+
+from orders_converter.io.backends import open_backend
+from orders_converter.utils.profiling import span
+
+TRIAGE_BACKEND = "pdfium"
+# Pages searched for a text layer; the header row is searched for on all.
+TEXT_PAGES = 2
+# Bytes read from each end of the file for the structure checks.
+HEAD_BYTES = 1024
+TAIL_BYTES = 1024
+
+EMPTY = "empty file"
+NOT_PDF = "not a PDF"
+TRUNCATED = "truncated (no %%EOF marker)"
+ENCRYPTED = "encrypted"
+UNREADABLE = "unreadable"
+NO_PAGES = "no pages"
+NO_TEXT = "no text layer (image-only scan?)"
+NO_HEADER = "no PO header row"
+
+
+class TriageResult(NamedTuple):
+    """Triage outcome of a single PDF."""
+    pdf_path: str
+    # Why the PDF is quarantined; "" if it is convertible.
+    reason: str = ""
+    page_count: int = 0
+    # The detected layout's name, for convertible PDFs.
+    layout: str = ""
+    seconds: float = 0.0
+
+    @property
+    def convertible(self) -> bool:
+        return not self.reason
+
+
+def _is_encrypted(error: Exception) -> bool:
+    """PDFium reports a password error; pdfminer raises PDFPasswordIncorrect or PDFEncryptionError."""
+    names = f"{type(error).__name__} {type(error.__cause__).__name__} {error}".lower()
+    return "password" in names or "encrypt" in names
+
+
+def _check_structure(pdf_path: str) -> str:
+    """Returns why the file cannot be a complete PDF, or ""."""
+    size = os.path.getsize(pdf_path)
+    if size == 0:
+        return EMPTY
+    with open(pdf_path, "rb") as fh:
+        # Readers accept a little junk before the header, so search for it.
+        if b"%PDF-" not in fh.read(HEAD_BYTES):
+            return NOT_PDF
+        fh.seek(max(0, size - TAIL_BYTES))
+        if b"%%EOF" not in fh.read():
+            return TRUNCATED
+    return ""
+
+
+def triage_pdf(pdf_path: str, backend: str = TRIAGE_BACKEND, pages: int = TEXT_PAGES) -> TriageResult:
+    """Runs the cheap checks on one PDF. Never raises for a bad file."""
+    from orders_converter.core import parser
+
+    start = time.perf_counter()
+    reason, page_count, layout = "", 0, ""
+    with span("triage") as s:
+        try:
+            reason = _check_structure(pdf_path)
+        except OSError as e:
+            reason = f"{UNREADABLE}: {e}"
+        if not reason:
+            try:
+                opened = open_backend(pdf_path, backend)
+            except Exception as e:
+                reason = ENCRYPTED if _is_encrypted(e) else f"{UNREADABLE}: {e or type(e).__name__}"
+            else:
+                try:
+                    page_count = opened.page_count
+                    has_text = False
+                    for index in range(page_count):
+                        # Without text on the first pages this is a scan, not a PO.
+                        if index >= pages and not has_text:
+                            break
+                        text = opened.page_text(index)
+                        has_text = has_text or bool(text.strip())
+                        match = parser.LAYOUTS.detect(text)
+                        if match is not None and match.header_line:
+                            layout = match.profile.name
+                            break
+                        opened.release(index)
+                    if not page_count:
+                        reason = NO_PAGES
+                    elif not has_text:
+                        reason = NO_TEXT
+                    elif not layout:
+                        reason = NO_HEADER
+                except Exception as e:
+                    reason = f"{UNREADABLE}: {e or type(e).__name__}"
+                finally:
+                    opened.close()
+        s.set(quarantined=bool(reason))
+    return TriageResult(pdf_path, reason, page_count, layout, time.perf_counter() - start)
+
+
+def triage_all(pdf_paths: List[str], jobs: Optional[int] = None,
+               backend: str = TRIAGE_BACKEND) -> List[TriageResult]:
+    """
+    Triages PDFs across `jobs` worker processes (defaults to the CPU count).
+    Results are returned in input order.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pdf_paths) <= 1:
+        return [triage_pdf(path, backend) for path in pdf_paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Each check takes milliseconds, so hand workers files in chunks.
+    chunksize = max(1, len(pdf_paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pdf_paths))) as executor:
+        return list(executor.map(triage_pdf, pdf_paths, [backend] * len(pdf_paths), chunksize=chunksize))
+
+
+def format_triage(results: Iterable[TriageResult]) -> str:
+    """Formats a bulk triage report: each quarantined file, then counts by reason."""
+    results = list(results)
+    quarantined = [r for r in results if not r.convertible]
+    lines = [f"  QUARANTINE  {r.pdf_path}: {r.reason}" for r in quarantined]
+    # Unreadable files carry the library's message; count them together.
+    reasons = Counter(r.reason.split(":")[0] for r in quarantined)
+    for reason, count in reasons.most_common():
+        lines.append(f"  {count:>6}  {reason}")
+    lines.append(f"{len(results) - len(quarantined)} convertible, {len(quarantined)} quarantined, "
+                 f"{len(results)} total.")
+    return "\n".join(lines)
+
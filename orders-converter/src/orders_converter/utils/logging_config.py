@@ -5,10 +5,10 @@ Logging configuration utilities (placeholder).
 import logging
 import logging.config
 
-def setup_logging():
+def setup_logging(level: str = 'DEBUG'):
     """
     Set up logging for the application.
-    This configuration sends logs to the console.
+    This configuration sends logs to the console at the given level.
     """
     LOGGING_CONFIG = {
         'version': 1,
@@ -22,14 +22,14 @@ def setup_logging():
         'handlers': {
             'console': {
                 'class': 'logging.StreamHandler',
-                'level': 'DEBUG',
+                'level': level,
                 'formatter': 'default',
                 'stream': 'ext://sys.stdout',  # Or sys.stderr
             },
         },
         'loggers': {
             '': {  # root logger
-                'level': 'DEBUG',
+                'level': level,
                 'handlers': ['console'],
                 'propagate': True,
             },
@@ -0,0 +1,43 @@
+"""
+Resident memory of the current process, for conversion memory budgets.
+
+psutil is used when installed; otherwise Linux's /proc is read directly.
+Where neither is available current_rss_mb() returns None and budgets are not
+enforced. psutil is imported on the first reading, not with this module, and
+the outcome is kept, since budgets check RSS after every page.
+"""
+
+import os
+from typing import Any, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# The psutil module, False if it is not installed, or None before the first reading.
+_psutil: Any = None
+# psutil.Process for the current pid, created on first use (and again after a fork).
+_process = None
+
+
+def _load_psutil() -> Any:
+    global _psutil
+    if _psutil is None:
+        try:
+            import psutil
+        except ImportError:
+            psutil = False
+        _psutil = psutil
+    return _psutil
+
+
+def current_rss_mb() -> Optional[float]:
+    """Returns this process's resident set size in MB, or None if it cannot be read."""
+    global _process
+    psutil = _load_psutil()
+    if psutil:
+        if _process is None or _process.pid != os.getpid():
+            _process = psutil.Process()
+        return _process.memory_info().rss / 1e6
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE / 1e6
+    except (OSError, IndexError, ValueError):
+        return None
@@ -0,0 +1,263 @@
+"""
+Per-stage profiling spans and cumulative stage metrics.
+
+Conversion code marks its stages with `span(...)`:
+
+    with span("match_items", page=3) as s:
+        ...
+        s.set(rows=len(rows))
+
+Spans are only recorded inside an active Profiler; otherwise `span` returns
+a shared no-op object, so instrumented code costs one context-variable
+lookup per stage when profiling is off.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+_active: "ContextVar[Optional[Profiler]]" = ContextVar("orders_converter_profiler", default=None)
+
+
+class _NullSpan:
+    """Stand-in returned by span() when no profiler is active."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    def set(self, **tags: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed (and optionally memory-traced) stage of a conversion."""
+
+    __slots__ = ("profiler", "name", "tags", "depth", "start", "seconds", "child_seconds",
+                 "peak_bytes", "_base_bytes", "_peak_seen")
+
+    def __init__(self, profiler: "Profiler", name: str, tags: Dict[str, Any]):
+        self.profiler = profiler
+        self.name = name
+        self.tags = tags
+        self.depth = 0
+        self.start = 0.0
+        self.seconds = 0.0
+        self.child_seconds = 0.0
+        self.peak_bytes: Optional[int] = None
+        self._base_bytes = 0
+        self._peak_seen = 0
+
+    def set(self, **tags: Any) -> None:
+        """Adds tags (e.g. row counts) known only once the stage has run."""
+        self.tags.update(tags)
+
+    @property
+    def self_seconds(self) -> float:
+        """Time spent in this span outside of its child spans."""
+        return max(self.seconds - self.child_seconds, 0.0)
+
+    def __enter__(self) -> "Span":
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.profiler._exit(self)
+        if exc_type is not None:
+            self.tags.setdefault("error", exc_type.__name__)
+
+
+class Profiler:
+    """
+    Collects the spans opened while it is active.
+
+    With memory=True each span also records its peak traced allocation
+    (tracemalloc), which slows the conversion down noticeably; timings from
+    a memory-traced run are best read relative to each other.
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.spans: List[Span] = []
+        self.started = 0.0
+        self.seconds = 0.0
+        self._stack: List[Span] = []
+        self._token = None
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _active.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.seconds = time.perf_counter() - self.started
+        _active.reset(self._token)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _enter(self, s: Span) -> None:
+        s.depth = len(self._stack)
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent._peak_seen = max(parent._peak_seen, peak)
+            s._base_bytes = current
+            s._peak_seen = current
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        self._stack.append(s)
+        self.spans.append(s)
+        s.start = time.perf_counter()
+
+    def _exit(self, s: Span) -> None:
+        s.seconds = time.perf_counter() - s.start
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1].child_seconds += s.seconds
+        if self.memory:
+            peak = max(s._peak_seen, tracemalloc.get_traced_memory()[1])
+            s.peak_bytes = peak - s._base_bytes
+            if self._stack:
+                parent = self._stack[-1]
+                parent._peak_seen = max(parent._peak_seen, peak)
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregates spans by name: calls, seconds (including nested spans),
+        self_seconds (excluding them), rows, and peak_bytes when memory is traced.
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            stage = totals.setdefault(s.name, {"calls": 0, "seconds": 0.0, "self_seconds": 0.0, "rows": 0})
+            stage["calls"] += 1
+            stage["seconds"] += s.seconds
+            stage["self_seconds"] += s.self_seconds
+            stage["rows"] += s.tags.get("rows", 0)
+            if s.peak_bytes is not None:
+                stage["peak_bytes"] = max(stage.get("peak_bytes", 0), s.peak_bytes)
+        return totals
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the profile as a JSON-serialisable dict."""
+        spans = []
+        for s in self.spans:
+            entry = {
+                "name": s.name,
+                "depth": s.depth,
+                "offset": round(s.start - self.started, 6),
+                "seconds": round(s.seconds, 6),
+                "self_seconds": round(s.self_seconds, 6),
+                "tags": s.tags,
+            }
+            if s.peak_bytes is not None:
+                entry["peak_mb"] = round(s.peak_bytes / 1e6, 3)
+            spans.append(entry)
+        return {
+            "seconds": round(self.seconds, 6),
+            "memory": self.memory,
+            "stages": self.stage_totals(),
+            "spans": spans,
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=2, default=str)
+            fh.write("\n")
+
+
+def span(name: str, **tags: Any):
+    """Returns a context manager timing one stage under the active profiler."""
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_SPAN
+    return Span(profiler, name, tags)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class StageMetrics:
+    """
+    Cumulative per-stage counters across many conversions, exported in the
+    Prometheus text exposition format (e.g. for node_exporter's textfile
+    collector or a /metrics endpoint).
+    """
+
+    PREFIX = "orders_converter"
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.conversions = {"ok": 0, "failed": 0}
+        self.rows = 0
+        self.seconds = 0.0
+
+    def add(self, stages: Optional[Dict[str, Dict[str, float]]], ok: bool = True,
+            rows: int = 0, seconds: float = 0.0) -> None:
+        """Folds one conversion's Profiler.stage_totals() into the counters."""
+        self.conversions["ok" if ok else "failed"] += 1
+        self.rows += rows
+        self.seconds += seconds
+        for name, totals in (stages or {}).items():
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "self_seconds": 0.0, "rows": 0})
+            for key in ("calls", "seconds", "self_seconds", "rows"):
+                stage[key] += totals.get(key, 0)
+            if "peak_bytes" in totals:
+                stage["peak_bytes"] = max(stage.get("peak_bytes", 0), totals["peak_bytes"])
+
+    def render(self) -> str:
+        p = self.PREFIX
+        lines = [
+            f"# HELP {p}_conversions_total PDF conversions by outcome.",
+            f"# TYPE {p}_conversions_total counter",
+        ]
+        for status, count in self.conversions.items():
+            lines.append(f'{p}_conversions_total{{status="{status}"}} {count}')
+        lines += [
+            f"# HELP {p}_rows_total Table rows written.",
+            f"# TYPE {p}_rows_total counter",
+            f"{p}_rows_total {self.rows}",
+            f"# HELP {p}_conversion_seconds_total Wall time spent converting.",
+            f"# TYPE {p}_conversion_seconds_total counter",
+            f"{p}_conversion_seconds_total {self.seconds:.6f}",
+        ]
+        series = [
+            ("stage_calls_total", "calls", "Times each stage ran.", "counter"),
+            ("stage_seconds_total", "seconds", "Time in each stage, including nested stages.", "counter"),
+            ("stage_self_seconds_total", "self_seconds", "Time in each stage, excluding nested stages.",
+             "counter"),
+            ("stage_rows_total", "rows", "Rows produced by each stage.", "counter"),
+            ("stage_peak_bytes", "peak_bytes", "Largest traced allocation peak seen in each stage.", "gauge"),
+        ]
+        for metric, key, help_text, kind in series:
+            samples = [(name, totals[key]) for name, totals in sorted(self.stages.items()) if key in totals]
+            if not samples:
+                continue
+            lines += [f"# HELP {p}_{metric} {help_text}", f"# TYPE {p}_{metric} {kind}"]
+            for name, value in samples:
+                value = f"{value:.6f}" if isinstance(value, float) else str(value)
+                lines.append(f'{p}_{metric}{{stage="{_escape_label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Writes the metrics file atomically, so scrapers never read a partial file."""
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(self.render())
+        os.replace(tmp_path, path)
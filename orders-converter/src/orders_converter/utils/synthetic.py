@@ -0,0 +1,254 @@
+"""
+Synthetic purchase-order PDFs in the RuffleButts PO layout, for tests and
+benchmarks.
+
+The PDF is written directly (Helvetica text only, Flate-compressed content
+streams), so no PDF library is needed. Page count, items per page,
+description length/wrapping and the share of malformed rows are tunable.
+"""
+
+import random
+import zlib
+from decimal import Decimal
+from typing import Any, Dict, List
+
+PAGE_WIDTH = 792
+PAGE_HEIGHT = 612
+FONT_SIZE = 7
+LINE_HEIGHT = 10
+
+# x positions of the table columns, chosen so every column is separated by
+# more than the parser's x_tolerance at FONT_SIZE.
+COLUMN_X = {
+    "Qty": 36, "Item SKU": 60, "Dev Code": 160, "UPC": 200, "HTS Code": 262,
+    "Brand": 312, "Description": 362, "Rate": 690, "Amount": 730,
+}
+HEADER_COLUMNS = ["Qty", "Item SKU", "Dev Code", "UPC", "HTS Code", "Brand", "Description", "Rate", "Amount"]
+
+BRANDS = ["RuggedButts", "RuffleButts"]
+WORDS = ["Classic", "Emerald", "Green", "Gingham", "Long", "Sleeve", "Button", "Down", "Shirt",
+         "Rust", "Peyton", "Plaid", "Bodysuit", "Denim", "Woven", "Ruffle", "Knit", "Twill"]
+SIZES = ["0-3m", "3-6m", "6-12m", "12-18m", "18-24m", "2T", "3T", "4T", "5", "6", "7", "8"]
+MALFORMATIONS = ("missing_rate", "short_upc", "garbage")
+
+TERMS = [
+    "TERMS:",
+    "1. This Purchase Order is issued by RuffleButts, LLC (\"Buyer\") to the Manufacturer pursuant to the terms of the",
+    "RuffleButts Vendor Guide, payment terms noted on this Purchase Order, and any other terms listed on this Purchase Order.",
+    "2. Departure time is the \"Ship Complete By Date\" listed on the Purchase Order.",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _money(value: Decimal) -> str:
+    return f"${value:,.2f}"
+
+
+class _Page:
+    """Accumulates positioned text for one page's content stream."""
+
+    def __init__(self):
+        self.ops: List[str] = []
+
+    def text(self, x: float, y: float, text: str, size: int = FONT_SIZE) -> None:
+        self.ops.append(f"BT /F1 {size} Tf {x:.2f} {y:.2f} Td ({_escape(text)}) Tj ET")
+
+    def stream(self) -> bytes:
+        return zlib.compress("\n".join(self.ops).encode("latin-1"))
+
+
+def _write_pdf(path: str, pages: List[_Page]) -> None:
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    add(b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(b"")  # Pages tree, filled in once the kids are known
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    kids = []
+    for page in pages:
+        data = page.stream()
+        content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, font, content)
+        ))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as fh:
+        fh.write(out)
+
+
+def _item(rng: random.Random, index: int, description_words: int) -> Dict[str, Any]:
+    qty = rng.randint(1, 400)
+    rate = Decimal(rng.randint(150, 9999)) / 100
+    words = [rng.choice(WORDS) for _ in range(description_words)]
+    return {
+        "qty": str(qty),
+        "sku": f"2AP{index // 100:04d}-00-P{index % 10000:04d}-{rng.choice(['1218M', '2T000', '0306M'])}",
+        "dev_code": f"B{1000 + index % 9000}",
+        "upc": f"{195601000000 + index:012d}",
+        "hts": rng.choice(["6209203000", "6204628051", "6111206020"]),
+        "brand": rng.choice(BRANDS),
+        "description": " ".join(words) + " - " + rng.choice(SIZES),
+        "rate": rate,
+        "amount": rate * qty,
+    }
+
+
+def generate_po_pdf(path: str, pages: int = 1, items_per_page: int = 20, description_words: int = 8,
+                    wrap_chars: int = 60, malformed_ratio: float = 0.0, po_number: str = "001688",
+                    seed: int = 0, split_items: bool = False) -> Dict[str, Any]:
+    """
+    Writes a synthetic PO to `path` and returns what a correct parse finds:
+    {"po_number", "page_count", "items", "malformed", "total", "rows",
+    "descriptions"}, where rows are the expected table rows for the
+    well-formed items and descriptions their full, unwrapped descriptions.
+
+    Descriptions longer than wrap_chars continue on the next line, after the
+    Rate/Amount line, as in real POs; like the text parser, the expected
+    rows keep only the first line. malformed_ratio of the items are damaged
+    (missing rate, short UPC or garbage text) and are not expected in the
+    rows. With split_items, the last item of every page but the last breaks
+    across the page: the second half of its description and its Rate and
+    Amount open the next page's table, and its expected row has the whole
+    description. Raises ValueError if the items do not fit on a page.
+    """
+    rng = random.Random(seed)
+    rendered: List[_Page] = []
+    expected_rows: List[List[str]] = []
+    descriptions: List[str] = []
+    malformed = 0
+    total = Decimal(0)
+    index = 0
+    # The second half of an item split across pages: (description, rate, amount).
+    carried = None
+
+    for page_no in range(1, pages + 1):
+        page = _Page()
+        y = PAGE_HEIGHT - 45
+        for line in ("RuffleButts", "281 International Pkwy", "Flower Mound TX 75022",
+                     "FW25 GAL Fashion Wovens & Denim (July)"):
+            page.text(36, y, line, size=10)
+            y -= 12
+        page.text(600, PAGE_HEIGHT - 45, "Purchase Order", size=16)
+        page.text(600, PAGE_HEIGHT - 62, f"PO{po_number}", size=10)
+        page.text(36, y, "SHIP COMPLETE BY DATE: 5/1/2025 PAYMENT TERMS: 0% Deposit, Net 60 Ex-Factory", size=8)
+        y -= 14
+        if page_no == 1:
+            page.text(36, y, "SHIP BY Vendor # PO Date RB Batch #", size=8)
+            y -= 11
+            page.text(36, y, "5/1/2025 1 | GAL - Factory 4/6/2025 010005JULY25", size=8)
+            y -= 14
+        for column in HEADER_COLUMNS:
+            page.text(COLUMN_X[column], y, column)
+        y -= LINE_HEIGHT + 2
+        if carried is not None:
+            for column, value in zip(("Description", "Rate", "Amount"), carried):
+                page.text(COLUMN_X[column], y, value)
+            y -= LINE_HEIGHT
+            carried = None
+
+        for n in range(items_per_page):
+            item = _item(rng, index, description_words)
+            index += 1
+            kind = None
+            if split_items and page_no < pages and n == items_per_page - 1:
+                words = item["description"].split()
+                half = len(words) // 2
+                carried = (" ".join(words[half:]), _money(item["rate"]), _money(item["amount"]))
+                for column, value in (("Qty", item["qty"]), ("Item SKU", item["sku"]),
+                                      ("Dev Code", item["dev_code"]), ("UPC", item["upc"]),
+                                      ("HTS Code", item["hts"]), ("Brand", item["brand"]),
+                                      ("Description", " ".join(words[:half]))):
+                    page.text(COLUMN_X[column], y, value)
+                y -= LINE_HEIGHT
+                total += item["amount"]
+                expected_rows.append([
+                    item["qty"], item["sku"], item["dev_code"], item["upc"], item["hts"], item["brand"],
+                    item["description"], f"{item['rate']:.2f}", f"{item['amount']:.2f}",
+                ])
+                descriptions.append(item["description"])
+                continue
+            if malformed_ratio and rng.random() < malformed_ratio:
+                kind = rng.choice(MALFORMATIONS)
+                malformed += 1
+
+            if kind == "garbage":
+                page.text(COLUMN_X["Qty"], y, "#### SCAN ERROR ## %d ##" % index)
+                y -= LINE_HEIGHT
+                continue
+
+            description = item["description"]
+            first, rest = description, ""
+            if len(description) > wrap_chars:
+                cut = description.rfind(" ", 0, wrap_chars)
+                cut = cut if cut > 0 else wrap_chars
+                first, rest = description[:cut], description[cut + 1:]
+
+            upc = item["upc"][:11] if kind == "short_upc" else item["upc"]
+            cells = [
+                ("Qty", item["qty"]), ("Item SKU", item["sku"]), ("Dev Code", item["dev_code"]),
+                ("UPC", upc), ("HTS Code", item["hts"]), ("Brand", item["brand"]),
+                ("Description", first), ("Amount", _money(item["amount"])),
+            ]
+            if kind != "missing_rate":
+                cells.append(("Rate", _money(item["rate"])))
+            for column, value in cells:
+                page.text(COLUMN_X[column], y, value)
+            y -= LINE_HEIGHT
+            if rest:
+                page.text(COLUMN_X["Description"], y, rest)
+                y -= LINE_HEIGHT
+
+            if kind is None:
+                total += item["amount"]
+                expected_rows.append([
+                    item["qty"], item["sku"], item["dev_code"], item["upc"], item["hts"], item["brand"],
+                    first, f"{item['rate']:.2f}", f"{item['amount']:.2f}",
+                ])
+                descriptions.append(description)
+
+        if page_no == pages:
+            page.text(COLUMN_X["Rate"] - 20, y - 4, "Total")
+            page.text(COLUMN_X["Amount"], y - 4, _money(total))
+            y -= 24
+            # The terms block is decoration; skip it rather than overflow.
+            if y - 8 * len(TERMS) >= 30:
+                for line in TERMS:
+                    page.text(36, y, line, size=6)
+                    y -= 8
+        if y < 30:
+            raise ValueError(f"{items_per_page} items per page overflow the page; lower items_per_page "
+                             f"or description_words.")
+        page.text(36, 20, f"{page_no} of {pages}", size=8)
+        page.text(700, 20, f"PO{po_number}", size=8)
+        rendered.append(page)
+
+    _write_pdf(path, rendered)
+    return {
+        "po_number": po_number,
+        "page_count": pages,
+        "items": index,
+        "malformed": malformed,
+        "total": f"{total:,.2f}",
+        "rows": expected_rows,
+        "descriptions": descriptions,
+    }
+
@@ -0,0 +1,266 @@
+"""
+Watch-folder ingestion: converts PDFs dropped into an inbox as they arrive.
+"""
+
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from orders_converter import batch, triage
+from orders_converter.io.extraction_cache import hash_file
+from orders_converter.utils.profiling import StageMetrics
+
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+DUPLICATES_DIR = "duplicates"
+QUARANTINE_DIR = "quarantine"
+SEEN_FILE = ".seen-hashes"
+
+
+def _free_path(dest_dir: str, name: str, taken: Set[str] = frozenset()) -> str:
+    """Returns dest_dir/name, or dest_dir/base.N.ext for the first N not on disk or in taken."""
+    base, ext = os.path.splitext(name)
+    dest = os.path.join(dest_dir, name)
+    n = 1
+    while os.path.exists(dest) or dest in taken:
+        dest = os.path.join(dest_dir, f"{base}.{n}{ext}")
+        n += 1
+    return dest
+
+
+def _move(src: str, dest_dir: str) -> str:
+    """Moves src into dest_dir without overwriting; returns the new path."""
+    os.makedirs(dest_dir, exist_ok=True)
+    dest = _free_path(dest_dir, os.path.basename(src))
+    shutil.move(src, dest)
+    return dest
+
+
+class InboxWatcher:
+    """
+    Polls an inbox for new PDFs and converts them on a worker pool.
+
+    A file is only picked up once its size and mtime have stayed unchanged
+    for settle_seconds, so half-copied drops are never parsed. Stable files
+    go onto a bounded queue; `jobs` dispatcher threads feed a process pool,
+    write the Excel file to the outbox (NAME.N.xlsx if an earlier PO of the
+    same name already has NAME.xlsx) and move the PDF to outbox/done or
+    outbox/failed. Empty files go to outbox/failed, or to outbox/quarantine
+    with triage. Files whose content was already converted (tracked by hash
+    across restarts) are moved to outbox/duplicates without reconverting.
+    A file whose handling fails unexpectedly goes to outbox/failed too; if
+    even that move fails it is left in the inbox and skipped until it changes.
+    With metrics_path, cumulative stage metrics are rewritten there in the
+    Prometheus text format after every conversion. With triage=True, files
+    failing triage.triage_pdf's cheap checks go to outbox/quarantine, next to
+    a .reason.txt, without being converted.
+    """
+
+    def __init__(self, inbox: str, outbox: str, jobs: Optional[int] = None, queue_size: int = 64,
+                 poll_interval: float = 1.0, settle_seconds: float = 2.0,
+                 cache_dir: Optional[str] = None, metrics_path: Optional[str] = None,
+                 triage: bool = False):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.jobs = jobs or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.cache_dir = cache_dir
+        self.metrics_path = metrics_path
+        self.triage = triage
+        self.metrics = StageMetrics()
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+
+        self._observed: Dict[str, Tuple[int, int, float]] = {}
+        self._pending: Set[str] = set()
+        self._in_flight: Set[str] = set()
+        self._outputs: Set[str] = set()
+        self._stuck: Dict[str, Tuple[int, int]] = {}  # path -> (size, mtime) it could not be moved at
+        self._lock = threading.Lock()
+        os.makedirs(outbox, exist_ok=True)
+        self._seen_path = os.path.join(outbox, SEEN_FILE)
+        self._seen_hashes = self._load_seen()
+
+    def _load_seen(self) -> Set[str]:
+        if not os.path.exists(self._seen_path):
+            return set()
+        with open(self._seen_path, encoding="utf-8") as fh:
+            return {line.strip() for line in fh if line.strip()}
+
+    def _remember(self, digest: str) -> None:
+        self._seen_hashes.add(digest)
+        with open(self._seen_path, "a", encoding="utf-8") as fh:
+            fh.write(digest + "\n")
+
+    def scan(self) -> List[str]:
+        """Returns inbox PDFs that have finished being written and are not queued yet."""
+        now = time.monotonic()
+        ready = []
+        present = set()
+        with self._lock, os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith(".") or not entry.name.lower().endswith(".pdf"):
+                    continue
+                path = entry.path
+                present.add(path)
+                if path in self._pending:
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self._stuck.get(path) == signature:
+                    continue
+                previous = self._observed.get(path)
+                if previous is None or previous[:2] != signature:
+                    self._observed[path] = (signature[0], signature[1], now)
+                    continue
+                if now - previous[2] >= self.settle_seconds:
+                    ready.append(path)
+            # Forget files that disappeared before they settled.
+            for path in list(self._observed):
+                if path not in present:
+                    del self._observed[path]
+            for path in list(self._stuck):
+                if path not in present:
+                    del self._stuck[path]
+        return sorted(ready)
+
+    def _set_aside(self, pdf_path: str, dir_name: str, reason: str) -> None:
+        """Moves a PDF that was not converted to outbox/dir_name, next to a note of why."""
+        dest = _move(pdf_path, os.path.join(self.outbox, dir_name))
+        suffix = ".reason.txt" if dir_name == QUARANTINE_DIR else ".error.txt"
+        with open(dest + suffix, "w", encoding="utf-8") as fh:
+            fh.write(reason + "\n")
+
+    def _reserve_output(self, pdf_path: str) -> str:
+        """Picks the PDF's output path, one that no earlier or in-flight PO of the same name uses."""
+        name = os.path.splitext(os.path.basename(pdf_path))[0] + ".xlsx"
+        with self._lock:
+            output_path = _free_path(self.outbox, name, self._outputs)
+            self._outputs.add(output_path)
+        return output_path
+
+    def _fail(self, pdf_path: str, error: Exception) -> None:
+        """Sets aside a PDF whose handling raised, or leaves it in the inbox if it cannot be moved."""
+        try:
+            self._set_aside(pdf_path, FAILED_DIR, f"{type(error).__name__}: {error}")
+        except Exception:
+            logging.error(f"Could not move {pdf_path} to {FAILED_DIR}; it stays in the inbox until it changes.",
+                          exc_info=True)
+            try:
+                stat = os.stat(pdf_path)
+            except OSError:
+                return
+            with self._lock:
+                self._stuck[pdf_path] = (stat.st_size, stat.st_mtime_ns)
+
+    def _process(self, executor: ProcessPoolExecutor, pdf_path: str) -> None:
+        output_path = None
+        digest = None
+        try:
+            # Settled but empty: an upload that never got its bytes. Every
+            # empty file hashes alike, so this comes before deduplication.
+            if os.path.getsize(pdf_path) == 0:
+                self._set_aside(pdf_path, QUARANTINE_DIR if self.triage else FAILED_DIR, triage.EMPTY)
+                logging.warning(f"Set aside empty file {pdf_path}.")
+                return
+
+            digest = hash_file(pdf_path)
+            with self._lock:
+                duplicate = digest in self._seen_hashes or digest in self._in_flight
+                if not duplicate:
+                    self._in_flight.add(digest)
+            if duplicate:
+                dest = _move(pdf_path, os.path.join(self.outbox, DUPLICATES_DIR))
+                logging.info(f"Duplicate of an already converted PO: {pdf_path} -> {dest}")
+                return
+
+            if self.triage:
+                triaged = executor.submit(triage.triage_pdf, pdf_path).result()
+                if not triaged.convertible:
+                    with self._lock:
+                        self._in_flight.discard(digest)
+                    self._set_aside(pdf_path, QUARANTINE_DIR, triaged.reason)
+                    logging.warning(f"Quarantined {pdf_path}: {triaged.reason}")
+                    return
+
+            output_path = self._reserve_output(pdf_path)
+            result = executor.submit(batch.convert_pdf, pdf_path, output_path, self.cache_dir,
+                                     bool(self.metrics_path)).result()
+            with self._lock:
+                self._in_flight.discard(digest)
+                if result.ok:
+                    self._remember(digest)
+                if self.metrics_path:
+                    self.metrics.add(result.stages, ok=result.ok, rows=result.rows, seconds=result.seconds)
+                    self.metrics.write(self.metrics_path)
+            if result.ok:
+                _move(pdf_path, os.path.join(self.outbox, DONE_DIR))
+                logging.info(f"Converted {pdf_path} -> {output_path} ({result.rows} rows, {result.seconds:.2f}s)")
+            else:
+                self._set_aside(pdf_path, FAILED_DIR, result.error)
+                logging.error(f"Failed to convert {pdf_path}: {result.error}")
+        except Exception as e:
+            logging.error(f"Error handling {pdf_path}: {e}", exc_info=True)
+            with self._lock:
+                self._in_flight.discard(digest)
+            if os.path.exists(pdf_path):
+                self._fail(pdf_path, e)
+        finally:
+            with self._lock:
+                # Written by now, so the name stays taken on disk.
+                self._outputs.discard(output_path)
+                self._pending.discard(pdf_path)
+                self._observed.pop(pdf_path, None)
+                self.processed += 1
+
+    def _dispatch(self, executor: ProcessPoolExecutor) -> None:
+        while True:
+            pdf_path = self.queue.get()
+            try:
+                if pdf_path is None:
+                    return
+                self._process(executor, pdf_path)
+            finally:
+                self.queue.task_done()
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return not self._pending and not self._observed
+
+    def run(self, stop_event: Optional[threading.Event] = None, once: bool = False) -> int:
+        """
+        Watches the inbox until stop_event is set. With once=True, returns as
+        soon as every PDF present in the inbox has been handled.
+        Returns the number of files handled.
+        """
+        stop_event = stop_event or threading.Event()
+        logging.info(f"Watching {self.inbox} -> {self.outbox} with {self.jobs} worker(s).")
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            dispatchers = [
+                threading.Thread(target=self._dispatch, args=(executor,), daemon=True)
+                for _ in range(self.jobs)
+            ]
+            for thread in dispatchers:
+                thread.start()
+            try:
+                while not stop_event.is_set():
+                    for path in self.scan():
+                        with self._lock:
+                            self._pending.add(path)
+                        # Blocks while the queue is full, pausing the scan.
+                        self.queue.put(path)
+                    if once and self._idle():
+                        break
+                    stop_event.wait(self.poll_interval)
+            finally:
+                for _ in dispatchers:
+                    self.queue.put(None)
+                for thread in dispatchers:
+                    thread.join()
+        return self.processed
@@ -0,0 +1,303 @@
+"""
+Work sharing between conversion hosts over a shared directory.
+
+Any number of workers, on any number of hosts mounting the same directory,
+drain one inbox with no broker. The directory holds:
+
+    inbox/     PDFs waiting for a worker (copy them in, or better, rename
+               them in once complete)
+    claimed/   PDFs being converted, renamed to NAME@ATTEMPT@WORKER
+    output/    converted files
+    done/      PDFs whose output was committed
+    failed/    PDFs that failed, each next to a .error.txt
+
+Every step is a rename, which is atomic on one filesystem: of the workers
+racing to rename the same file, exactly one succeeds and the rest get
+FileNotFoundError and move on.
+
+- Claim: inbox/NAME -> claimed/NAME@1@WORKER.
+- Lease: the claim's ctime/mtime. The rename sets the ctime, and the owner
+  touches the file every lease_seconds / 3 while it converts (ctime is
+  refreshed by rename on Linux filesystems, so hosts should be Linux and
+  agree on the time to well within a lease).
+- Re-claim: a claim not touched for lease_seconds belongs to a dead
+  worker; another worker renames it to NAME@ATTEMPT+1@SELF and removes the
+  dead worker's partial output. After max_attempts expired leases the PDF
+  is moved to failed/ rather than taking down more workers.
+- Commit: the output is written under a hidden temporary name, then the
+  owner moves its claim into done/. Only a worker still holding the claim
+  can win that move, so only one output is ever moved into output/. A
+  worker whose lease expired loses the move and discards its output; one
+  whose heartbeat finds the claim gone stops converting at the next page.
+
+Moves into done/, failed/ and output/ never replace a file: a later PO with
+an earlier one's name becomes NAME.N, and its output takes the same name.
+They are a hard link plus an unlink rather than a rename, because a rename
+silently replaces a file another worker moved in under the same name.
+"""
+
+import logging
+import os
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from typing import List, NamedTuple, Optional
+
+from orders_converter import batch
+
+INBOX_DIR = "inbox"
+CLAIMED_DIR = "claimed"
+OUTPUT_DIR = "output"
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class LeaseLost(Exception):
+    """Raised between pages when another worker has taken over the claim."""
+
+
+class Claim(NamedTuple):
+    """A PDF renamed into claimed/ by a worker."""
+    name: str
+    attempt: int
+    worker_id: str
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.name}@{self.attempt}@{self.worker_id}"
+
+    @classmethod
+    def parse(cls, file_name: str) -> Optional["Claim"]:
+        parts = file_name.rsplit("@", 2)
+        if len(parts) != 3 or not parts[1].isdigit():
+            return None
+        return cls(parts[0], int(parts[1]), parts[2])
+
+
+def default_worker_id() -> str:
+    """host-pid-random, with characters that are safe in file names."""
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    return re.sub(r"[^A-Za-z0-9_.-]", "-", worker_id)
+
+
+def _rename_into(src: str, dest_dir: str, name: str) -> str:
+    """
+    Moves src into dest_dir as name (base.N.ext if taken) without replacing
+    any file; returns the new path. Raises FileNotFoundError if src is gone,
+    including when another worker took it while it was being moved.
+    """
+    base, ext = os.path.splitext(name)
+    dest = os.path.join(dest_dir, name)
+    n = 1
+    while True:
+        try:
+            os.link(src, dest)
+            break
+        except FileExistsError:
+            dest = os.path.join(dest_dir, f"{base}.{n}{ext}")
+            n += 1
+    try:
+        os.unlink(src)
+    except FileNotFoundError:
+        os.unlink(dest)
+        raise
+    return dest
+
+
+class QueueWorker:
+    """
+    One worker draining root/inbox: claims a PDF, converts it while keeping
+    its lease alive, and commits the output at most once.
+
+    Run one per CPU on each host (see run_workers); adding hosts adds
+    throughput, since workers only meet at renames of distinct files.
+    """
+
+    def __init__(self, root: str, worker_id: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 poll_interval: float = 1.0, settle_seconds: float = 2.0,
+                 cache_dir: Optional[str] = None, fmt: str = "xlsx"):
+        self.root = root
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.cache_dir = cache_dir
+        self.fmt = fmt
+        self.processed = 0
+        self._candidates: List[str] = []
+        for name in (INBOX_DIR, CLAIMED_DIR, OUTPUT_DIR, DONE_DIR, FAILED_DIR):
+            os.makedirs(self._dir(name), exist_ok=True)
+
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _expired(self, stat: os.stat_result) -> bool:
+        return time.time() - max(stat.st_mtime, stat.st_ctime) > self.lease_seconds
+
+    def _temp_output(self, claim: Claim) -> str:
+        stem = os.path.splitext(claim.name)[0]
+        return os.path.join(self._dir(OUTPUT_DIR), f".{stem}.{claim.attempt}-{claim.worker_id}.{self.fmt}")
+
+    def _scan(self) -> List[str]:
+        """
+        Lists claimable files: expired claims first, then settled inbox PDFs.
+        Each list is shuffled so that workers started together try different
+        files first instead of all racing for the same one.
+        """
+        now = time.time()
+        expired, ready = [], []
+        with os.scandir(self._dir(CLAIMED_DIR)) as entries:
+            for entry in entries:
+                if entry.is_file() and Claim.parse(entry.name) is not None and self._expired(entry.stat()):
+                    expired.append(entry.path)
+        with os.scandir(self._dir(INBOX_DIR)) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith(".") or not entry.name.lower().endswith(".pdf"):
+                    continue
+                stat = entry.stat()
+                if stat.st_size > 0 and now - stat.st_mtime >= self.settle_seconds:
+                    ready.append(entry.path)
+        random.shuffle(expired)
+        random.shuffle(ready)
+        return expired + ready
+
+    def _take(self, path: str) -> Optional[Claim]:
+        """Tries to claim an inbox PDF or re-claim an expired claim; None if another worker won."""
+        previous = Claim.parse(os.path.basename(path)) if os.path.dirname(path) == self._dir(CLAIMED_DIR) else None
+        if previous is None:
+            claim = Claim(os.path.basename(path), 1, self.worker_id)
+        else:
+            claim = Claim(previous.name, previous.attempt + 1, self.worker_id)
+        try:
+            # The candidate list can be older than the lease.
+            if previous is not None and not self._expired(os.stat(path)):
+                return None
+            if previous is not None and previous.attempt >= self.max_attempts:
+                dest = _rename_into(path, self._dir(FAILED_DIR), previous.name)
+                self._write_error(dest, f"Abandoned after {previous.attempt} expired leases.")
+                logging.error(f"Gave up on {previous.name} after {previous.attempt} expired leases.")
+                return None
+            os.rename(path, os.path.join(self._dir(CLAIMED_DIR), claim.file_name))
+        except FileNotFoundError:
+            return None
+        if previous is not None:
+            logging.warning(f"Re-claimed {previous.name} from {previous.worker_id}, whose lease expired.")
+            try:
+                os.remove(self._temp_output(previous))
+            except FileNotFoundError:
+                pass
+        return claim
+
+    def claim(self) -> Optional[Claim]:
+        """Claims the next PDF, or returns None if there is nothing to claim."""
+        for rescanned in (False, True):
+            if rescanned or not self._candidates:
+                self._candidates = self._scan()
+            while self._candidates:
+                claim = self._take(self._candidates.pop())
+                if claim is not None:
+                    return claim
+        return None
+
+    def _heartbeat(self, path: str, stop: threading.Event, lost: threading.Event) -> None:
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                lost.set()
+                return
+
+    @staticmethod
+    def _write_error(dest: str, error: str) -> None:
+        with open(dest + ".error.txt", "w", encoding="utf-8") as fh:
+            fh.write(error + "\n")
+
+    def process(self, claim: Claim) -> bool:
+        """Converts a claimed PDF and commits the outcome; returns False if the lease was lost."""
+        claim_path = os.path.join(self._dir(CLAIMED_DIR), claim.file_name)
+        temp_output = self._temp_output(claim)
+        stop, lost = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(claim_path, stop, lost), daemon=True)
+        heartbeat.start()
+
+        def check_lease(pages_read: int, page_count: int) -> None:
+            if lost.is_set():
+                raise LeaseLost(f"Lost the claim on {claim.name} at page {pages_read} of {page_count}.")
+
+        try:
+            result = batch.convert_pdf(claim_path, temp_output, self.cache_dir, progress=check_lease)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        try:
+            if lost.is_set():
+                raise FileNotFoundError(claim_path)
+            dest_dir = self._dir(DONE_DIR if result.ok else FAILED_DIR)
+            dest = _rename_into(claim_path, dest_dir, claim.name)
+        except FileNotFoundError:
+            logging.warning(f"Lease on {claim.name} expired while converting; discarding the output.")
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            return False
+        if result.ok:
+            # Named after the PDF in done/, so a PO and its output share a name.
+            output_name = os.path.splitext(os.path.basename(dest))[0] + "." + self.fmt
+            output_path = _rename_into(temp_output, self._dir(OUTPUT_DIR), output_name)
+            logging.info(f"Converted {claim.name} -> {output_path} ({result.rows} rows, {result.seconds:.2f}s)")
+        else:
+            self._write_error(dest, result.error)
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            logging.error(f"Failed to convert {claim.name}: {result.error}")
+        return True
+
+    def run(self, stop_event: Optional[threading.Event] = None, once: bool = False) -> int:
+        """
+        Claims and converts PDFs until stop_event is set. With once=True,
+        returns as soon as nothing is left to claim. Returns the number of
+        PDFs this worker committed.
+        """
+        stop_event = stop_event or threading.Event()
+        logging.info(f"Worker {self.worker_id} draining {self._dir(INBOX_DIR)}.")
+        while not stop_event.is_set():
+            claim = self.claim()
+            if claim is None:
+                if once:
+                    break
+                stop_event.wait(self.poll_interval)
+                continue
+            if self.process(claim):
+                self.processed += 1
+        return self.processed
+
+
+def _work(root: str, kwargs: dict, once: bool) -> None:
+    """Worker process entry point."""
+    from orders_converter.utils.logging_config import setup_logging
+
+    setup_logging('INFO')
+    try:
+        QueueWorker(root, **kwargs).run(once=once)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_workers(root: str, jobs: Optional[int] = None, once: bool = False, **kwargs) -> None:
+    """Runs `jobs` QueueWorker processes (defaults to the CPU count) until they stop."""
+    import multiprocessing
+
+    jobs = jobs or os.cpu_count() or 1
+    processes = [multiprocessing.Process(target=_work, args=(root, kwargs, once)) for _ in range(jobs)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
@@ -0,0 +1,121 @@
+import io
+import mmap
+import os
+import pytest
+from orders_converter.core import parser
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.io.backends import BACKENDS, PdfBuffer, open_backend
+from orders_converter.io.pdf_reader import read_pdf_table_and_meta
+from orders_converter.utils.synthetic import generate_po_pdf
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE1_PDF = os.path.join(FIXTURE_DIR, 'sample1.pdf')
+SAMPLE2_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+def _extract(pdf_path, backend):
+    with PurchaseOrderDocument(pdf_path, backend=backend) as document:
+        meta = parser.extract_header_meta(document)
+        region_meta = parser.extract_header_meta(document, regions=parser.DEFAULT_META_REGIONS)
+        rows = parser.extract_table_rows(document)
+    return meta, region_meta, rows
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE2_PDF), reason='Fixture PDF not found')
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_backends_match_pdfplumber_on_sample2(backend):
+    meta, region_meta, rows = _extract(SAMPLE2_PDF, backend)
+    expected_meta, _, expected_rows = _extract(SAMPLE2_PDF, 'pdfplumber')
+    assert meta == region_meta == expected_meta
+    assert rows == expected_rows
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE1_PDF), reason='Fixture PDF not found')
+def test_backends_on_sample1():
+    expected_meta, _, expected_rows = _extract(SAMPLE1_PDF, 'pdfplumber')
+    meta, _, rows = _extract(SAMPLE1_PDF, 'pdfminer')
+    assert meta == expected_meta
+    assert rows == expected_rows
+    # PDFium orders the two wrapped descriptions inline, so it keeps them whole.
+    meta, _, rows = _extract(SAMPLE1_PDF, 'pdfium')
+    assert meta == expected_meta
+    differing = [(got, want) for got, want in zip(rows, expected_rows) if got != want]
+    assert len(rows) == len(expected_rows) and len(differing) == 2
+    assert all(got[6].startswith(want[6]) and got[7:] == want[7:] for got, want in differing)
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_backends_on_synthetic_po(tmp_path, backend):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=4, items_per_page=15, malformed_ratio=0.2, seed=4)
+    meta, _, rows = _extract(pdf_path, backend)
+    assert rows[1:] == info['rows']
+    assert (meta['po_number'], meta['total'], meta['page_count']) == (info['po_number'], info['total'], 4)
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        open_backend('missing.pdf', 'bogus')
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE2_PDF), reason='Fixture PDF not found')
+def test_words_engine_needs_pdfplumber():
+    with PurchaseOrderDocument(SAMPLE2_PDF, backend='pdfium') as document:
+        with pytest.raises(ValueError):
+            parser.extract_table_rows(document, engine='words')
+
+class _Stream(io.RawIOBase):
+    """A readable stream without a descriptor or seeking, like a request body."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._data.readinto(buffer)
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE2_PDF), reason='Fixture PDF not found')
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_in_memory_sources_match_path(backend):
+    expected = _extract(SAMPLE2_PDF, backend)
+    with open(SAMPLE2_PDF, 'rb') as fh:
+        data = fh.read()
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for source in (data, bytearray(data), memoryview(data), io.BytesIO(data), fh, mapped, _Stream(data)):
+                assert _extract(source, backend) == expected
+        finally:
+            mapped.close()
+        assert not fh.closed
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE2_PDF), reason='Fixture PDF not found')
+def test_buffers_are_not_copied():
+    with open(SAMPLE2_PDF, 'rb') as fh:
+        with PdfBuffer(fh) as mapped:
+            assert isinstance(mapped.view.obj, mmap.mmap)
+    data = open(SAMPLE2_PDF, 'rb').read()
+    stream = io.BytesIO(data)
+    with PdfBuffer(stream) as buffer:
+        assert len(buffer) == len(data)
+        # The buffer is a view of the stream's own bytes, so it cannot be resized meanwhile.
+        with pytest.raises(BufferError):
+            stream.write(b'x')
+    # The BytesIO is usable again once the buffer is closed.
+    stream.write(b'x')
+    assert parser.extract_header_meta(data) == parser.extract_header_meta(SAMPLE2_PDF)
+    meta, rows = read_pdf_table_and_meta(data)
+    assert (meta, rows) == read_pdf_table_and_meta(SAMPLE2_PDF)
+
+def test_seekable_streams_are_read_from_the_start():
+    class _SeekableStream(_Stream):
+        def seekable(self):
+            return True
+
+        def seek(self, offset, whence=io.SEEK_SET):
+            return self._data.seek(offset, whence)
+
+    stream = _SeekableStream(b'%PDF-1.4 bytes')
+    stream.read(5)
+    with PdfBuffer(stream) as buffer:
+        assert buffer.view.tobytes() == b'%PDF-1.4 bytes'
+    # A stream that cannot seek is read from where it is.
+    plain = _Stream(b'%PDF-1.4 bytes')
+    plain.read(5)
+    with PdfBuffer(plain) as buffer:
+        assert buffer.view.tobytes() == b'1.4 bytes'
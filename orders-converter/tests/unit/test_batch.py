@@ -0,0 +1,55 @@
+import os
+import shutil
+import pytest
+from orders_converter import batch
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+def test_collect_inputs_expands_dirs_globs_and_file_list(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'a' / 'one.pdf').write_bytes(b'%PDF-')
+    (tmp_path / 'a' / 'notes.txt').write_text('x')
+    (tmp_path / 'b').mkdir()
+    (tmp_path / 'b' / 'two.pdf').write_bytes(b'%PDF-')
+    listed = tmp_path / 'three.pdf'
+    listed.write_bytes(b'%PDF-')
+    file_list = tmp_path / 'list.txt'
+    file_list.write_text(f"# nightly\n{listed}\n\n")
+
+    paths = batch.collect_inputs(
+        [str(tmp_path / 'a'), str(tmp_path / 'b' / '*.pdf'), str(tmp_path / 'a' / 'one.pdf')],
+        file_list=str(file_list),
+    )
+    assert [os.path.basename(p) for p in paths] == ['one.pdf', 'two.pdf', 'three.pdf']
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_run_batch_reports_success_and_failure(tmp_path):
+    good = tmp_path / 'good.pdf'
+    shutil.copy(SAMPLE_PDF, good)
+    bad = tmp_path / 'bad.pdf'
+    bad.write_bytes(b'not a pdf')
+    out_dir = tmp_path / 'out'
+
+    results = batch.run_batch([str(good), str(bad)], output_dir=str(out_dir), jobs=2)
+
+    assert [r.ok for r in results] == [True, False]
+    assert results[0].rows > 0
+    assert os.path.exists(out_dir / 'good.xlsx')
+    summary = batch.format_summary(results)
+    assert 'FAILED' in summary
+    assert '1 succeeded, 1 failed, 2 total.' in summary
+
+def test_same_named_pdfs_keep_their_subdirectories(tmp_path):
+    for sub in ('a', 'b'):
+        (tmp_path / sub).mkdir()
+        (tmp_path / sub / 'po.pdf').write_bytes(b'%PDF-')
+    (tmp_path / 'a' / 'other.pdf').write_bytes(b'%PDF-')
+    out_dir = tmp_path / 'out'
+
+    targets = batch.output_targets(batch.collect_inputs([str(tmp_path)]), str(out_dir))
+
+    assert [os.path.relpath(out, out_dir) for _, out in targets] == [
+        'other.xlsx', os.path.join('a', 'po.xlsx'), os.path.join('b', 'po.xlsx')]
+    with pytest.raises(ValueError):
+        batch.output_targets([str(tmp_path / 'a' / 'po.pdf'), str(tmp_path / 'a' / 'po.PDF')], str(out_dir))
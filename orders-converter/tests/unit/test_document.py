@@ -0,0 +1,104 @@
+import os
+import tracemalloc
+import pytest
+from orders_converter.core import parser
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.utils.synthetic import generate_po_pdf
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample1.pdf')
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_each_page_is_laid_out_once(monkeypatch):
+    calls = []
+    with PurchaseOrderDocument(SAMPLE_PDF) as document:
+        original = document.page_text
+
+        def counting_page_text(index):
+            if index not in document._page_texts:
+                calls.append(index)
+            return original(index)
+
+        monkeypatch.setattr(document, 'page_text', counting_page_text)
+        meta = parser.extract_header_meta(document)
+        rows = parser.extract_table_rows(document)
+
+    assert meta['page_count'] == document.page_count
+    assert len(rows) > 1
+    assert sorted(calls) == list(range(document.page_count))
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_document_matches_path_api():
+    with PurchaseOrderDocument(SAMPLE_PDF) as document:
+        rows = parser.extract_table_rows(document)
+    assert rows == parser.extract_table_rows(SAMPLE_PDF)
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_parallel_page_text_matches_serial():
+    with PurchaseOrderDocument(SAMPLE_PDF) as serial:
+        serial_rows = parser.extract_table_rows(serial)
+        serial_meta = parser.extract_header_meta(serial)
+    with PurchaseOrderDocument(SAMPLE_PDF) as parallel:
+        parallel.load_all_text(jobs=3)
+        assert len(parallel._page_texts) == parallel.page_count
+        assert parser.extract_table_rows(parallel) == serial_rows
+        assert parser.extract_header_meta(parallel) == serial_meta
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_on_page_reports_each_page_once():
+    reports = []
+    with PurchaseOrderDocument(SAMPLE_PDF, on_page=lambda read, count: reports.append((read, count))) as document:
+        parser.extract_header_meta(document)
+        rows = parser.extract_table_rows(document)
+        page_count = document.page_count
+    assert len(rows) == 328
+    assert reports == [(n, page_count) for n in range(1, page_count + 1)]
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def test_peak_memory_stays_flat_as_pages_grow(tmp_path):
+    paths = {}
+    for pages in (3, 7):
+        paths[pages] = str(tmp_path / f'po{pages}.pdf')
+        generate_po_pdf(paths[pages], pages=pages, items_per_page=20, seed=pages)
+    # Warm up, so one-off allocations (font caches) do not count.
+    parser.extract_table_rows(paths[3])
+    peaks = {pages: _peak_mb(lambda: parser.extract_table_rows(path)) for pages, path in paths.items()}
+    # Every page used to stay parsed until the PDF was closed (about 3.5 MB each).
+    assert peaks[7] < peaks[3] * 1.2
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_released_pages_can_be_read_again():
+    with PurchaseOrderDocument(SAMPLE_PDF, cache_text=False, page_window=1) as document:
+        first = document.page_text(0)
+        document.page_text(1)
+        assert document.page_text(0) == first
+        assert document.region_text(0, (0.0, 0.0, 1.0, 0.3))
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_memory_budget_degrades_instead_of_failing():
+    expected = parser.extract_table_rows(SAMPLE_PDF)
+    with PurchaseOrderDocument(SAMPLE_PDF, memory_budget_mb=1) as document:
+        assert parser.extract_table_rows(document) == expected
+        assert document.over_budget
+        assert document.page_window == 1
+        assert not document.cache_text
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_streaming_keeps_only_the_window_of_page_text(monkeypatch):
+    laid_out = []
+    with PurchaseOrderDocument(SAMPLE_PDF, cache_text=False) as document:
+        original = document._backend.page_text
+        monkeypatch.setattr(document._backend, 'page_text', lambda i: laid_out.append(i) or original(i))
+        document.page_text(0)
+        document.page_text(0)
+        for index in range(1, document.page_count):
+            document.page_text(index)
+        assert laid_out == list(range(document.page_count))
+        assert len(document._page_texts) <= document.page_window
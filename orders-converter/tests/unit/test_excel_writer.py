@@ -17,4 +17,23 @@ def test_write_order_excel_creates_file_and_sheets():
         assert os.path.exists(out_path)
         wb = load_workbook(out_path)
         assert 'Order' in wb.sheetnames
-        assert 'Summary' in wb.sheetnames 
\ No newline at end of file
+        assert 'Summary' in wb.sheetnames 
+
+
+def test_write_order_excel_streams_rows_from_iterator():
+    columns = ['Qty', 'Item_SKU', 'Description', 'Rate']
+    rows = (['40', f'SKU-{i}', 'x' * (i % 7 + 1), '6.80'] for i in range(2500))
+    meta = {'po_number': '001688', 'total': '139,168.80', 'page_count': 15}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out_path = os.path.join(tmpdir, 'stream.xlsx')
+        assert write_order_excel(rows, meta, out_path, columns=columns) == 2500
+        wb = load_workbook(out_path)
+        order_ws = wb['Order']
+        assert [c.value for c in order_ws[1]] == columns
+        assert order_ws.max_row == 2501
+        assert [c.value for c in order_ws[2501]] == ['40', 'SKU-2499', 'x', '6.80']
+        assert order_ws.column_dimensions['B'].width == len('Item_SKU') + 2
+        assert order_ws.column_dimensions['C'].width == len('Description') + 4
+        summary = {row[0]: row[1] for row in wb['Summary'].iter_rows(min_row=2, values_only=True)}
+        assert summary['PO Number'] == '001688'
+        assert summary['Line Items'] == 2500
@@ -0,0 +1,78 @@
+import os
+import time
+import pytest
+from orders_converter import pipeline
+from orders_converter.core import parser
+from orders_converter.io import extraction_cache
+from orders_converter.io.extraction_cache import ExtractionCache
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+META = {'po_number': '001536', 'page_count': 3}
+ROWS = [['Qty', 'Item_SKU'], ['40', 'SKU-1']]
+
+def test_put_get_round_trip(tmp_path):
+    with ExtractionCache(str(tmp_path)) as cache:
+        assert cache.get('missing') is None
+        cache.put('k', META, ROWS)
+        assert cache.get('k') == (META, ROWS)
+
+def test_key_changes_with_parser_version(tmp_path, monkeypatch):
+    pdf = tmp_path / 'a.pdf'
+    pdf.write_bytes(b'%PDF-1.4 same bytes')
+    with ExtractionCache(str(tmp_path / 'cache')) as cache:
+        before = cache.key_for(str(pdf))
+        monkeypatch.setattr(extraction_cache, '_parser_fingerprint', None)
+        monkeypatch.setattr(parser, 'PARSER_VERSION', 'next')
+        assert cache.key_for(str(pdf)) != before
+
+def test_streamed_entry_matches_put(tmp_path):
+    with ExtractionCache(str(tmp_path)) as cache:
+        entry = cache.writer('k', META, ROWS[0])
+        for row in ROWS[1:]:
+            entry.add(row)
+        assert cache.get('k') is None
+        entry.commit()
+        assert cache.get('k') == (META, ROWS)
+
+def test_key_of_buffer_matches_path(tmp_path):
+    from orders_converter.io.backends import PdfBuffer
+
+    pdf = tmp_path / 'a.pdf'
+    pdf.write_bytes(b'%PDF-1.4 same bytes')
+    with ExtractionCache(str(tmp_path / 'cache')) as cache:
+        with PdfBuffer(pdf.read_bytes()) as buffer:
+            assert cache.key_for(buffer) == cache.key_for(str(pdf))
+
+def test_evicts_least_recently_used_over_size_limit(tmp_path):
+    with ExtractionCache(str(tmp_path)) as cache:
+        cache.put('old', META, ROWS)
+        size = cache._conn.execute("SELECT size FROM entries").fetchone()[0]
+        cache.max_bytes = size * 2
+        cache.put('middle', META, ROWS)
+        cache.get('old')  # refresh, so 'middle' becomes the LRU entry
+        cache.put('new', META, ROWS)
+        assert cache.get('middle') is None
+        assert cache.get('old') is not None
+        assert cache.get('new') is not None
+
+def test_evicts_entries_past_max_age(tmp_path):
+    with ExtractionCache(str(tmp_path), max_age_days=1) as cache:
+        cache.put('stale', META, ROWS)
+        cache._conn.execute("UPDATE entries SET accessed = ?", (time.time() - 2 * 86400,))
+        cache.put('fresh', META, ROWS)
+        assert cache.get('stale') is None
+        assert cache.get('fresh') is not None
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_cache_hit_skips_pdf_parsing(tmp_path, monkeypatch):
+    with ExtractionCache(str(tmp_path / 'cache')) as cache:
+        meta, count = pipeline.convert_pdf_to_excel(SAMPLE_PDF, str(tmp_path / 'a.xlsx'), cache=cache)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("PDF parsed despite cache hit")
+
+        monkeypatch.setattr(pipeline, 'PurchaseOrderDocument', fail)
+        assert pipeline.convert_pdf_to_excel(SAMPLE_PDF, str(tmp_path / 'b.xlsx'), cache=cache) == (meta, count)
+        assert os.path.exists(tmp_path / 'b.xlsx')
@@ -0,0 +1,39 @@
+import os
+import pytest
+from orders_converter.core import parser
+from orders_converter.core import extractor
+from orders_converter.utils.synthetic import generate_po_pdf
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+
+@pytest.mark.parametrize('name', ['sample1.pdf', 'sample2.pdf'])
+def test_words_engine_agrees_with_text_engine(name):
+    pdf_path = os.path.join(FIXTURE_DIR, name)
+    if not os.path.exists(pdf_path):
+        pytest.skip('Fixture PDF not found')
+    text_rows = parser.extract_table_rows(pdf_path)
+    word_rows = parser.extract_table_rows(pdf_path, engine='words')
+    assert len(word_rows) == len(text_rows)
+    for text_row, word_row in zip(text_rows, word_rows):
+        # Only wrapped descriptions may differ, by the text of the wrapped line.
+        assert word_row[:6] + word_row[7:] == text_row[:6] + text_row[7:]
+        assert word_row[6].startswith(text_row[6])
+
+def test_wrapped_descriptions_are_merged(tmp_path):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=3, items_per_page=20, description_words=12, wrap_chars=40, seed=5)
+    rows = extractor.extract_table_rows(pdf_path)
+    assert rows[0] == list(parser.TABLE_COLUMNS)
+    assert [row[6] for row in rows[1:]] == info['descriptions']
+    assert [row[:6] + row[7:] for row in rows[1:]] == [row[:6] + row[7:] for row in info['rows']]
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        parser.extract_table_rows('missing.pdf', engine='bogus')
+
+def test_malformed_items_are_skipped_like_the_text_engine(tmp_path):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=2, items_per_page=20, malformed_ratio=0.5, seed=3)
+    assert info['malformed'] > 0
+    rows = extractor.extract_table_rows(pdf_path)
+    assert [row[:6] + row[7:] for row in rows[1:]] == [row[:6] + row[7:] for row in info['rows']]
@@ -0,0 +1,83 @@
+import os
+from orders_converter import jobs
+from orders_converter.utils.synthetic import generate_po_pdf
+
+def _events_until_finished(conversions, job_ids, on_event=None):
+    """Collects events until every job has finished, keyed by job id."""
+    events = {job_id: [] for job_id in job_ids}
+    remaining = set(job_ids)
+    while remaining:
+        event = conversions.events.get(timeout=60)
+        events[event.job_id].append(event)
+        if on_event is not None:
+            on_event(event)
+        if event.kind in jobs.FINISHED:
+            remaining.discard(event.job_id)
+    return events
+
+def test_jobs_convert_concurrently_with_page_progress(tmp_path):
+    infos = []
+    for i in range(3):
+        pdf_path = str(tmp_path / f'po{i}.pdf')
+        infos.append((pdf_path, generate_po_pdf(pdf_path, pages=2, items_per_page=10, seed=i)))
+    conversions = jobs.ConversionQueue(max_workers=2)
+    try:
+        job_ids = [conversions.submit(pdf_path, pdf_path[:-4] + '.xlsx') for pdf_path, _ in infos]
+        events = _events_until_finished(conversions, job_ids)
+    finally:
+        conversions.shutdown()
+    for job_id, (pdf_path, info) in zip(job_ids, infos):
+        kinds = [event.kind for event in events[job_id]]
+        assert kinds[:2] == [jobs.QUEUED, jobs.STARTED]
+        assert kinds[-1] == jobs.DONE
+        progress = [(e.pages_read, e.page_count) for e in events[job_id] if e.kind == jobs.PROGRESS]
+        assert progress == [(1, 2), (2, 2)]
+        assert events[job_id][-1].rows == info['items']
+        assert os.path.exists(events[job_id][-1].message)
+    assert conversions.active == 0
+
+def test_cancel_stops_at_next_page_and_removes_output(tmp_path):
+    pdf_path = str(tmp_path / 'po.pdf')
+    output_path = str(tmp_path / 'po.xlsx')
+    generate_po_pdf(pdf_path, pages=6, items_per_page=10, seed=1)
+    conversions = jobs.ConversionQueue(max_workers=1)
+    try:
+        job_id = conversions.submit(pdf_path, output_path)
+
+        def cancel_on_first_page(event):
+            if event.kind == jobs.PROGRESS:
+                conversions.cancel(job_id)
+
+        events = _events_until_finished(conversions, [job_id], cancel_on_first_page)[job_id]
+    finally:
+        conversions.shutdown()
+    assert events[-1].kind == jobs.CANCELLED
+    assert max(e.pages_read for e in events if e.kind == jobs.PROGRESS) < 6
+    assert not os.path.exists(output_path)
+    assert not conversions.cancel(job_id)
+
+def test_queued_job_cancelled_before_it_starts(tmp_path):
+    pdf_path = str(tmp_path / 'po.pdf')
+    generate_po_pdf(pdf_path, pages=3, items_per_page=10, seed=2)
+    conversions = jobs.ConversionQueue(max_workers=1)
+    try:
+        first = conversions.submit(pdf_path, str(tmp_path / 'first.xlsx'))
+        second = conversions.submit(pdf_path, str(tmp_path / 'second.xlsx'))
+        assert conversions.cancel(second)
+        events = _events_until_finished(conversions, [first, second])
+    finally:
+        conversions.shutdown()
+    assert events[first][-1].kind == jobs.DONE
+    assert [e.kind for e in events[second]] == [jobs.QUEUED, jobs.CANCELLED]
+
+def test_failed_job_reports_error(tmp_path):
+    bogus = tmp_path / 'bogus.pdf'
+    bogus.write_bytes(b'not a pdf')
+    conversions = jobs.ConversionQueue()
+    try:
+        job_id = conversions.submit(str(bogus), str(tmp_path / 'bogus.xlsx'))
+        events = _events_until_finished(conversions, [job_id])[job_id]
+    finally:
+        conversions.shutdown()
+    assert events[-1].kind == jobs.FAILED
+    assert events[-1].message
@@ -0,0 +1,78 @@
+import os
+import shutil
+import pytest
+from orders_converter import batch
+from orders_converter.io.extraction_cache import hash_file
+from orders_converter.io.journal import DONE, FAILED, RUNNING, BatchJournal
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+def test_finished_skips_only_unchanged_done_files(tmp_path):
+    pdfs = {}
+    for name in ('done', 'touched', 'edited', 'moved', 'failed', 'crashed'):
+        pdfs[name] = tmp_path / f'{name}.pdf'
+        pdfs[name].write_bytes(b'%PDF-1.4 ' + name.encode())
+        (tmp_path / f'{name}.xlsx').write_bytes(b'xlsx')
+    targets = [(str(pdf), str(tmp_path / f'{name}.xlsx')) for name, pdf in pdfs.items()]
+
+    with BatchJournal(str(tmp_path / 'journal.sqlite3')) as journal:
+        run_id = journal.start_run(len(targets))
+        journal.running(run_id, targets)
+        for pdf, out in targets[:4]:
+            journal.record(run_id, pdf, DONE, out, hash_file(pdf), rows=3, seconds=0.5)
+        journal.record(run_id, targets[4][0], FAILED, targets[4][1], error='boom')
+        journal.finish_run(run_id)
+
+        os.utime(pdfs['touched'], ns=(1, 1))
+        pdfs['edited'].write_bytes(b'%PDF-1.4 changed content')
+        os.remove(tmp_path / 'moved.xlsx')
+
+        assert journal.latest()[str(pdfs['crashed'].resolve())].status == RUNNING
+        assert sorted(journal.finished(targets)) == [str(pdfs['done']), str(pdfs['touched'])]
+        assert journal.finished(targets)[str(pdfs['done'])].rows == 3
+
+def test_stats_group_outcomes(tmp_path):
+    with BatchJournal(str(tmp_path / 'journal.sqlite3')) as journal:
+        for outcomes in ([DONE, DONE, FAILED], [DONE]):
+            run_id = journal.start_run(len(outcomes))
+            for n, status in enumerate(outcomes):
+                journal.record(run_id, str(tmp_path / f'{n}.pdf'), status, rows=10, seconds=1.0)
+            journal.finish_run(run_id)
+
+        runs = journal.stats('run')
+        assert [(s['files'], s['done'], s['failed'], s['rows']) for s in runs] == [(3, 2, 1, 30), (1, 1, 0, 10)]
+        [day] = journal.stats('day')
+        assert (day['files'], day['seconds']) == (4, 4.0)
+        with pytest.raises(ValueError):
+            journal.stats('week')
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_resume_retries_only_unfinished_files(tmp_path, monkeypatch):
+    good = tmp_path / 'good.pdf'
+    shutil.copy(SAMPLE_PDF, good)
+    bad = tmp_path / 'bad.pdf'
+    bad.write_bytes(b'not a pdf')
+    out_dir = str(tmp_path / 'out')
+    journal_path = str(tmp_path / 'journal.sqlite3')
+    paths = [str(good), str(bad)]
+
+    results = batch.run_batch(paths, output_dir=out_dir, jobs=1, journal_path=journal_path)
+    assert [r.ok for r in results] == [True, False]
+    assert results[0].input_hash == hash_file(str(good))
+
+    converted = []
+    convert_pdf = batch.convert_pdf
+    monkeypatch.setattr(batch, 'convert_pdf', lambda pdf, *args: converted.append(pdf) or convert_pdf(pdf, *args))
+    shutil.copy(SAMPLE_PDF, bad)
+    results = batch.run_batch(paths, output_dir=out_dir, jobs=1, journal_path=journal_path, resume=True)
+
+    assert converted == [str(bad)]
+    assert [(r.ok, r.skipped) for r in results] == [(True, True), (True, False)]
+    assert results[0].rows > 0
+    assert '2 succeeded, 0 failed (1 from earlier runs), 2 total.' in batch.format_summary(results)
+
+    batch.run_batch(paths, output_dir=out_dir, jobs=1, journal_path=journal_path, resume=True)
+    assert converted == [str(bad)]
+    with BatchJournal(journal_path) as journal:
+        assert [s['files'] for s in journal.stats('run')] == [2, 1]
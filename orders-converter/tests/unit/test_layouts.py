@@ -0,0 +1,122 @@
+import os
+import re
+import pytest
+from orders_converter.core import parser
+from orders_converter.core.layouts import LAYOUTS, LayoutProfile, LayoutRegistry, pattern_fields, regex_grammar
+from orders_converter.utils import synthetic
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample1.pdf')
+
+ACME_ITEMS = [
+    ("1", "AC-100", "Blue Cotton Tee", "012345678905", "24", "3.50", "84.00"),
+    ("2", "AC-200", "Canvas Tote Bag", "012345678912", "10", "12.00", "120.00"),
+    ("3", "AC-300", "Wool Beanie", "012345678929", "5", "1,100.00", "5,500.00"),
+]
+
+def _acme_row(groups):
+    line, sku, description, upc, qty, rate, amount = groups
+    return [qty, sku, "", upc, "", "", description, rate.replace(",", ""), amount.replace(",", "")]
+
+ACME_LAYOUT = LayoutProfile(
+    name="acme",
+    header_labels=("Line", "SKU", "Description", "UPC", "Qty", "Unit Price", "Ext Price"),
+    columns=(None, "Item_SKU", "Description", "UPC", "Qty", "Rate", "Amount"),
+    anchors=("ACME OUTFITTERS",),
+    scan=regex_grammar(re.compile(
+        r"(\d+)\s+([A-Z]+-\d+)\s+(.+?)\s+(\d{12})\s+(\d+)\s+\$([\d,]+\.\d{2})\s+\$([\d,]+\.\d{2})")),
+    to_row=_acme_row,
+    item_prefix=re.compile(r"\d+\s+[A-Z]+-\d+\s"),
+    header_fields=pattern_fields({
+        "po_number": re.compile(r"Purchase Order No:\s*(\S+)"),
+        "vendor_number": re.compile(r"Vendor ID:\s*(\S+)"),
+        "ship_by_date": re.compile(r"Due Date:\s*(\S+)"),
+        "payment_terms": re.compile(r"Terms:\s*(.+)"),
+    }),
+    total_pattern=re.compile(r"Order Total\s+\$([\d,]+\.\d{2})"),
+    skip_markers=("Order Total", "Page "),
+)
+
+def _write_acme_pdf(path):
+    page = synthetic._Page()
+    y = synthetic.PAGE_HEIGHT - 45
+    for line in ("ACME OUTFITTERS", "Purchase Order No: AC-7781 Vendor ID: 4410",
+                 "Due Date: 06/30/2025", "Terms: Net 30"):
+        page.text(36, y, line, size=10)
+        y -= 14
+    xs = [36, 70, 150, 330, 420, 470, 560]
+    for x, label in zip(xs, ACME_LAYOUT.header_labels):
+        page.text(x, y, label)
+    for item in ACME_ITEMS:
+        y -= synthetic.LINE_HEIGHT
+        cells = list(item[:5]) + [f"${item[5]}", f"${item[6]}"]
+        for x, value in zip(xs, cells):
+            page.text(x, y, value)
+    page.text(470, y - 20, "Order Total")
+    page.text(560, y - 20, "$5,704.00")
+    page.text(36, 20, "Page 1 of 1", size=8)
+    synthetic._write_pdf(path, [page])
+
+@pytest.fixture
+def acme_layout():
+    LAYOUTS.register(ACME_LAYOUT)
+    yield ACME_LAYOUT
+    LAYOUTS.unregister(ACME_LAYOUT.name)
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_standard_layout_detected_from_header_line():
+    match = parser.detect_layout(SAMPLE_PDF)
+    assert match.profile is parser.STANDARD_LAYOUT
+    assert match.header_line == "Qty Item SKU Dev Code UPC HTS Code Brand Description Rate Amount"
+    assert match.fingerprint.anchors == {"SHIP COMPLETE BY DATE", "Vendor #"}
+    assert parser.parse_header_line(match.header_line) == parser.TABLE_COLUMNS
+
+def test_parse_header_line_reports_what_is_printed():
+    assert parser.parse_header_line("Qty Item SKU UPC Brand Description Rate Amount") == [
+        "Qty", "Item_SKU", "UPC", "Brand", "Description", "Rate", "Amount"]
+
+def test_layouts_are_matched_once_per_fingerprint(monkeypatch):
+    registry = LayoutRegistry()
+    registry.register(parser.STANDARD_LAYOUT)
+    calls = []
+    original = registry._match
+    monkeypatch.setattr(registry, '_match', lambda fingerprint: calls.append(fingerprint) or original(fingerprint))
+    text = "SHIP COMPLETE BY DATE: 5/1/2025\nQty Item SKU Dev Code UPC HTS Code Brand Description Rate Amount\n"
+    for _ in range(3):
+        assert registry.detect(text).profile is parser.STANDARD_LAYOUT
+    assert registry.detect(text + "12 more lines\n").profile is parser.STANDARD_LAYOUT
+    assert len(calls) == 1
+    assert registry.detect("no header here") is None
+
+def test_registered_layout_is_dispatched_and_parsed(tmp_path, acme_layout):
+    pdf_path = str(tmp_path / 'acme.pdf')
+    _write_acme_pdf(pdf_path)
+    assert parser.detect_layout(pdf_path).profile is acme_layout
+    rows = parser.extract_table_rows(pdf_path)
+    assert rows[0] == parser.TABLE_COLUMNS
+    assert rows[1:] == [_acme_row(item) for item in ACME_ITEMS]
+    assert list(parser.iter_table_rows(pdf_path)) == rows[1:]
+    for regions in (None, parser.DEFAULT_META_REGIONS):
+        meta = parser.extract_header_meta(pdf_path, regions=regions)
+        assert meta["po_number"] == "AC-7781"
+        assert meta["vendor_number"] == "4410"
+        assert meta["ship_by_date"] == "06/30/2025"
+        assert meta["total"] == "5,704.00"
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_new_layout_leaves_standard_pos_alone(tmp_path, acme_layout):
+    assert parser.detect_layout(SAMPLE_PDF).profile is parser.STANDARD_LAYOUT
+    assert len(parser.extract_table_rows(SAMPLE_PDF)) == 328
+
+def test_unknown_layout_has_no_table(tmp_path):
+    pdf_path = str(tmp_path / 'acme.pdf')
+    _write_acme_pdf(pdf_path)
+    assert parser.extract_table_rows(pdf_path) == []
+
+def test_register_validates_profiles():
+    registry = LayoutRegistry()
+    registry.register(ACME_LAYOUT)
+    with pytest.raises(ValueError):
+        registry.register(ACME_LAYOUT)
+    with pytest.raises(ValueError):
+        registry.register(ACME_LAYOUT._replace(name="short", columns=ACME_LAYOUT.columns[:-1]))
@@ -0,0 +1,50 @@
+import os
+import numpy as np
+import pytest
+from openpyxl import load_workbook
+from orders_converter.core import parser
+from orders_converter.core.order_table import DATAFRAME_COLUMNS, LineItem, OrderTable, format_cents, parse_cents
+from orders_converter.io.excel_writer import write_order_excel
+from orders_converter.pipeline import convert_pdf_to_excel
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+ROW = ['12', '2AP0001-00-P0001-1218M', 'B1001', '195601000001', '6209203000', 'RuffleButts', 'Shirt', '8.50', '1102.00']
+
+def test_money_parses_to_cents():
+    assert parse_cents('$1,234.5') == 123450
+    assert parse_cents('8.05') == 805
+    assert parse_cents('12') == 1200
+    assert format_cents(805) == '8.05'
+    for bad in ('8.505', '', '-1.00', 'abc'):
+        with pytest.raises(ValueError):
+            parse_cents(bad)
+
+def test_line_item_round_trips_rows():
+    item = LineItem.from_row(ROW)
+    assert (item.qty, item.rate_cents, item.amount_cents) == (12, 850, 110200)
+    assert item.to_row() == ROW
+    assert not hasattr(item, '__dict__')
+    with pytest.raises(ValueError):
+        LineItem.from_row(['1x'] + ROW[1:])
+
+def test_order_table_dataframe_shares_integer_columns():
+    table = OrderTable.from_rows([ROW, ['3'] + ROW[1:7] + ['1.00', '3.00']])
+    assert len(table) == 2 and table.total_cents == 110500
+    assert list(table.rows())[1][7:] == ['1.00', '3.00']
+    df = table.to_dataframe()
+    assert list(df.columns) == DATAFRAME_COLUMNS
+    assert df['Qty'].dtype == np.int64 and df['Amount_Cents'].tolist() == [110200, 300]
+    assert np.shares_memory(df['Amount_Cents'].to_numpy(), np.frombuffer(table.amount_cents, dtype=np.int64))
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_typed_pipeline_writes_the_same_workbook(tmp_path):
+    rows = parser.extract_table_rows(SAMPLE_PDF)
+    table = parser.extract_order_table(SAMPLE_PDF)
+    assert list(table.rows()) == rows[1:]
+    meta = parser.extract_header_meta(SAMPLE_PDF)
+    write_order_excel(rows[1:], meta, str(tmp_path / 'strings.xlsx'), columns=rows[0])
+    convert_pdf_to_excel(SAMPLE_PDF, str(tmp_path / 'items.xlsx'))
+    sheets = [list(load_workbook(tmp_path / name)['Order'].values) for name in ('strings.xlsx', 'items.xlsx')]
+    assert sheets[0] == sheets[1]
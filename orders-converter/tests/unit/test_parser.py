@@ -1,6 +1,8 @@
 import os
 import pytest
 from orders_converter.core import parser
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.utils.synthetic import generate_po_pdf
 
 FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
 SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample1.pdf')
@@ -17,4 +19,57 @@ def test_extract_table_rows():
     rows = parser.extract_table_rows(SAMPLE_PDF)
     assert isinstance(rows, list)
     assert all(isinstance(row, list) for row in rows)
-    assert len(rows) > 0 
\ No newline at end of file
+    assert len(rows) > 0 
+
+
+def test_iter_table_rows_stitches_items_across_pages(tmp_path):
+    pdf_path = str(tmp_path / 'split.pdf')
+    expected = generate_po_pdf(pdf_path, pages=4, items_per_page=5, split_items=True)
+    # One page in memory at a time: each split item is stitched from the
+    # carry-over buffer, after the page it started on was released.
+    with PurchaseOrderDocument(pdf_path, cache_text=False, page_window=1) as document:
+        rows = []
+        for row in parser.iter_table_rows(document):
+            rows.append(row)
+            assert len(document._live_pages) <= 1
+            assert len(document._page_texts) <= 1
+    assert rows == expected['rows']
+    assert rows[4][6] == expected['descriptions'][4]
+    assert parser.extract_table_rows(pdf_path)[1:] == rows
+
+def test_carry_over_buffer_stays_small_without_items():
+    garbage = " ".join(f"word{i}" for i in range(1000))
+    assert parser._trim_carry(garbage).split() == [f"word{i}" for i in range(994, 1000)]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_iter_table_rows_yields_before_last_page():
+    with PurchaseOrderDocument(SAMPLE_PDF) as document:
+        rows = parser.iter_table_rows(document)
+        first = next(rows)
+        assert len(document._page_texts) < document.page_count
+        assert [first] + list(rows) == parser.extract_table_rows(document)[1:]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_region_meta_matches_full_text_without_laying_out_pages(monkeypatch):
+    expected = parser.extract_header_meta(SAMPLE_PDF)
+    with PurchaseOrderDocument(SAMPLE_PDF) as document:
+        def no_page_text(index):
+            raise AssertionError(f'page {index + 1} was laid out')
+
+        monkeypatch.setattr(document, 'page_text', no_page_text)
+        assert parser.extract_header_meta(document, regions=parser.DEFAULT_META_REGIONS) == expected
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_region_meta_falls_back_to_full_page():
+    expected = parser.extract_header_meta(SAMPLE_PDF)
+    # A band holding only the PO number leaves the other fields to the fallback.
+    regions = parser.MetaRegions(header=(0.8, 0.0, 1.0, 0.15))
+    assert parser.extract_header_meta(SAMPLE_PDF, regions=regions) == expected
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_learned_regions_hold_the_header_fields():
+    regions = parser.learn_meta_regions(SAMPLE_PDF)
+    assert regions.header[3] < 0.5
+    with PurchaseOrderDocument(SAMPLE_PDF) as document:
+        text = document.region_text(0, regions.header)
+    assert 'PAYMENT TERMS' in text and 'Vendor #' in text
@@ -0,0 +1,55 @@
+import os
+import pytest
+from orders_converter import jobs
+from orders_converter.core import parser
+from orders_converter.core.order_table import LineItem
+from orders_converter.preview import PreviewModel
+from orders_converter.utils.synthetic import generate_po_pdf
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample1.pdf')
+
+def _scan(rows, query, columns=(1, 3)):
+    return [n for n, row in enumerate(rows) if any(row[c].upper().startswith(query.upper()) for c in columns)]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_search_matches_a_full_scan():
+    rows = parser.extract_table_rows(SAMPLE_PDF)[1:]
+    model = PreviewModel()
+    # Added in uneven chunks, as pages arrive.
+    for start in range(0, len(rows), 37):
+        model.extend(LineItem.from_row(row) for row in rows[start:start + 37])
+    assert len(model) == len(rows)
+    assert model.rows(range(5)) == [LineItem.from_row(row).to_row() for row in rows[:5]]
+    for query in [rows[0][1], rows[100][1][:6], rows[50][3], rows[50][3][:8], '2ap', 'zzz']:
+        assert model.search(query) == _scan(rows, query), query
+    sku = rows[10][1]
+    assert model.search(sku, 'item_sku') == _scan(rows, sku, columns=(1,))
+    assert model.search(sku, 'upc') == _scan(rows, sku, columns=(3,))
+
+def test_search_rejects_unindexed_column():
+    with pytest.raises(ValueError):
+        PreviewModel().search('x', 'description')
+
+def test_preview_job_fills_model_page_by_page(tmp_path):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=4, items_per_page=10, seed=4)
+    model = PreviewModel()
+    conversions = jobs.ConversionQueue()
+    seen = []
+    try:
+        job_id = conversions.submit_preview(pdf_path, model)
+        while True:
+            event = conversions.events.get(timeout=60)
+            if event.kind == jobs.PROGRESS:
+                seen.append(len(model))
+            if event.kind in jobs.FINISHED:
+                break
+    finally:
+        conversions.shutdown()
+    assert event.job_id == job_id and event.kind == jobs.DONE
+    assert event.rows == len(model) == info['items']
+    assert model.rows(range(len(model))) == info['rows']
+    # Rows showed up while later pages were still being read.
+    assert 0 < seen[-1] < info['items']
+    assert seen == sorted(seen)
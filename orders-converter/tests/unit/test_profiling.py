@@ -0,0 +1,69 @@
+import json
+import os
+import pytest
+from orders_converter.cli import main
+from orders_converter.pipeline import convert_pdf_to_excel
+from orders_converter.utils.profiling import Profiler, StageMetrics, span
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+def test_spans_are_noops_without_profiler():
+    with span('stage', page=1) as s:
+        s.set(rows=3)
+    with Profiler() as profiler:
+        with span('outer') as outer:
+            with span('inner', page=2) as inner:
+                inner.set(rows=5)
+            outer.set(rows=1)
+    assert [s.name for s in profiler.spans] == ['outer', 'inner']
+    assert profiler.spans[1].depth == 1
+    assert profiler.spans[1].tags == {'page': 2, 'rows': 5}
+    totals = profiler.stage_totals()
+    assert totals['outer']['self_seconds'] <= totals['outer']['seconds']
+    assert totals['inner']['rows'] == 5
+
+def test_memory_spans_record_peaks():
+    with Profiler(memory=True) as profiler:
+        with span('outer'):
+            with span('inner'):
+                buffer = bytearray(5_000_000)
+            del buffer
+    outer, inner = profiler.spans
+    assert inner.peak_bytes >= 5_000_000
+    assert outer.peak_bytes >= inner.peak_bytes
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_conversion_is_profiled_per_stage(tmp_path):
+    with Profiler() as profiler:
+        _, row_count = convert_pdf_to_excel(SAMPLE_PDF, str(tmp_path / 'out.xlsx'))
+    totals = profiler.stage_totals()
+    for stage in ('open', 'page_text', 'header_meta', 'find_header', 'match_items', 'excel_write', 'excel_save'):
+        assert stage in totals
+    assert totals['page_text']['calls'] >= 3
+    assert totals['match_items']['rows'] == row_count
+    assert totals['excel_write']['rows'] == row_count
+    pages = sorted(s.tags['page'] for s in profiler.spans if s.name == 'match_items')
+    assert pages == [1, 2, 3]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_cli_writes_profile_report(tmp_path):
+    report_path = tmp_path / 'profile.json'
+    main([SAMPLE_PDF, '-o', str(tmp_path / 'out.xlsx'), '--no-cache', '--profile', str(report_path)])
+    report = json.loads(report_path.read_text())
+    assert report['stages']['match_items']['rows'] == 49
+    assert all({'name', 'seconds', 'self_seconds', 'tags'} <= set(s) for s in report['spans'])
+
+def test_stage_metrics_render_prometheus_text(tmp_path):
+    metrics = StageMetrics()
+    metrics.add({'match_items': {'calls': 3, 'seconds': 0.5, 'self_seconds': 0.5, 'rows': 49}}, rows=49, seconds=1.0)
+    metrics.add({'match_items': {'calls': 2, 'seconds': 0.25, 'self_seconds': 0.25, 'rows': 10}}, rows=10, seconds=1.0)
+    metrics.add(None, ok=False)
+    path = tmp_path / 'metrics.prom'
+    metrics.write(str(path))
+    text = path.read_text()
+    assert 'orders_converter_conversions_total{status="ok"} 2' in text
+    assert 'orders_converter_conversions_total{status="failed"} 1' in text
+    assert 'orders_converter_stage_calls_total{stage="match_items"} 5' in text
+    assert 'orders_converter_stage_seconds_total{stage="match_items"} 0.750000' in text
+    assert 'orders_converter_rows_total 59' in text
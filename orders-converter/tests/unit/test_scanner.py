@@ -0,0 +1,81 @@
+import os
+import random
+import time
+import pytest
+from orders_converter.core import parser
+from orders_converter.core.document import PurchaseOrderDocument
+from orders_converter.core.scanner import scan_items
+from orders_converter.utils.synthetic import generate_po_pdf
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample1.pdf')
+
+ITEM = "12 2AP0001-00-P0001-1218M B1001 195601000001 6209203000 RuffleButts Classic Shirt - 2T $8.50 $102.00"
+
+def _regex_items(text):
+    return [(m.groups(), m.start(), m.end()) for m in parser.ITEM_PATTERN.finditer(text)]
+
+def _scanned_items(text):
+    return [(m.groups, m.start, m.end) for m in scan_items(text)]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_scanner_matches_regex_on_document_text():
+    header_line_text, _ = parser.find_header(SAMPLE_PDF)
+    with PurchaseOrderDocument(SAMPLE_PDF) as document:
+        text = " ".join(" ".join(parser._content_lines(page_text, header_line_text))
+                        for _, page_text in document.iter_page_texts())
+    items = _scanned_items(text)
+    assert items == _regex_items(text)
+    assert len(items) == 327
+
+def test_scanner_matches_regex_on_random_fragments():
+    rng = random.Random(3)
+    fragments = ["7", "12", "AB-1", "B1", "195601000001", "6209203000", "Shirt", "$8.50",
+                 "$1,234.567", "$12", "x7", "7$1.00"]
+    for _ in range(3000):
+        text = " ".join(rng.choice(fragments) for _ in range(rng.randint(1, 25)))
+        assert _scanned_items(text) == _regex_items(text), text
+
+def test_amount_prefix_and_partial_token():
+    # The amount needs only a money prefix, so the rest of its token can
+    # hold the next item's Qty.
+    text = ITEM.replace("$102.00", "$1,102.00") + ITEM
+    items = _scanned_items(text)
+    assert items == _regex_items(text)
+    assert items[0][0][7] == "$1,102.00"
+    assert items[1][0][0] == "12"
+
+def test_missing_rate_resyncs_on_next_item():
+    broken = ITEM.replace("$8.50 ", "")
+    text = f"{broken} {ITEM} {ITEM}"
+    # The regex swallows the following item into the broken one's description.
+    assert len(_regex_items(text)) == 2
+    assert "6209203000" in _regex_items(text)[0][0][5]
+    groups = [m.groups for m in scan_items(text)]
+    assert len(groups) == 2
+    assert groups[0][5] == "RuffleButts Classic Shirt - 2T"
+
+def test_unterminated_items_scan_in_linear_time():
+    broken = ITEM.replace(" $8.50 $102.00", "")
+    small = " ".join([broken] * 500)
+    large = " ".join([broken] * 5000)
+    start = time.perf_counter()
+    assert list(scan_items(small)) == []
+    small_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    assert list(scan_items(large)) == []
+    large_seconds = time.perf_counter() - start
+    # 10x the input should cost about 10x the time, never 100x.
+    assert large_seconds < max(small_seconds, 0.005) * 40
+
+@pytest.mark.parametrize('seed', range(12))
+def test_malformed_synthetic_rows_are_skipped(tmp_path, seed):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=3, items_per_page=15, malformed_ratio=0.3, seed=seed)
+    assert info['malformed'] > 0
+    assert parser.extract_table_rows(pdf_path)[1:] == info['rows']
+
+def test_parse_order_line_stays_on_one_line():
+    assert parser.parse_order_line(ITEM)[5:] == ["RuffleButts", "Classic Shirt - 2T", "8.50", "102.00"]
+    assert parser.parse_order_line(ITEM.replace("Shirt", "Shirt\n")) == []
+    assert parser.parse_order_line("no item here") == []
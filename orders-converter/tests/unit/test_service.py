@@ -0,0 +1,119 @@
+import asyncio
+import io
+import json
+import os
+import pytest
+from openpyxl import load_workbook
+from orders_converter.service import ConversionService
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+async def _request(port, method, target, body=b'', length=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    length = len(body) if length is None else length
+    head = f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, head.decode(), payload
+
+def _run_with_service(scenario, **kwargs):
+    async def main():
+        service = ConversionService(port=0, workers=1, **kwargs)
+        await service.start()
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_convert_returns_json_and_xlsx():
+    with open(SAMPLE_PDF, 'rb') as fh:
+        pdf_bytes = fh.read()
+
+    async def scenario(service):
+        as_json = await _request(service.port, 'POST', '/convert', pdf_bytes)
+        as_xlsx = await _request(service.port, 'POST', '/convert?format=xlsx', pdf_bytes)
+        health = await _request(service.port, 'GET', '/health')
+        metrics = await _request(service.port, 'GET', '/metrics')
+        return as_json, as_xlsx, health, metrics
+
+    (status, _, payload), (xlsx_status, xlsx_head, xlsx_body), health, metrics = _run_with_service(scenario)
+    assert status == 200
+    data = json.loads(payload)
+    assert data['meta']['po_number'] == '001536'
+    assert data['columns'][0] == 'Qty'
+    assert len(data['rows']) == 49
+    assert xlsx_status == 200
+    assert 'spreadsheetml' in xlsx_head
+    assert load_workbook(io.BytesIO(xlsx_body))['Order'].max_row == 50
+    assert json.loads(health[2])['completed'] == 2
+    assert metrics[0] == 200
+    assert b'orders_converter_conversions_total{status="ok"} 2' in metrics[2]
+    assert b'orders_converter_stage_rows_total{stage="match_items"} 98' in metrics[2]
+
+def test_limits_and_saturation():
+    async def scenario(service):
+        too_big = await _request(service.port, 'POST', '/convert', b'x' * 200)
+        service.in_flight = service.max_in_flight
+        saturated = await _request(service.port, 'POST', '/convert', b'%PDF-')
+        service.in_flight = 0
+        not_pdf = await _request(service.port, 'POST', '/convert', b'not a pdf')
+        missing = await _request(service.port, 'GET', '/nope')
+        bad_lengths = [await _request(service.port, 'POST', '/convert', b'%PDF-', length=length)
+                       for length in (-5, '5.0', 'abc')]
+        return too_big, saturated, not_pdf, missing, bad_lengths
+
+    too_big, saturated, not_pdf, missing, bad_lengths = _run_with_service(scenario, max_bytes=100,
+                                                                          max_in_flight=1)
+    assert too_big[0] == 413
+    assert saturated[0] == 503
+    assert 'Retry-After: 1' in saturated[1]
+    assert not_pdf[0] == 422
+    assert missing[0] == 404
+    assert [response[0] for response in bad_lengths] == [400, 400, 400]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_page_limit():
+    with open(SAMPLE_PDF, 'rb') as fh:
+        pdf_bytes = fh.read()
+
+    async def scenario(service):
+        return await _request(service.port, 'POST', '/convert', pdf_bytes)
+
+    status, _, payload = _run_with_service(scenario, max_pages=2)
+    assert status == 413
+    assert '3 pages' in json.loads(payload)['error']
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_pool_failures_are_not_blamed_on_the_upload():
+    with open(SAMPLE_PDF, 'rb') as fh:
+        pdf_bytes = fh.read()
+
+    async def scenario(service):
+        for process in list(service._executor._processes.values()):
+            process.kill()
+            process.join()
+        crashed = await _request(service.port, 'POST', '/convert', pdf_bytes)
+        health = await _request(service.port, 'GET', '/health')
+        # A new pool is started in the background.
+        for _ in range(200):
+            recovered = await _request(service.port, 'GET', '/health')
+            if recovered[0] == 200:
+                break
+            await asyncio.sleep(0.05)
+        converted = await _request(service.port, 'POST', '/convert', pdf_bytes)
+        return crashed, health, recovered, converted
+
+    crashed, health, recovered, converted = _run_with_service(scenario)
+    assert crashed[0] == 503
+    assert json.loads(crashed[2]) == {'error': 'converter unavailable'}
+    assert health[0] == 503
+    assert recovered[0] == 200
+    assert converted[0] == 200
+    assert len(json.loads(converted[2])['rows']) == 49
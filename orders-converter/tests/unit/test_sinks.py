@@ -0,0 +1,60 @@
+import os
+from datetime import date
+from decimal import Decimal
+import pytest
+from orders_converter.core import parser
+from orders_converter.io import sinks
+from orders_converter.pipeline import convert_pdf_to_excel
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+META = {'po_number': '001688', 'vendor_number': '5', 'ship_by_date': '5/1/2025',
+        'payment_terms': '0% Deposit, Net 60 Ex-Factory', 'total': '1,102.00', 'page_count': 1}
+ROWS = [
+    ['12', '2AP0001-00-P0001-1218M', 'B1001', '095601000001', '0209203000', 'RuffleButts', 'Shirt', '8.50', '102.00'],
+    ['100', '2AP0001-00-P0001-2T000', 'B1001', '95601000002', '209203000', '', 'Shirt, "long"', '10.00', '1000.00'],
+]
+
+def test_typed_rows_convert_types_and_pad_codes():
+    first, second = sinks.typed_rows(ROWS, META)
+    assert first[:5] == ('001688', '5', date(2025, 5, 1), '0% Deposit, Net 60 Ex-Factory', Decimal('1102.00'))
+    assert first[5] == 12 and first[12:] == (Decimal('8.50'), Decimal('102.00'))
+    assert second[8:10] == ('095601000002', '0209203000')
+    assert len(first) == len(sinks.SCHEMA)
+
+def test_typed_rows_reject_bad_values():
+    with pytest.raises(ValueError):
+        list(sinks.typed_rows([ROWS[0][:7] + ['8.5x', '102.00']], META))
+    with pytest.raises(ValueError):
+        list(sinks.typed_rows([['x'] + ROWS[0][1:]], META))
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_text_sinks_round_trip(tmp_path, fmt):
+    path = str(tmp_path / f'po.{fmt}')
+    assert sinks.write_order(ROWS, META, path, columns=list(parser.TABLE_COLUMNS)) == 2
+    df = sinks.read_dataset([path])
+    assert list(df.columns) == sinks.COLUMN_NAMES
+    assert [tuple(row) for row in df.itertuples(index=False)] == list(sinks.typed_rows(ROWS, META))
+
+def test_parquet_and_arrow_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    for fmt in ('parquet', 'arrow'):
+        path = str(tmp_path / f'po.{fmt}')
+        assert sinks.write_order(ROWS, META, path) == 2
+    df = sinks.read_dataset([str(tmp_path)])
+    assert len(df) == 4
+    assert list(df['amount']) == [Decimal('102.00'), Decimal('1000.00')] * 2
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        sinks.write_order(ROWS, META, str(tmp_path / 'po.txt'))
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_conversions_form_one_dataset(tmp_path):
+    convert_pdf_to_excel(SAMPLE_PDF, str(tmp_path / 'a.csv'))
+    convert_pdf_to_excel(SAMPLE_PDF, str(tmp_path / 'b.jsonl'))
+    df = sinks.read_dataset([str(tmp_path)])
+    assert len(df) == 2 * 49
+    assert set(df['po_number']) == {'001536'}
+    assert sum(df['amount']) == 2 * df['order_total'][0]
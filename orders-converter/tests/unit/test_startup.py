@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import pytest
+import orders_converter
+
+SRC_DIR = os.path.dirname(os.path.dirname(orders_converter.__file__))
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'sample2.pdf')
+HEAVY_MODULES = {'pandas', 'numpy', 'openpyxl', 'pdfplumber', 'pdfminer', 'pypdfium2', 'PIL'}
+# Generous: importing the CLI takes about 0.1s; the heavy stack took 0.8s.
+CLI_IMPORT_BUDGET_SECONDS = 0.4
+
+def _importtime(*args):
+    """Runs python -X importtime and returns (imported top-level modules, {module: cumulative seconds}, result)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True, env=env)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, total, name = line.split('|')
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total) / 1e6
+    return {name.split('.')[0] for name in cumulative}, cumulative, result
+
+def test_cli_import_skips_heavy_modules():
+    modules, cumulative, result = _importtime('-c', 'import orders_converter.cli')
+    assert result.returncode == 0, result.stderr
+    assert not modules & HEAVY_MODULES
+    assert cumulative['orders_converter.cli'] < CLI_IMPORT_BUDGET_SECONDS
+
+def test_help_skips_heavy_modules():
+    modules, _, result = _importtime('-m', 'orders_converter', '--help')
+    assert result.returncode == 0, result.stderr
+    assert 'Orders Sheet Converter CLI' in result.stdout
+    assert not modules & HEAVY_MODULES
+
+def test_gui_import_defers_conversion_stack_and_logging():
+    pytest.importorskip('tkinter')
+    code = 'import logging, orders_converter.gui; assert not logging.getLogger().handlers'
+    modules, _, result = _importtime('-c', code)
+    assert result.returncode == 0, result.stderr
+    assert not modules & HEAVY_MODULES
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_meta_command_skips_table_and_output_stack():
+    modules, _, result = _importtime('-m', 'orders_converter', 'meta', SAMPLE_PDF)
+    assert result.returncode == 0, result.stderr
+    assert '"po_number": "001536"' in result.stdout
+    assert not modules & {'pandas', 'numpy', 'openpyxl'}
@@ -0,0 +1,28 @@
+import pytest
+from orders_converter.core import parser
+from orders_converter.utils.synthetic import generate_po_pdf
+
+def test_generated_po_parses_to_expected_rows(tmp_path):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=3, items_per_page=12, seed=7)
+
+    meta = parser.extract_header_meta(pdf_path)
+    rows = parser.extract_table_rows(pdf_path)
+
+    assert meta['po_number'] == info['po_number']
+    assert meta['page_count'] == 3
+    assert meta['total'] == info['total']
+    assert rows[1:] == info['rows']
+    assert len(info['rows']) == info['items'] == 36
+
+@pytest.mark.parametrize('seed', [1, 3, 5])
+def test_malformed_rows_are_counted(tmp_path, seed):
+    pdf_path = str(tmp_path / 'po.pdf')
+    info = generate_po_pdf(pdf_path, pages=2, malformed_ratio=0.5, seed=seed)
+    assert info['malformed'] > 0
+    assert len(info['rows']) == info['items'] - info['malformed']
+    assert parser.extract_table_rows(pdf_path)[1:] == info['rows']
+
+def test_overfull_page_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        generate_po_pdf(str(tmp_path / 'po.pdf'), items_per_page=60)
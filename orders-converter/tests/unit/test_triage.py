@@ -0,0 +1,77 @@
+import os
+import shutil
+import pytest
+from orders_converter import batch, triage
+from orders_converter.utils import synthetic
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+def _write_text_pdf(path, *lines):
+    page = synthetic._Page()
+    for i, line in enumerate(lines):
+        page.text(36, 500 - 14 * i, line, size=10)
+    synthetic._write_pdf(str(path), [page])
+
+def _write_encrypted_pdf(path):
+    _write_text_pdf(path, 'Hello')
+    data = path.read_bytes().replace(
+        b'/Root 1 0 R >>',
+        b'/Root 1 0 R /ID [<00112233445566778899aabbccddeeff> <00112233445566778899aabbccddeeff>] '
+        b'/Encrypt << /Filter /Standard /V 1 /R 2 /O <' + b'11' * 32 + b'> /U <' + b'22' * 32 + b'> /P -4 >> >>')
+    path.write_bytes(data)
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_po_is_convertible():
+    result = triage.triage_pdf(SAMPLE_PDF)
+    assert result.convertible
+    assert result.page_count == 3
+    assert result.layout == 'rufflebutts'
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_unconvertible_files_are_quarantined_with_reasons(tmp_path):
+    (tmp_path / 'empty.pdf').write_bytes(b'')
+    (tmp_path / 'notes.pdf').write_bytes(b'Dear vendor, ...')
+    data = open(SAMPLE_PDF, 'rb').read()
+    (tmp_path / 'truncated.pdf').write_bytes(data[:len(data) // 2])
+    _write_encrypted_pdf(tmp_path / 'locked.pdf')
+    synthetic._write_pdf(str(tmp_path / 'scan.pdf'), [synthetic._Page()])
+    _write_text_pdf(tmp_path / 'invoice.pdf', 'INVOICE 1234', 'Amount due: $10.00')
+    names = ['empty', 'notes', 'truncated', 'locked', 'scan', 'invoice']
+
+    results = triage.triage_all([str(tmp_path / f'{name}.pdf') for name in names], jobs=1)
+
+    assert [r.reason for r in results] == [triage.EMPTY, triage.NOT_PDF, triage.TRUNCATED, triage.ENCRYPTED,
+                                           triage.NO_TEXT, triage.NO_HEADER]
+    report = triage.format_triage(results + [triage.triage_pdf(SAMPLE_PDF)])
+    assert f"QUARANTINE  {tmp_path / 'scan.pdf'}: {triage.NO_TEXT}" in report
+    assert '1 convertible, 6 quarantined, 7 total.' in report
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_run_batch_skips_quarantined_files(tmp_path):
+    good = tmp_path / 'good.pdf'
+    shutil.copy(SAMPLE_PDF, good)
+    scan = tmp_path / 'scan.pdf'
+    synthetic._write_pdf(str(scan), [synthetic._Page()])
+    out_dir = tmp_path / 'out'
+
+    results = batch.run_batch([str(scan), str(good)], output_dir=str(out_dir), jobs=2, triage=True)
+
+    assert [(r.ok, r.quarantined) for r in results] == [(False, True), (True, False)]
+    assert results[0].error == triage.NO_TEXT
+    assert sorted(os.listdir(out_dir)) == ['good.xlsx']
+    assert '1 succeeded, 0 failed, 1 quarantined, 2 total.' in batch.format_summary(results)
+
+def test_header_after_cover_pages_is_found(tmp_path):
+    pages = []
+    for lines in (['Dear vendor,', 'please find our order attached.'], ['TERMS:', '1. Ship complete.'],
+                  ['Qty Item SKU Dev Code UPC HTS Code Brand Description Rate Amount']):
+        page = synthetic._Page()
+        for i, line in enumerate(lines):
+            page.text(36, 500 - 14 * i, line, size=10)
+        pages.append(page)
+    synthetic._write_pdf(str(tmp_path / 'po.pdf'), pages)
+
+    result = triage.triage_pdf(str(tmp_path / 'po.pdf'))
+    assert result.convertible
+    assert result.layout == 'rufflebutts'
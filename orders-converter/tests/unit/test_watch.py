@@ -0,0 +1,125 @@
+import os
+import shutil
+import pytest
+from orders_converter import watch
+from orders_converter.watch import InboxWatcher
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURE_DIR, 'sample2.pdf')
+
+def test_scan_waits_until_file_is_stable(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    watcher = InboxWatcher(str(inbox), str(tmp_path / 'out'), settle_seconds=0)
+    pdf = inbox / 'a.pdf'
+    pdf.write_bytes(b'%PDF-1.4 partial')
+    (inbox / '.hidden.pdf').write_bytes(b'%PDF-')
+    (inbox / 'notes.txt').write_text('x')
+
+    assert watcher.scan() == []
+    assert watcher.scan() == [str(pdf)]
+    with open(pdf, 'ab') as fh:
+        fh.write(b' more bytes')
+    assert watcher.scan() == []
+    assert watcher.scan() == [str(pdf)]
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_run_once_converts_dedupes_and_sorts_files(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    outbox = tmp_path / 'out'
+    shutil.copy(SAMPLE_PDF, inbox / 'po.pdf')
+    (inbox / 'broken.pdf').write_bytes(b'%PDF-1.4 truncated')
+
+    watcher = InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0)
+    assert watcher.run(once=True) == 2
+    assert os.listdir(inbox) == []
+    assert os.path.exists(outbox / 'po.xlsx')
+    assert os.listdir(outbox / 'done') == ['po.pdf']
+    assert sorted(os.listdir(outbox / 'failed')) == ['broken.pdf', 'broken.pdf.error.txt']
+
+    # A re-sent copy is recognised by content, even by a fresh watcher.
+    shutil.copy(SAMPLE_PDF, inbox / 'po-resent.pdf')
+    InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0).run(once=True)
+    assert os.listdir(outbox / 'duplicates') == ['po-resent.pdf']
+    assert not os.path.exists(outbox / 'po-resent.xlsx')
+
+def test_triage_quarantines_without_converting(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    outbox = tmp_path / 'out'
+    (inbox / 'cut.pdf').write_bytes(b'%PDF-1.4 truncated')
+
+    watcher = InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0, triage=True)
+    assert watcher.run(once=True) == 1
+    assert sorted(os.listdir(outbox / 'quarantine')) == ['cut.pdf', 'cut.pdf.reason.txt']
+    assert (outbox / 'quarantine' / 'cut.pdf.reason.txt').read_text().startswith('truncated')
+    assert not os.path.exists(outbox / 'failed')
+
+@pytest.mark.parametrize('triage', [False, True])
+def test_run_once_sets_aside_empty_files(tmp_path, triage):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    outbox = tmp_path / 'out'
+    (inbox / 'empty.pdf').write_bytes(b'')
+
+    watcher = InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0, triage=triage)
+    assert watcher.run(once=True) == 1
+    dest = outbox / ('quarantine' if triage else 'failed')
+    note = 'empty.pdf.reason.txt' if triage else 'empty.pdf.error.txt'
+    assert sorted(os.listdir(dest)) == ['empty.pdf', note]
+    assert (dest / note).read_text().strip() == 'empty file'
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_same_named_pos_get_their_own_outputs(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    outbox = tmp_path / 'out'
+    shutil.copy(SAMPLE_PDF, inbox / 'po.pdf')
+    InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0).run(once=True)
+    first = (outbox / 'po.xlsx').read_bytes()
+
+    # A different PO under the same name.
+    with open(SAMPLE_PDF, 'rb') as src, open(inbox / 'po.pdf', 'wb') as dst:
+        dst.write(src.read() + b'\n% resent\n')
+    InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0).run(once=True)
+
+    assert (outbox / 'po.xlsx').read_bytes() == first
+    assert os.path.exists(outbox / 'po.1.xlsx')
+    assert sorted(os.listdir(outbox / 'done')) == ['po.1.pdf', 'po.pdf']
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason='Fixture PDF not found')
+def test_unexpected_errors_set_the_file_aside(tmp_path, monkeypatch):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    outbox = tmp_path / 'out'
+    shutil.copy(SAMPLE_PDF, inbox / 'po.pdf')
+    move = watch._move
+
+    def failing_move(src, dest_dir):
+        if os.path.basename(dest_dir) == watch.DONE_DIR:
+            raise OSError('disk full')
+        return move(src, dest_dir)
+
+    monkeypatch.setattr(watch, '_move', failing_move)
+    watcher = InboxWatcher(str(inbox), str(outbox), jobs=1, poll_interval=0.05, settle_seconds=0)
+    assert watcher.run(once=True) == 1
+    assert os.listdir(inbox) == []
+    assert sorted(os.listdir(outbox / 'failed')) == ['po.pdf', 'po.pdf.error.txt']
+    assert 'disk full' in (outbox / 'failed' / 'po.pdf.error.txt').read_text()
+
+def test_files_that_cannot_be_moved_are_skipped_until_they_change(tmp_path, monkeypatch, caplog):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    (inbox / 'empty.pdf').write_bytes(b'')
+
+    def failing_move(src, dest_dir):
+        raise PermissionError('read-only outbox')
+
+    monkeypatch.setattr(watch, '_move', failing_move)
+    watcher = InboxWatcher(str(inbox), str(tmp_path / 'out'), jobs=1, poll_interval=0.05, settle_seconds=0)
+    assert watcher.run(once=True) == 1
+    assert os.listdir(inbox) == ['empty.pdf']
+    assert 'Could not move' in caplog.text
+    assert watcher.scan() == []
+    assert watcher.scan() == []
@@ -0,0 +1,111 @@
+import os
+import time
+from orders_converter import batch, workqueue
+from orders_converter.utils.synthetic import generate_po_pdf
+from orders_converter.workqueue import Claim, QueueWorker
+
+def _queue(tmp_path):
+    root = tmp_path / 'shared'
+    for name in ('inbox', 'claimed'):
+        (root / name).mkdir(parents=True)
+    return root
+
+def test_worker_processes_drain_inbox_exactly_once(tmp_path):
+    root = _queue(tmp_path)
+    for n in range(12):
+        generate_po_pdf(str(root / 'inbox' / f'po{n:02}.pdf'), items_per_page=5, seed=n)
+
+    workqueue.run_workers(str(root), jobs=3, once=True, settle_seconds=0, poll_interval=0.05)
+
+    names = [f'po{n:02}' for n in range(12)]
+    assert os.listdir(root / 'inbox') == [] and os.listdir(root / 'claimed') == []
+    # A PDF committed twice would show up in done/ as po00.1.pdf.
+    assert sorted(os.listdir(root / 'done')) == [f'{name}.pdf' for name in names]
+    assert sorted(os.listdir(root / 'output')) == [f'{name}.xlsx' for name in names]
+    assert os.listdir(root / 'failed') == []
+
+def test_expired_claims_are_reclaimed(tmp_path):
+    root = _queue(tmp_path)
+    generate_po_pdf(str(root / 'claimed' / 'po.pdf@1@dead'), items_per_page=5)
+    (root / 'claimed' / 'bad.pdf@3@dead').write_bytes(b'%PDF-1.4 crashes workers')
+    (root / 'output').mkdir()
+    (root / 'output' / '.po.1-dead.xlsx').write_bytes(b'partial')
+    generate_po_pdf(str(root / 'claimed' / 'live.pdf@1@alive'), items_per_page=5)
+    time.sleep(1.1)
+    # Touched well ahead, so the live claim cannot expire while po.pdf converts.
+    touched = time.time() + 60
+    os.utime(root / 'claimed' / 'live.pdf@1@alive', (touched, touched))
+
+    worker = QueueWorker(str(root), worker_id='me', lease_seconds=1.0, settle_seconds=0)
+    assert worker.run(once=True) == 1
+
+    assert os.listdir(root / 'done') == ['po.pdf']
+    assert os.listdir(root / 'output') == ['po.xlsx']
+    assert sorted(os.listdir(root / 'failed')) == ['bad.pdf', 'bad.pdf.error.txt']
+    assert os.listdir(root / 'claimed') == ['live.pdf@1@alive']
+
+def test_worker_that_lost_its_lease_does_not_commit(tmp_path, monkeypatch):
+    root = _queue(tmp_path)
+    generate_po_pdf(str(root / 'inbox' / 'po.pdf'), items_per_page=5)
+    worker = QueueWorker(str(root), worker_id='slow', settle_seconds=0)
+    claim = worker.claim()
+    assert claim == Claim('po.pdf', 1, 'slow')
+    assert worker.claim() is None
+
+    convert_pdf = batch.convert_pdf
+    stolen = root / 'claimed' / 'po.pdf@2@thief'
+
+    def convert_while_stolen(pdf_path, *args, **kwargs):
+        os.rename(pdf_path, stolen)
+        return convert_pdf(str(stolen), *args, **kwargs)
+
+    monkeypatch.setattr(batch, 'convert_pdf', convert_while_stolen)
+    assert worker.process(claim) is False
+    assert os.listdir(root / 'output') == []
+    assert os.listdir(root / 'done') == []
+    assert os.listdir(root / 'claimed') == ['po.pdf@2@thief']
+
+def test_worker_stops_converting_once_its_claim_is_taken(tmp_path, monkeypatch):
+    root = _queue(tmp_path)
+    generate_po_pdf(str(root / 'inbox' / 'po.pdf'), pages=20, items_per_page=5)
+    worker = QueueWorker(str(root), worker_id='slow', lease_seconds=0.3, settle_seconds=0)
+    claim = worker.claim()
+
+    convert_pdf = batch.convert_pdf
+    stolen = root / 'claimed' / 'po.pdf@2@thief'
+    pages_seen = []
+    results = []
+
+    def convert_while_stolen(pdf_path, *args, progress=None, **kwargs):
+        os.rename(pdf_path, stolen)
+        # Long enough for the heartbeat (every lease_seconds / 3) to notice.
+        time.sleep(0.3)
+
+        def record(pages_read, page_count):
+            pages_seen.append(pages_read)
+            progress(pages_read, page_count)
+
+        results.append(convert_pdf(str(stolen), *args, progress=record, **kwargs))
+        return results[-1]
+
+    monkeypatch.setattr(batch, 'convert_pdf', convert_while_stolen)
+    assert worker.process(claim) is False
+    assert pages_seen == [1]
+    assert 'Lost the claim' in results[0].error
+    assert os.listdir(root / 'output') == []
+    assert os.listdir(root / 'failed') == []
+    assert os.listdir(root / 'claimed') == ['po.pdf@2@thief']
+
+def test_same_named_pos_keep_their_own_outputs(tmp_path):
+    root = _queue(tmp_path)
+    worker = QueueWorker(str(root), worker_id='me', settle_seconds=0)
+    generate_po_pdf(str(root / 'inbox' / 'po.pdf'), items_per_page=5, seed=1)
+    assert worker.run(once=True) == 1
+    first = (root / 'output' / 'po.xlsx').read_bytes()
+
+    generate_po_pdf(str(root / 'inbox' / 'po.pdf'), items_per_page=7, seed=2)
+    assert worker.run(once=True) == 2
+
+    assert sorted(os.listdir(root / 'done')) == ['po.1.pdf', 'po.pdf']
+    assert sorted(os.listdir(root / 'output')) == ['po.1.xlsx', 'po.xlsx']
+    assert (root / 'output' / 'po.xlsx').read_bytes() == first